@@ -0,0 +1,130 @@
+"""
+Text generation backends for GeminiAIService.
+
+A backend is any object with the google.generativeai GenerativeModel call
+surface the service uses: generate_content(prompt, stream=False, **kwargs)
+returning an object with .text (or an iterator of them when streaming), and
+optionally generate_content_async. Backends are created by name from the
+registry (settings.AI_BACKEND), so the Gemini SDK is only imported when a
+Gemini-backed backend is actually built.
+"""
+import hashlib
+import logging
+import os
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+_BACKENDS: Dict[str, Callable[[], Any]] = {}
+
+
+def register_backend(name: str):
+    """Decorator registering a zero-argument backend factory under `name`"""
+    def decorator(factory: Callable[[], Any]) -> Callable[[], Any]:
+        _BACKENDS[name] = factory
+        return factory
+    return decorator
+
+
+def create_model(name: str) -> Any:
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown AI_BACKEND: {name} (available: {', '.join(available_backends())})")
+    return _BACKENDS[name]()
+
+
+def available_backends() -> List[str]:
+    return sorted(_BACKENDS)
+
+
+@register_backend('gemini')
+def gemini_model():
+    api_key = os.getenv('GEMINI_API_KEY')
+    if not api_key:
+        raise ValueError("GEMINI_API_KEY environment variable is required")
+
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    try:
+        model = genai.GenerativeModel(os.getenv('GEMINI_MODEL', 'gemini-1.5-flash'))
+        logger.info("Gemini AI service initialized successfully")
+        return model
+    except Exception as e:
+        logger.error(f"Failed to initialize Gemini: {e}")
+        raise
+
+
+STUB_SENTENCES = [
+    "Start by building an emergency fund that covers six months of expenses.",
+    "Use Section 80C instruments such as ELSS, PPF and EPF to lower your taxable income.",
+    "Invest regularly through SIPs in diversified index funds for long-term growth.",
+    "Keep health insurance for your family and claim the premium under Section 80D.",
+    "Consider NPS for an extra ₹50,000 deduction under Section 80CCD(1B).",
+    "Review your portfolio once a year and rebalance towards your target allocation.",
+]
+
+
+class StubModel:
+    """Deterministic offline backend: the same prompt always gets the same canned answer, instantly.
+
+    Benefits phrasing prompts get their scheme list echoed back, so the JSON
+    path works too.
+    """
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        text = self.answer(prompt)
+        if stream:
+            return iter([SimpleNamespace(text=part) for part in self._split(text)])
+        return SimpleNamespace(text=text)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs):
+        text = self.answer(prompt)
+        if stream:
+            return self._astream(self._split(text))
+        return SimpleNamespace(text=text)
+
+    def answer(self, prompt: str) -> str:
+        if 'JSON array' in prompt and '[' in prompt:
+            return prompt[prompt.find('['):prompt.rfind(']') + 1]
+        seed = int(hashlib.sha256(prompt.encode('utf-8')).hexdigest(), 16)
+        picks = [STUB_SENTENCES[(seed >> (8 * i)) % len(STUB_SENTENCES)] for i in range(3)]
+        return ' '.join(dict.fromkeys(picks))
+
+    @staticmethod
+    def _split(text: str) -> List[str]:
+        middle = len(text) // 2
+        return [text[:middle], text[middle:]]
+
+    @staticmethod
+    async def _astream(parts: List[str]):
+        for part in parts:
+            yield SimpleNamespace(text=part)
+
+
+@register_backend('stub')
+def stub_model():
+    return StubModel()
+
+
+@register_backend('record')
+def recording_model():
+    """Live Gemini, with every response saved to AI_RECORDINGS_PATH for later replay"""
+    from django.conf import settings
+    from .ai_recordings import RecordingModel, RecordingStore
+
+    return RecordingModel(gemini_model(), RecordingStore(settings.AI_RECORDINGS_PATH))
+
+
+@register_backend('replay')
+def replay_model():
+    """Offline answers from AI_RECORDINGS_PATH with recorded or synthetic latency"""
+    from django.conf import settings
+    from .ai_recordings import ReplayModel, RecordingStore
+
+    return ReplayModel(
+        RecordingStore(settings.AI_RECORDINGS_PATH),
+        latency=getattr(settings, 'AI_REPLAY_LATENCY', 'recorded'),
+        scale=getattr(settings, 'AI_REPLAY_LATENCY_SCALE', 1.0),
+        on_miss=getattr(settings, 'AI_REPLAY_ON_MISS', 'stub')
+    )
@@ -0,0 +1,309 @@
+import copy
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def profile_fingerprint(user_profile: Dict[str, Any]) -> str:
+    """Canonical SHA-256 hash of a profile dict (key order independent)"""
+    canonical = json.dumps(user_profile, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class InMemoryCacheBackend:
+    """Per-process cache with TTL expiry and LRU eviction"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoCacheBackend:
+    """Backend on top of Django's cache framework (shared across workers)"""
+
+    def __init__(self, alias: str = 'default'):
+        from django.core.cache import caches
+        self.cache = caches[alias]
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self.cache.set(key, value, timeout=ttl)
+
+    def delete(self, key: str) -> None:
+        self.cache.delete(key)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+class ProfileResponseCache:
+    """Caches AI responses keyed by the kind of response and a profile fingerprint.
+
+    Nothing needs invalidating when a profile changes: the new values hash to
+    a new key, and the old entry, which other users with the same profile may
+    still share, ages out after ``ttl`` seconds.
+    """
+
+    def __init__(self, backend, ttl: int = 3600, key_prefix: str = 'finwise:ai'):
+        self.backend = backend
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, kind: str, user_profile: Dict[str, Any]) -> str:
+        return f"{self.key_prefix}:{kind}:{profile_fingerprint(user_profile)}"
+
+    def get(self, kind: str, user_profile: Dict[str, Any]) -> Optional[Any]:
+        try:
+            value = self.backend.get(self.make_key(kind, user_profile))
+        except Exception as e:
+            logger.warning(f"AI cache read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, kind: str, user_profile: Dict[str, Any], value: Any) -> None:
+        try:
+            self.backend.set(self.make_key(kind, user_profile), value, self.ttl)
+        except Exception as e:
+            logger.warning(f"AI cache write failed: {e}")
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+QUESTION_DIM = 1024
+QUESTION_TOKEN_RE = re.compile(r"[a-z0-9]+")
+QUESTION_STOPWORDS = frozenset(
+    'a an and are as at be by can could do does for from how i i\'m in is it me of on or please should '
+    'that the their this to what which with would you your'.split()
+)
+
+# Coarse profile bands answers are shared within (upper bounds)
+INCOME_BANDS = [300000, 700000, 1200000, 2000000, 5000000]
+AGE_BANDS = [25, 35, 45, 60]
+DEPENDENT_BANDS = [1, 2, 3]
+
+# Questions about the user's own figures are never served from the shared cache
+PERSONAL_NUMBER_RE = re.compile(
+    r"\b\d[\d,.]*\b|\b(my|mine)\b.*\b(income|salary|savings|portfolio|investments?|tax|score|goal|balance|net worth)\b"
+)
+PROFILE_NUMBER_FIELDS = ('income', 'investment_amount', 'emergency_fund', 'retirement_savings', 'tax_deductions', 'age')
+NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def normalize_question(question: str) -> List[str]:
+    """Lower-cased content words of a question, punctuation and filler removed"""
+    return [t for t in QUESTION_TOKEN_RE.findall(question.lower()) if t not in QUESTION_STOPWORDS]
+
+
+def question_vector(question: str, dim: int = QUESTION_DIM) -> np.ndarray:
+    """Unit hashed vector of a question's words and word pairs"""
+    tokens = normalize_question(question)
+    features = tokens + [f'{a} {b}' for a, b in zip(tokens, tokens[1:])]
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in features:
+        h = zlib.crc32(feature.encode('utf-8'))
+        vector[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def profile_band(user_profile: Dict[str, Any]) -> str:
+    """Income, age and dependents bracket, e.g. 'i2:a1:d0'"""
+    def band(value, bounds):
+        return int(np.searchsorted(bounds, value or 0, side='right'))
+
+    return (
+        f"i{band(user_profile.get('income'), INCOME_BANDS)}:"
+        f"a{band(user_profile.get('age'), AGE_BANDS)}:"
+        f"d{band(user_profile.get('dependents'), DEPENDENT_BANDS)}"
+    )
+
+
+def mentions_profile_numbers(text: str, user_profile: Dict[str, Any]) -> bool:
+    """Whether an answer quotes the user's own figures (income, savings, age...)"""
+    values = {float(user_profile[f]) for f in PROFILE_NUMBER_FIELDS if user_profile.get(f)}
+    return any(float(n.replace(',', '')) in values for n in NUMBER_RE.findall(text))
+
+
+class SemanticAnswerCache:
+    """Chat answers shared between similar questions from similarly banded profiles.
+
+    A question matches a cached one when the cosine similarity of their
+    hashed word vectors reaches ``threshold`` within the same profile band.
+    Questions about the user's own figures, and answers quoting them, bypass
+    the cache. Entries expire after ``ttl`` seconds; the least recently used
+    are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, ttl: int = 1800, max_entries: int = 2048, threshold: float = 0.85):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries: "OrderedDict[int, Tuple[str, np.ndarray, float, Any]]" = OrderedDict()
+        self._bands: Dict[str, Dict[int, np.ndarray]] = {}
+        self._matrices: Dict[str, Tuple[List[int], np.ndarray]] = {}  # Stacked band vectors, rebuilt on change
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.bypassed = self.evictions = 0
+
+    def is_personal(self, question: str) -> bool:
+        return bool(PERSONAL_NUMBER_RE.search(question.lower()))
+
+    def get(self, question: str, user_profile: Dict[str, Any]) -> Optional[Any]:
+        if self.is_personal(question):
+            with self._lock:
+                self.bypassed += 1
+            return None
+        band = profile_band(user_profile)
+        vector = question_vector(question)
+        now = time.monotonic()
+        with self._lock:
+            if band in self._bands:
+                ids, matrix = self._band_matrix(band)
+                scores = matrix @ vector
+                for position in np.argsort(-scores):
+                    if scores[position] < self.threshold:
+                        break
+                    entry_id = ids[position]
+                    _, _, expires_at, value = self._entries[entry_id]
+                    if expires_at < now:
+                        self._remove(entry_id)
+                        continue
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return copy.deepcopy(value)
+            self.misses += 1
+        return None
+
+    def set(self, question: str, user_profile: Dict[str, Any], value: Any, text: str = '') -> bool:
+        """Store an answer unless it is personal; returns whether it was cached"""
+        if self.is_personal(question) or mentions_profile_numbers(text, user_profile):
+            return False
+        band = profile_band(user_profile)
+        vector = question_vector(question)
+        if not vector.any():
+            return False
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (band, vector, time.monotonic() + self.ttl, copy.deepcopy(value))
+            self._bands.setdefault(band, {})[entry_id] = vector
+            self._matrices.pop(band, None)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def _band_matrix(self, band: str) -> Tuple[List[int], np.ndarray]:
+        if band not in self._matrices:
+            vectors = self._bands[band]
+            self._matrices[band] = (list(vectors), np.stack(list(vectors.values())))
+        return self._matrices[band]
+
+    def _remove(self, entry_id: int):
+        band, _, _, _ = self._entries.pop(entry_id)
+        self._matrices.pop(band, None)
+        vectors = self._bands[band]
+        del vectors[entry_id]
+        if not vectors:
+            del self._bands[band]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bands.clear()
+            self._matrices.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'bypassed': self.bypassed,
+                'evictions': self.evictions,
+            }
+
+
+def build_response_cache() -> Optional[ProfileResponseCache]:
+    """Build the response cache configured by the AI_CACHE_* settings"""
+    from django.conf import settings
+
+    backend_name = getattr(settings, 'AI_CACHE_BACKEND', 'memory')
+    ttl = getattr(settings, 'AI_CACHE_TTL', 3600)
+
+    if backend_name in ('', 'none', 'off') or ttl <= 0:
+        return None
+    if backend_name == 'django':
+        backend = DjangoCacheBackend(getattr(settings, 'AI_CACHE_ALIAS', 'default'))
+    elif backend_name == 'memory':
+        backend = InMemoryCacheBackend(getattr(settings, 'AI_CACHE_MAX_ENTRIES', 1024))
+    else:
+        raise ValueError(f"Unknown AI_CACHE_BACKEND: {backend_name}")
+
+    return ProfileResponseCache(backend, ttl=ttl)
+
+
+def build_chat_cache() -> Optional[SemanticAnswerCache]:
+    """Build the chatbot answer cache configured by the AI_CHAT_CACHE_* settings"""
+    from django.conf import settings
+
+    ttl = getattr(settings, 'AI_CHAT_CACHE_TTL', 1800)
+    if ttl <= 0:
+        return None
+    return SemanticAnswerCache(
+        ttl=ttl,
+        max_entries=getattr(settings, 'AI_CHAT_CACHE_MAX_ENTRIES', 2048),
+        threshold=getattr(settings, 'AI_CHAT_CACHE_THRESHOLD', 0.85)
+    )
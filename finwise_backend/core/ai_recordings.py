@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import logging
+import math
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .ai_backends import StubModel
+
+logger = logging.getLogger(__name__)
+
+LATENCY_MODES = ('recorded', 'synthetic', 'none')
+
+# Synthetic latency when nothing has been recorded yet: lognormal median/sigma
+DEFAULT_MEDIAN = 1.5  # seconds
+DEFAULT_SIGMA = 0.5
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:32]
+
+
+class RecordingStore:
+    """On-disk prompt -> (response, latency) store.
+
+    Rows are keyed by a prompt hash with the response zlib-compressed, so the
+    file stays small; everything is loaded into memory on open and lookups
+    never touch SQLite.
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[str, float, int]] = {}
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS llm_recordings (key TEXT PRIMARY KEY, response BLOB NOT NULL, "
+            "latency REAL NOT NULL, chunks INTEGER NOT NULL, recorded_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        for key, response, latency, chunks in self._db.execute(
+            "SELECT key, response, latency, chunks FROM llm_recordings"
+        ):
+            self._entries[key] = (zlib.decompress(response).decode('utf-8'), latency, chunks)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, prompt: str) -> Optional[Tuple[str, float, int]]:
+        """(text, latency seconds, stream chunk count) or None"""
+        return self._entries.get(prompt_key(prompt))
+
+    def add(self, prompt: str, text: str, latency: float, chunks: int = 1):
+        key = prompt_key(prompt)
+        with self._lock:
+            self._entries[key] = (text, latency, chunks)
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_recordings (key, response, latency, chunks, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, zlib.compress(text.encode('utf-8'), 9), latency, chunks, time.time())
+            )
+            self._db.commit()
+
+    def latencies(self) -> List[float]:
+        with self._lock:
+            return [latency for _, latency, _ in self._entries.values()]
+
+    def latency_fit(self) -> Tuple[float, float]:
+        """Lognormal (median, sigma) of the recorded latencies"""
+        logs = [math.log(latency) for latency in self.latencies() if latency > 0]
+        if len(logs) < 2:
+            return DEFAULT_MEDIAN, DEFAULT_SIGMA
+        mean = sum(logs) / len(logs)
+        sigma = math.sqrt(sum((x - mean) ** 2 for x in logs) / (len(logs) - 1))
+        return math.exp(mean), sigma
+
+
+class RecordingModel:
+    """Wraps a live model and records every completed response, with its latency, into a store"""
+
+    def __init__(self, model: Any, store: RecordingStore):
+        self.model = model
+        self.store = store
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        started = time.monotonic()
+        response = self.model.generate_content(prompt, stream=stream, **kwargs)
+        if stream:
+            return self._record_stream(prompt, response, started)
+        self.store.add(prompt, response.text, time.monotonic() - started)
+        return response
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, **kwargs):
+        started = time.monotonic()
+        response = await self.model.generate_content_async(prompt, stream=stream, **kwargs)
+        if stream:
+            return self._arecord_stream(prompt, response, started)
+        self.store.add(prompt, response.text, time.monotonic() - started)
+        return response
+
+    def _record_stream(self, prompt: str, response, started: float) -> Iterator[Any]:
+        parts = []
+        for chunk in response:
+            parts.append(chunk.text)
+            yield chunk
+        # Only streams read to the end are recorded
+        self.store.add(prompt, ''.join(parts), time.monotonic() - started, len(parts))
+
+    async def _arecord_stream(self, prompt: str, response, started: float):
+        parts = []
+        async for chunk in response:
+            parts.append(chunk.text)
+            yield chunk
+        self.store.add(prompt, ''.join(parts), time.monotonic() - started, len(parts))
+
+
+class ReplayModel:
+    """Offline backend answering from a RecordingStore with realistic latency.
+
+    latency 'recorded' sleeps for the prompt's recorded latency, 'synthetic'
+    draws from a lognormal fitted to all recordings (seeded by the prompt, so
+    runs repeat), 'none' answers immediately; `scale` multiplies the result.
+    Prompts that were never recorded get the stub answer with synthetic
+    latency, or raise with on_miss='error'. Like the SDK, a call gives up
+    with TimeoutError once request_options['timeout'] has passed.
+    """
+
+    def __init__(self, store: RecordingStore, latency: str = 'recorded', scale: float = 1.0, on_miss: str = 'stub'):
+        if latency not in LATENCY_MODES:
+            raise ValueError(f"latency must be one of {', '.join(LATENCY_MODES)}")
+        self.store = store
+        self.latency = latency
+        self.scale = scale
+        self.on_miss = on_miss
+        self.median, self.sigma = store.latency_fit()
+        self.stub = StubModel()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str, stream: bool = False, request_options=None, **kwargs):
+        text, delay, chunks = self._lookup(prompt)
+        timeout = (request_options or {}).get('timeout')
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError('Deadline exceeded')
+        if stream:
+            return self._stream(text, delay, chunks)
+        time.sleep(delay)
+        return SimpleNamespace(text=text)
+
+    async def generate_content_async(self, prompt: str, stream: bool = False, request_options=None, **kwargs):
+        text, delay, chunks = self._lookup(prompt)
+        timeout = (request_options or {}).get('timeout')
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError('Deadline exceeded')
+        if stream:
+            return self._astream(text, delay, chunks)
+        await asyncio.sleep(delay)
+        return SimpleNamespace(text=text)
+
+    def _lookup(self, prompt: str) -> Tuple[str, float, int]:
+        entry = self.store.get(prompt)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            if self.on_miss == 'error':
+                raise LookupError('No recorded response for prompt')
+            text, latency, chunks = self.stub.answer(prompt), None, 2
+        else:
+            text, latency, chunks = entry
+        if self.latency == 'none':
+            delay = 0.0
+        elif self.latency == 'recorded' and latency is not None:
+            delay = latency
+        else:
+            rng = random.Random(prompt_key(prompt))
+            delay = self.median * math.exp(self.sigma * rng.gauss(0, 1))
+        return text, delay * self.scale, max(chunks, 1)
+
+    @staticmethod
+    def _parts(text: str, chunks: int) -> List[str]:
+        size = max(math.ceil(len(text) / chunks), 1)
+        return [text[i:i + size] for i in range(0, len(text), size)] or ['']
+
+    def _stream(self, text: str, delay: float, chunks: int) -> Iterator[Any]:
+        parts = self._parts(text, chunks)
+        for part in parts:
+            time.sleep(delay / len(parts))
+            yield SimpleNamespace(text=part)
+
+    async def _astream(self, text: str, delay: float, chunks: int):
+        parts = self._parts(text, chunks)
+        for part in parts:
+            await asyncio.sleep(delay / len(parts))
+            yield SimpleNamespace(text=part)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {
+            'recordings': len(self.store),
+            'hits': hits,
+            'misses': misses,
+            'latency': self.latency,
+            'median_ms': round(self.median * 1000, 1),
+            'sigma': round(self.sigma, 3),
+        }
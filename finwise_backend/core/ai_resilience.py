@@ -0,0 +1,276 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+logger = logging.getLogger(__name__)
+
+# Monotonic time by which the current request must have answered
+_request_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('ai_request_deadline', default=None)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left in the current request's budget, None outside a request"""
+    deadline = _request_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class AIDeadlineMiddleware:
+    """Starts each request's AI time budget (settings.AI_REQUEST_BUDGET seconds)"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        from django.conf import settings
+
+        self.get_response = get_response
+        self.budget = getattr(settings, 'AI_REQUEST_BUDGET', 25.0)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _request_deadline.set(time.monotonic() + self.budget)
+        try:
+            return self.get_response(request)
+        finally:
+            _request_deadline.reset(token)
+
+    async def __acall__(self, request):
+        token = _request_deadline.set(time.monotonic() + self.budget)
+        try:
+            return await self.get_response(request)
+        finally:
+            _request_deadline.reset(token)
+
+
+class CircuitBreaker:
+    """Fails fast after `failure_threshold` consecutive errors; lets one probe through after `reset_timeout`"""
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    raise CircuitOpenError('Gemini circuit is open')
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError('Gemini circuit is half-open, probe in flight')
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def release(self):
+        """End a probe that neither succeeded nor failed (e.g. an abandoned stream)"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Gemini circuit opened after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Recent successful call latencies"""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < max(min_samples, 1):
+            return None
+        return samples[min(int(len(samples) * q / 100), len(samples) - 1)]
+
+
+class ResilientCaller:
+    """Runs LLM calls under a deadline, a circuit breaker and optional hedging.
+
+    Each call gets min(timeout, remaining request budget) seconds. With
+    ``hedge`` on, a second identical request is sent once the first has run
+    past the recent p95 latency (or failed), and whichever succeeds first wins.
+    Errors, timeouts and an open circuit raise, so callers fall back as before.
+    """
+
+    def __init__(self, executor: Executor, timeout: float = 10.0, breaker: Optional[CircuitBreaker] = None,
+                 hedge: bool = False, hedge_min_samples: int = 20, min_call_time: float = 0.5):
+        self.executor = executor
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.min_call_time = min_call_time
+        self.latency = LatencyTracker()
+        self.hedges = 0
+
+    def call_timeout(self) -> float:
+        timeout = self.timeout
+        remaining = remaining_budget()
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+        if timeout < self.min_call_time:
+            raise DeadlineExceeded('Request budget exhausted before the Gemini call')
+        return timeout
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.hedge:
+            return None
+        return self.latency.percentile(95, self.hedge_min_samples)
+
+    def call(self, fn: Callable[[float], Any]) -> Any:
+        """fn(timeout) in the executor, hedged; returns the first successful result"""
+        timeout = self.call_timeout()
+        self.breaker.before_call()
+        started = time.monotonic()
+        deadline = started + timeout
+        delay = self.hedge_delay()
+        pending = {self.executor.submit(fn, timeout)}
+        hedged = False
+        error: Optional[BaseException] = None
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            wait_for = deadline - now
+            if delay is not None and not hedged:
+                wait_for = min(wait_for, max(started + delay - now, 0.0))
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    self._succeeded(started)
+                    return future.result()
+                error = future.exception()
+            if delay is not None and not hedged and (not pending or time.monotonic() - started >= delay):
+                hedged = True
+                self.hedges += 1
+                pending.add(self.executor.submit(fn, max(deadline - time.monotonic(), 0.0)))
+        for future in pending:
+            future.cancel()
+        self.breaker.record_failure()
+        if error is not None and not pending:
+            raise error
+        raise DeadlineExceeded(f'Gemini call exceeded {timeout:.1f}s')
+
+    async def acall(self, fn: Callable[[float], Awaitable[Any]]) -> Any:
+        """Async variant of call(): fn(timeout) returns an awaitable"""
+        timeout = self.call_timeout()
+        self.breaker.before_call()
+        started = time.monotonic()
+        deadline = started + timeout
+        delay = self.hedge_delay()
+        pending = {asyncio.ensure_future(fn(timeout))}
+        hedged = False
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                wait_for = deadline - now
+                if delay is not None and not hedged:
+                    wait_for = min(wait_for, max(started + delay - now, 0.0))
+                done, pending = await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self._succeeded(started)
+                        return task.result()
+                    error = task.exception()
+                if delay is not None and not hedged and (not pending or time.monotonic() - started >= delay):
+                    hedged = True
+                    self.hedges += 1
+                    pending.add(asyncio.ensure_future(fn(max(deadline - time.monotonic(), 0.0))))
+        finally:
+            for task in pending:
+                task.cancel()
+        self.breaker.record_failure()
+        if error is not None and not pending:
+            raise error
+        raise DeadlineExceeded(f'Gemini call exceeded {timeout:.1f}s')
+
+    @contextmanager
+    def guard(self) -> Iterator[float]:
+        """Breaker and deadline for calls that cannot be run through call() (streams); yields the timeout"""
+        timeout = self.call_timeout()
+        self.breaker.before_call()
+        started = time.monotonic()
+        try:
+            yield timeout
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self._succeeded(started)
+
+    def _succeeded(self, started: float):
+        self.latency.add(time.monotonic() - started)
+        self.breaker.record_success()
+
+    def stats(self):
+        return {
+            'circuit': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            'p95_latency_ms': round((self.latency.percentile(95) or 0.0) * 1000, 1),
+            'hedged_requests': self.hedges,
+        }
+
+
+def build_resilient_caller(executor: Executor) -> ResilientCaller:
+    """Build the caller configured by the GEMINI_TIMEOUT / AI_BREAKER_* / AI_HEDGE_* settings"""
+    from django.conf import settings
+
+    return ResilientCaller(
+        executor,
+        timeout=getattr(settings, 'GEMINI_TIMEOUT', 10.0),
+        breaker=CircuitBreaker(
+            failure_threshold=getattr(settings, 'AI_BREAKER_FAILURES', 5),
+            reset_timeout=getattr(settings, 'AI_BREAKER_RESET', 30.0)
+        ),
+        hedge=getattr(settings, 'AI_HEDGE_REQUESTS', False)
+    )
@@ -1,53 +1,108 @@
 import os
 import json
-import google.generativeai as genai
-from typing import Dict, List, Optional, Any
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Any, Tuple
 import logging
+import threading
+
+from .ai_backends import create_model
+from .ai_resilience import build_resilient_caller
+from .conditional import mark_degraded
+from .ai_cache import ProfileResponseCache, SemanticAnswerCache, build_chat_cache, build_response_cache
 
 logger = logging.getLogger(__name__)
 
+SENTENCE_TERMINATORS = '.!?'
+EMPTY_RESPONSE = "I'm sorry, I couldn't generate a response at this time. Please try again."
+
+def request_options(timeout: Optional[float]) -> Dict[str, Any]:
+    """SDK keyword arguments for a call deadline; none at all without one"""
+    return {'request_options': {'timeout': timeout}} if timeout else {}
+
+class StreamingResponseCleaner:
+    """Incremental version of GeminiAIService._clean_response for streamed text.
+
+    Text is released one complete sentence run at a time; whatever follows
+    the last sentence terminator is held back until more text arrives, and
+    an unfinished trailing sentence is dropped when the stream ends.
+    """
+    
+    def __init__(self):
+        self._buffer = ''
+        self._started = False
+    
+    @property
+    def started(self) -> bool:
+        """Whether any text has been emitted yet"""
+        return self._started
+    
+    def feed(self, text: str) -> str:
+        """Add streamed text and return the part that is now safe to emit"""
+        self._buffer += text
+        end = max(self._buffer.rfind(c) for c in SENTENCE_TERMINATORS) + 1
+        if end == 0:
+            return ''
+        ready, self._buffer = self._buffer[:end], self._buffer[end:]
+        return self._emit(ready)
+    
+    def finish(self) -> str:
+        """Flush at end of stream, dropping an incomplete final sentence"""
+        tail, self._buffer = self._buffer, ''
+        if self._started:
+            return ''
+        if not tail.strip():
+            return EMPTY_RESPONSE
+        return self._emit(tail.rstrip())
+    
+    def _emit(self, text: str) -> str:
+        text = text.replace('\n\n', '\n')
+        if not self._started:
+            text = text.lstrip()
+            self._started = bool(text)
+        return text
+
 class GeminiAIService:
     """AI service using Google Gemini for financial recommendations"""
     
-    def __init__(self):
-        # Get Gemini API key
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
+    def __init__(self, response_cache: Optional[ProfileResponseCache] = None,
+                 chat_cache: Optional[SemanticAnswerCache] = None, model: Any = None):
+        # Cache for profile-derived responses (tax, benefits)
+        self.response_cache = response_cache
+        # Shared answers for similar chat questions from similar profiles
+        self.chat_cache = chat_cache
         
-        # Configure Gemini
-        genai.configure(api_key=self.api_key)
+        # Async execution: 'native' uses the SDK's async client (needs a single
+        # long-lived event loop, i.e. ASGI); 'threads' runs the blocking call on
+        # a bounded thread pool and works under any server.
+        self.async_mode = os.getenv('GEMINI_ASYNC_MODE', 'native')
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('GEMINI_THREAD_POOL_SIZE', '32')),
+            thread_name_prefix='gemini'
+        )
+        # Deadlines, circuit breaker and hedging around every Gemini call
+        self.resilience = build_resilient_caller(self._executor)
         
-        # Initialize Gemini model
-        try:
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-            logger.info("Gemini AI service initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize Gemini: {e}")
-            raise
+        # Text generation backend (settings.AI_BACKEND): 'gemini', or 'stub' to run offline
+        if model is None:
+            from django.conf import settings
+            model = create_model(getattr(settings, 'AI_BACKEND', 'gemini'))
+        self.model = model
     
     def generate_chat_response(self, user_message: str, user_profile: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a conversational response for the chatbot"""
+        cached = self._get_cached_chat_response(user_message, user_profile)
+        if cached is not None:
+            return cached
+        
         try:
             # Create context-aware prompt
             prompt = self._create_chat_prompt(user_message, user_profile)
             
             # Generate response using Gemini
             logger.info(f"Generating chat response with Gemini")
-            response = self.model.generate_content(prompt)
-            
-            # Extract the generated text
-            generated_text = response.text.strip()
-            logger.info(f"Generated text: {generated_text[:200]}...")
-            
-            # Clean up the response
-            cleaned_response = self._clean_response(generated_text)
-            
-            return {
-                "response": cleaned_response,
-                "suggestions": self._generate_suggestions(user_message),
-                "confidence": 0.9
-            }
+            generated_text = self._generate_text(prompt)
+            return self._build_chat_response(generated_text, user_message, user_profile)
             
         except Exception as e:
             logger.error(f"Error generating chat response: {e}")
@@ -55,45 +110,293 @@ class GeminiAIService:
     
     def generate_tax_recommendations(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
         """Generate tax savings recommendations"""
+        cached = self._get_cached_response('tax', user_profile)
+        if cached is not None:
+            return cached
+        
         try:
             # Create tax-specific prompt
             prompt = self._create_tax_prompt(user_profile)
             
             # Generate response using Gemini
             logger.info(f"Generating tax recommendations with Gemini")
-            response = self.model.generate_content(prompt)
-            
-            generated_text = response.text.strip()
-            cleaned_response = self._clean_response(generated_text)
-            
-            # Parse the response into structured format
-            parsed_response = self._parse_tax_response(cleaned_response, user_profile)
-            logger.info(f"Parsed tax response: {parsed_response}")
-            return parsed_response
+            generated_text = self._generate_text(prompt)
+            return self._build_tax_response(generated_text, user_profile)
             
         except Exception as e:
             logger.error(f"Error generating tax recommendations: {e}")
+            mark_degraded()
             return self._get_fallback_tax_recommendations(user_profile)
     
-    def generate_benefits_recommendations(self, user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate government benefits recommendations"""
+    def generate_benefits_recommendations(self, user_profile: Dict[str, Any],
+                                          eligible_benefits: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Generate government benefits recommendations.
+
+        With ``eligible_benefits`` (from core.eligibility) the model only
+        rephrases those schemes for the user; it cannot add or drop any.
+        """
+        cached = self._get_cached_response('benefits', user_profile)
+        if cached is not None:
+            return cached
+        
         try:
             # Create benefits-specific prompt
-            prompt = self._create_benefits_prompt(user_profile)
+            prompt = self._create_benefits_prompt(user_profile, eligible_benefits)
             
             # Generate response using Gemini
             logger.info(f"Generating benefits recommendations with Gemini")
-            response = self.model.generate_content(prompt)
+            generated_text = self._generate_text(prompt)
+            return self._build_benefits_response(generated_text, user_profile, eligible_benefits)
             
-            generated_text = response.text.strip()
-            cleaned_response = self._clean_response(generated_text)
+        except Exception as e:
+            logger.error(f"Error generating benefits recommendations: {e}")
+            mark_degraded()
+            return eligible_benefits if eligible_benefits is not None else self._get_fallback_benefits(user_profile)
+    
+    async def agenerate_chat_response(self, user_message: str, user_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of generate_chat_response"""
+        cached = self._get_cached_chat_response(user_message, user_profile)
+        if cached is not None:
+            return cached
+        
+        try:
+            prompt = self._create_chat_prompt(user_message, user_profile)
+            logger.info(f"Generating chat response with Gemini (async)")
+            generated_text = await self._agenerate_text(prompt)
+            return self._build_chat_response(generated_text, user_message, user_profile)
             
-            # Parse the response into structured format
-            return self._parse_benefits_response(cleaned_response, user_profile)
+        except Exception as e:
+            logger.error(f"Error generating chat response: {e}")
+            return self._get_fallback_chat_response(user_message, user_profile)
+    
+    async def agenerate_tax_recommendations(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Async variant of generate_tax_recommendations"""
+        cached = self._get_cached_response('tax', user_profile)
+        if cached is not None:
+            return cached
+        
+        try:
+            prompt = self._create_tax_prompt(user_profile)
+            logger.info(f"Generating tax recommendations with Gemini (async)")
+            generated_text = await self._agenerate_text(prompt)
+            return self._build_tax_response(generated_text, user_profile)
+            
+        except Exception as e:
+            logger.error(f"Error generating tax recommendations: {e}")
+            mark_degraded()
+            return self._get_fallback_tax_recommendations(user_profile)
+    
+    async def agenerate_benefits_recommendations(self, user_profile: Dict[str, Any],
+                                                 eligible_benefits: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Async variant of generate_benefits_recommendations"""
+        cached = self._get_cached_response('benefits', user_profile)
+        if cached is not None:
+            return cached
+        
+        try:
+            prompt = self._create_benefits_prompt(user_profile, eligible_benefits)
+            logger.info(f"Generating benefits recommendations with Gemini (async)")
+            generated_text = await self._agenerate_text(prompt)
+            return self._build_benefits_response(generated_text, user_profile, eligible_benefits)
             
         except Exception as e:
             logger.error(f"Error generating benefits recommendations: {e}")
-            return self._get_fallback_benefits(user_profile)
+            mark_degraded()
+            return eligible_benefits if eligible_benefits is not None else self._get_fallback_benefits(user_profile)
+    
+    def stream_chat_response(self, user_message: str, user_profile: Dict[str, Any]) -> Iterator[Tuple[str, Any]]:
+        """Stream a chat response as (event, data) pairs: 'chunk'*, 'suggestions', 'done'"""
+        cached = self._get_cached_chat_response(user_message, user_profile)
+        if cached is not None:
+            yield 'chunk', cached['response']
+            yield 'suggestions', cached['suggestions']
+            yield 'done', {'confidence': cached['confidence']}
+            return
+        
+        cleaner = StreamingResponseCleaner()
+        confidence = 0.9
+        streamed = []
+        try:
+            prompt = self._create_chat_prompt(user_message, user_profile)
+            logger.info(f"Streaming chat response with Gemini")
+            with self.resilience.guard() as timeout:
+                for chunk in self.model.generate_content(prompt, stream=True, **request_options(timeout)):
+                    text = cleaner.feed(chunk.text)
+                    if text:
+                        streamed.append(text)
+                        yield 'chunk', text
+            tail = cleaner.finish()
+            if tail:
+                streamed.append(tail)
+                yield 'chunk', tail
+            text = ''.join(streamed)
+            if self.chat_cache is not None and text != EMPTY_RESPONSE:
+                self.chat_cache.set(user_message, user_profile, {
+                    "response": text,
+                    "suggestions": self._generate_suggestions(user_message),
+                    "confidence": confidence
+                }, text)
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {e}")
+            if cleaner.started:
+                confidence = 0.5
+            else:
+                fallback = self._get_fallback_chat_response(user_message, user_profile)
+                confidence = fallback['confidence']
+                yield 'chunk', fallback['response']
+        
+        yield 'suggestions', self._generate_suggestions(user_message)
+        yield 'done', {'confidence': confidence}
+    
+    async def astream_chat_response(self, user_message: str, user_profile: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        """Async variant of stream_chat_response"""
+        cached = self._get_cached_chat_response(user_message, user_profile)
+        if cached is not None:
+            yield 'chunk', cached['response']
+            yield 'suggestions', cached['suggestions']
+            yield 'done', {'confidence': cached['confidence']}
+            return
+        
+        cleaner = StreamingResponseCleaner()
+        confidence = 0.9
+        streamed = []
+        try:
+            prompt = self._create_chat_prompt(user_message, user_profile)
+            logger.info(f"Streaming chat response with Gemini (async)")
+            with self.resilience.guard() as timeout:
+                async for chunk_text in self._astream_text(prompt, timeout):
+                    text = cleaner.feed(chunk_text)
+                    if text:
+                        streamed.append(text)
+                        yield 'chunk', text
+            tail = cleaner.finish()
+            if tail:
+                streamed.append(tail)
+                yield 'chunk', tail
+            text = ''.join(streamed)
+            if self.chat_cache is not None and text != EMPTY_RESPONSE:
+                self.chat_cache.set(user_message, user_profile, {
+                    "response": text,
+                    "suggestions": self._generate_suggestions(user_message),
+                    "confidence": confidence
+                }, text)
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {e}")
+            if cleaner.started:
+                confidence = 0.5
+            else:
+                fallback = self._get_fallback_chat_response(user_message, user_profile)
+                confidence = fallback['confidence']
+                yield 'chunk', fallback['response']
+        
+        yield 'suggestions', self._generate_suggestions(user_message)
+        yield 'done', {'confidence': confidence}
+    
+    async def _astream_text(self, prompt: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Yield streamed Gemini text chunks without blocking the event loop"""
+        options = request_options(timeout)
+        if self.async_mode == 'native' and hasattr(self.model, 'generate_content_async'):
+            response = await self.model.generate_content_async(prompt, stream=True, **options)
+            async for chunk in response:
+                yield chunk.text
+            return
+        loop = asyncio.get_running_loop()
+        chunks = await loop.run_in_executor(
+            self._executor,
+            lambda: iter(self.model.generate_content(prompt, stream=True, **options))
+        )
+        done = object()
+        while True:
+            chunk = await loop.run_in_executor(self._executor, next, chunks, done)
+            if chunk is done:
+                return
+            yield chunk.text
+    
+    def _generate_text(self, prompt: str) -> str:
+        """Run a blocking Gemini completion (under the deadline and breaker) and return the stripped text"""
+        return self.resilience.call(lambda timeout: self._complete(prompt, timeout))
+    
+    def _complete(self, prompt: str, timeout: Optional[float] = None) -> str:
+        response = self.model.generate_content(prompt, **request_options(timeout))
+        return response.text.strip()
+    
+    async def _agenerate_text(self, prompt: str) -> str:
+        """Run a Gemini completion without blocking the event loop"""
+        if self.async_mode == 'native' and hasattr(self.model, 'generate_content_async'):
+            async def complete(timeout):
+                response = await self.model.generate_content_async(prompt, **request_options(timeout))
+                return response.text.strip()
+        else:
+            loop = asyncio.get_running_loop()
+            
+            def complete(timeout):
+                return loop.run_in_executor(self._executor, self._complete, prompt, timeout)
+        return await self.resilience.acall(complete)
+    
+    def _build_chat_response(self, generated_text: str, user_message: str,
+                             user_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Turn generated chat text into the chatbot response payload (and cache it)"""
+        logger.info(f"Generated text: {generated_text[:200]}...")
+        
+        # Clean up the response
+        cleaned_response = self._clean_response(generated_text)
+        
+        response = {
+            "response": cleaned_response,
+            "suggestions": self._generate_suggestions(user_message),
+            "confidence": 0.9
+        }
+        if self.chat_cache is not None and user_profile is not None and cleaned_response != EMPTY_RESPONSE:
+            self.chat_cache.set(user_message, user_profile, response, cleaned_response)
+        return response
+    
+    def _get_cached_chat_response(self, user_message: str, user_profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Answer to a similar question from a similar profile, if one is cached"""
+        if self.chat_cache is None:
+            return None
+        cached = self.chat_cache.get(user_message, user_profile)
+        if cached is not None:
+            logger.info("Serving chat response from cache")
+        return cached
+    
+    def _build_tax_response(self, generated_text: str, user_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse generated tax text into structured recommendations and cache them"""
+        cleaned_response = self._clean_response(generated_text)
+        
+        # Parse the response into structured format
+        parsed_response = self._parse_tax_response(cleaned_response, user_profile)
+        logger.info(f"Parsed tax response: {parsed_response}")
+        self._cache_response('tax', user_profile, parsed_response)
+        return parsed_response
+    
+    def _build_benefits_response(self, generated_text: str, user_profile: Dict[str, Any],
+                                 eligible_benefits: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Parse generated benefits text into structured recommendations and cache them"""
+        if eligible_benefits is not None:
+            # The phrasing reply is a JSON array; sentence cleanup would cut it short
+            phrased = self._parse_benefits_response(generated_text, user_profile)
+            parsed_response = self._merge_benefits_phrasing(eligible_benefits, phrased)
+        else:
+            cleaned_response = self._clean_response(generated_text)
+            
+            # Parse the response into structured format
+            parsed_response = self._parse_benefits_response(cleaned_response, user_profile)
+        self._cache_response('benefits', user_profile, parsed_response)
+        return parsed_response
+    
+    def _get_cached_response(self, kind: str, user_profile: Dict[str, Any]) -> Optional[Any]:
+        """Look up a previously generated response for an identical profile"""
+        if self.response_cache is None:
+            return None
+        cached = self.response_cache.get(kind, user_profile)
+        if cached is not None:
+            logger.info(f"Serving {kind} recommendations from cache")
+        return cached
+    
+    def _cache_response(self, kind: str, user_profile: Dict[str, Any], response: Any) -> None:
+        """Store a successfully generated response (fallbacks are never cached)"""
+        if self.response_cache is not None:
+            self.response_cache.set(kind, user_profile, response)
     
     def _create_chat_prompt(self, user_message: str, user_profile: Dict[str, Any]) -> str:
         """Create a context-aware prompt for chat"""
@@ -162,8 +465,12 @@ Focus on Indian tax laws and products like:
 Format as structured recommendations with estimated savings amounts in Indian Rupees."""
         return prompt
     
-    def _create_benefits_prompt(self, user_profile: Dict[str, Any]) -> str:
+    def _create_benefits_prompt(self, user_profile: Dict[str, Any],
+                                eligible_benefits: Optional[List[Dict[str, Any]]] = None) -> str:
         """Create a prompt for benefits recommendations"""
+        if eligible_benefits is not None:
+            return self._create_benefits_phrasing_prompt(user_profile, eligible_benefits)
+        
         income = user_profile.get('income', 0)
         age = user_profile.get('age', 30)
         occupation = user_profile.get('occupation', '')
@@ -205,7 +512,7 @@ Recommend programs they likely qualify for based on their profile."""
     def _clean_response(self, generated_text: str) -> str:
         """Clean up the generated response"""
         if not generated_text:
-            return "I'm sorry, I couldn't generate a response at this time. Please try again."
+            return EMPTY_RESPONSE
         
         # Clean up any artifacts
         response = generated_text.strip()
@@ -260,6 +567,45 @@ Recommend programs they likely qualify for based on their profile."""
             }
         }
     
+    def _create_benefits_phrasing_prompt(self, user_profile: Dict[str, Any],
+                                         eligible_benefits: List[Dict[str, Any]]) -> str:
+        """Prompt that only rewords already-decided benefits for the user"""
+        schemes = [
+            {"name": b["name"], "description": b["description"], "eligibility_reason": b["eligibility_reason"]}
+            for b in eligible_benefits
+        ]
+        
+        prompt = f"""You are a government benefits expert for Indian schemes. The user below is eligible for exactly these schemes:
+
+{json.dumps(schemes, ensure_ascii=False, indent=2)}
+
+Profile:
+- Income: ₹{user_profile.get('income', 0):,} per year
+- Age: {user_profile.get('age', 30)} years old
+- Occupation: {user_profile.get('occupation', '')}
+- Location: {user_profile.get('city', '')}, {user_profile.get('state', '')}
+- Dependents: {user_profile.get('dependents', 0)}
+
+Rewrite each "description" and "eligibility_reason" in one short, friendly sentence that explains why it suits this user.
+Return only a JSON array with the same schemes in the same order, each with "name", "description" and "eligibility_reason". Do not add or remove schemes."""
+        return prompt
+    
+    def _merge_benefits_phrasing(self, eligible_benefits: List[Dict[str, Any]],
+                                 phrased: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Take only reworded text from the model; eligibility, amounts and links stay as decided"""
+        phrasing = {
+            item.get("name"): item for item in phrased if isinstance(item, dict)
+        }
+        merged = []
+        for benefit in eligible_benefits:
+            benefit = dict(benefit)
+            item = phrasing.get(benefit["name"], {})
+            for field in ("description", "eligibility_reason"):
+                if isinstance(item.get(field), str) and item[field].strip():
+                    benefit[field] = item[field].strip()
+            merged.append(benefit)
+        return merged
+    
     def _parse_benefits_response(self, response: str, user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Parse benefits response into structured format"""
         try:
@@ -407,5 +753,43 @@ Recommend programs they likely qualify for based on their profile."""
             }
         ]
 
+class LazyAIService:
+    """Module-level stand-in that builds the real service on first use.
+
+    Importing views no longer configures the SDK or needs GEMINI_API_KEY;
+    the first attribute access (or warm(), e.g. from a server hook) builds
+    the service exactly once, even under concurrent first requests.
+    Assigning attributes (e.g. swapping .model) goes to the real service.
+    """
+    
+    def __init__(self, factory):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+    
+    def warm(self) -> GeminiAIService:
+        """Build the service now if it has not been built yet"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, '_instance', instance)
+        return instance
+    
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+    
+    def __getattr__(self, name):
+        return getattr(self.warm(), name)
+    
+    def __setattr__(self, name, value):
+        setattr(self.warm(), name, value)
+
+def build_ai_service() -> GeminiAIService:
+    return GeminiAIService(response_cache=build_response_cache(), chat_cache=build_chat_cache())
+
 # Global instance
-ai_service = GeminiAIService() 
\ No newline at end of file
+ai_service = LazyAIService(build_ai_service)
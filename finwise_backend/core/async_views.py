@@ -0,0 +1,170 @@
+"""
+Async counterparts of the LLM-backed API views.
+
+Served when ASYNC_AI_VIEWS is enabled and the app runs under ASGI
+(finwise_backend/asgi.py). While a Gemini call is in flight the worker's
+event loop keeps serving other requests instead of blocking the process.
+"""
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework.views import APIView
+
+from .models import UserProfile
+from .ai_service import ai_service
+from .conditional import conditional_on_user_data, mark_degraded
+from .eligibility import eligibility_engine
+from .intents import OPEN_INTENT, chat_intent_router
+from .views import (
+    BenefitsView, ChatbotView, TaxSavingsView, build_benefits_profile_dict,
+    build_chat_profile_dict, build_tax_profile_dict, generate_enhanced_tax_tips,
+    sse_event, sse_response
+)
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={'ensure_ascii': False})
+
+
+class AsyncAPIView(APIView):
+    """APIView whose handlers are coroutines.
+
+    DRF's own initial() runs (in a worker thread, since authenticators and
+    throttles query the database and cache), so authentication_classes,
+    permission_classes, throttle_classes and parsers apply exactly as on the
+    sync views; errors go through DRF's exception handler.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncChatbotView(AsyncAPIView):
+    permission_classes = ChatbotView.permission_classes
+    sync_view = ChatbotView()
+
+    async def post(self, request):
+        """Handle chatbot messages with Gemini AI"""
+        try:
+            user_message = request.data.get('message', '')
+            if not user_message:
+                return json_response({'error': 'Message is required'}, status=400)
+
+            # Get user profile for context
+            profile, _ = await UserProfile.objects.aget_or_create(user=request.user)
+            stream = request.query_params.get('stream') in ('1', 'true')
+
+            # Templated questions (tax slabs, savings progress...) are answered locally, without an LLM call
+            started = time.perf_counter()
+            intent, params = chat_intent_router.classify(user_message)
+            if intent != OPEN_INTENT:
+                local_response = self.sync_view.get_local_response(intent, params, profile)
+                chat_intent_router.record(intent, (time.perf_counter() - started) * 1000)
+                if stream:
+                    return sse_response(self.sync_view.stream_local_response(local_response))
+                return json_response(local_response)
+
+            # Stream the answer as server-sent events (?stream=1)
+            if stream:
+                return sse_response(self.stream_gemini_chat_response(user_message, profile, intent, started))
+
+            try:
+                ai_response = await ai_service.agenerate_chat_response(
+                    user_message, build_chat_profile_dict(profile)
+                )
+            except Exception as e:
+                print(f"Gemini chat error: {e}")
+                ai_response = self.sync_view.get_fallback_response(user_message, profile)
+            chat_intent_router.record(intent, (time.perf_counter() - started) * 1000)
+
+            return json_response({
+                'response': ai_response['response'],
+                'suggestions': ai_response.get('suggestions', []),
+                'confidence': ai_response.get('confidence', 0.8)
+            })
+
+        except Exception as e:
+            print(f"Chatbot error: {e}")
+            return json_response({
+                'response': "I'm having trouble processing your request right now. Please try again in a moment.",
+                'suggestions': ["Tax savings tips", "Investment advice", "Government benefits"],
+                'confidence': 0.5
+            }, status=500)
+
+    async def stream_gemini_chat_response(self, user_message, profile, intent=OPEN_INTENT, started=None):
+        """Relay Gemini's streamed answer as SSE: chunk*, suggestions, done"""
+        profile_dict = build_chat_profile_dict(profile)
+        try:
+            async for event, data in ai_service.astream_chat_response(user_message, profile_dict):
+                if event == 'chunk':
+                    data = {'text': data}
+                yield sse_event(event, data)
+        finally:
+            if started is not None:
+                chat_intent_router.record(intent, (time.perf_counter() - started) * 1000)
+
+
+class AsyncTaxSavingsView(AsyncAPIView):
+    permission_classes = TaxSavingsView.permission_classes
+    sync_view = TaxSavingsView()
+
+    @conditional_on_user_data
+    async def get(self, request):
+        profile, _ = await UserProfile.objects.aget_or_create(user=request.user)
+
+        try:
+            tax_analysis = await ai_service.agenerate_tax_recommendations(build_tax_profile_dict(profile))
+        except Exception as e:
+            print(f"Gemini Tax API error: {e}")
+            mark_degraded()
+            tax_analysis = generate_enhanced_tax_tips(profile)
+
+        return json_response(self.sync_view.build_payload(profile, tax_analysis))
+
+
+class AsyncBenefitsView(AsyncAPIView):
+    permission_classes = BenefitsView.permission_classes
+
+    @conditional_on_user_data
+    async def get(self, request):
+        profile, _ = await UserProfile.objects.aget_or_create(user=request.user)
+        benefits = await aget_benefits(profile)
+        return json_response({
+            'benefits': benefits
+        })
+
+
+async def aget_benefits(profile):
+    """Async counterpart of BenefitsView.get_benefits"""
+    benefits = eligibility_engine.match(profile)
+    if not settings.BENEFITS_AI_PHRASING:
+        return benefits
+
+    try:
+        return await ai_service.agenerate_benefits_recommendations(build_benefits_profile_dict(profile), benefits)
+    except Exception as e:
+        print(f"Gemini benefits error: {e}")
+        mark_degraded()
+        return benefits
@@ -1,114 +1,191 @@
 import requests
+import sqlite3
+import threading
 import time
-import random
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+GOOGLE_BOOKS_URL = "https://www.googleapis.com/books/v1/volumes"
+OPENLIBRARY_URL = "https://openlibrary.org/search.json"
+OPENLIBRARY_COVERS_URL = "https://covers.openlibrary.org/b/id"
+
+# "No cover anywhere" results are retried after this long
+NEGATIVE_TTL = 7 * 24 * 3600  # seconds
+
+
+def cover_key(title: str, author: str) -> str:
+    """Cache key for a book: normalized title and author"""
+    return f"{' '.join(title.lower().split())}|{' '.join(author.lower().split())}"
+
+
+class HostRateLimiter:
+    """Spaces requests to each host at least 1/rate seconds apart, across threads"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CoverCache:
+    """Persistent (title, author) -> cover URL store; an empty URL records "not found" """
+
+    def __init__(self, path: Optional[str], negative_ttl: int = NEGATIVE_TTL):
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Tuple[str, float]] = {}
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS book_covers "
+                "(key TEXT PRIMARY KEY, url TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            self._memory = {key: (url, fetched_at) for key, url, fetched_at in self._db.execute(
+                "SELECT key, url, fetched_at FROM book_covers"
+            )}
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached URL, '' for a fresh negative entry, None when unknown or expired"""
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None:
+            return None
+        url, fetched_at = entry
+        if not url and time.time() - fetched_at > self.negative_ttl:
+            return None
+        return url
+
+    def set(self, key: str, url: str):
+        fetched_at = time.time()
+        with self._lock:
+            self._memory[key] = (url, fetched_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO book_covers (key, url, fetched_at) VALUES (?, ?, ?)",
+                    (key, url, fetched_at)
+                )
+                self._db.commit()
+
 
 class BookCoverService:
-    """Service to fetch book cover images from multiple sources with fallbacks"""
-    
-    def __init__(self):
+    """Service to fetch book cover images from multiple sources with fallbacks.
+
+    Lookups share one pooled HTTP session, are rate limited per host and are
+    remembered on disk (including misses), so re-seeding never re-queries
+    the APIs. get_book_covers() resolves many books in parallel.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None, max_workers: Optional[int] = None,
+                 rate_limit: Optional[float] = None, google_books_url: str = GOOGLE_BOOKS_URL,
+                 openlibrary_url: str = OPENLIBRARY_URL, timeout: Tuple[float, float] = (3.05, 10)):
+        self.max_workers = max_workers or getattr(settings, 'BOOK_COVER_MAX_WORKERS', 8)
+        self.google_books_url = google_books_url
+        self.openlibrary_url = openlibrary_url
+        self.timeout = timeout
+        self.rate_limiter = HostRateLimiter(
+            rate_limit if rate_limit is not None else getattr(settings, 'BOOK_COVER_RATE_LIMIT', 5.0)
+        )
+        self.cache = CoverCache(cache_path if cache_path is not None else getattr(settings, 'BOOK_COVER_CACHE_PATH', None))
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.max_workers,
+            max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                              allowed_methods=['GET'])
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
         self.sources = [
             self._get_google_books_cover,  # Primary source - real book covers
             self._get_openlibrary_cover,   # Secondary source - OpenLibrary
             self._get_simple_placeholder   # Final fallback - simple text placeholder
         ]
-    
+
     def get_book_cover(self, title: str, author: str, genre: str = "Business & Management") -> str:
         """Get book cover from multiple sources with fallbacks"""
+        key = cover_key(title, author)
+        cover_url = self.cache.get(key)
+        if cover_url is None:
+            cover_url = self._fetch_cover(title, author, genre)
+            if cover_url is not None:  # Source errors are not cached
+                self.cache.set(key, cover_url)
+
+        # Final fallback to simple placeholder
+        return cover_url or self._get_simple_placeholder(title, author, genre)
+
+    def get_book_covers(self, books: Iterable[Tuple[str, str, str]]) -> List[str]:
+        """Covers for many (title, author, genre) tuples, looked up concurrently"""
+        books = list(books)
+        unique = {cover_key(title, author): (title, author, genre) for title, author, genre in reversed(books)}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            covers = dict(zip(unique, executor.map(lambda book: self.get_book_cover(*book), unique.values())))
+
+        return [covers[cover_key(title, author)] for title, author, genre in books]
+
+    def _fetch_cover(self, title: str, author: str, genre: str) -> Optional[str]:
+        """First cover URL any source finds, '' if none has one, None if a source failed"""
+        failed = False
         for source_func in self.sources[:-1]:  # Exclude simple placeholder as it's the final fallback
             try:
                 cover_url = source_func(title, author, genre)
                 if cover_url:
                     return cover_url
             except Exception as e:
-                print(f"Error fetching cover from {source_func.__name__}: {e}")
-                continue
-        
-        # Final fallback to simple placeholder
-        return self._get_simple_placeholder(title, author, genre)
-    
+                print(f"Error fetching cover from {source_func.__name__} for '{title}': {e}")
+                failed = True
+        return None if failed else ''
+
+    def _get_json(self, url: str, params: dict) -> Optional[dict]:
+        self.rate_limiter.wait(url)
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
     def _get_google_books_cover(self, title: str, author: str, genre: str) -> Optional[str]:
         """Get book cover from Google Books API (free tier) - Primary source"""
-        try:
-            # Try exact title + author first
-            search_query = f"{title} {author}".replace(' ', '+')
-            search_url = f"https://www.googleapis.com/books/v1/volumes?q={search_query}&maxResults=1"
-            
-            response = requests.get(search_url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('items') and len(data['items']) > 0:
-                    book = data['items'][0]
-                    if 'volumeInfo' in book and 'imageLinks' in book['volumeInfo']:
-                        cover_url = book['volumeInfo']['imageLinks'].get('thumbnail', '')
-                        if cover_url:
-                            # Convert to larger size for better quality
-                            cover_url = cover_url.replace('zoom=1', 'zoom=3')
-                            return cover_url
-            
-            # If exact match fails, try just title
-            search_query = title.replace(' ', '+')
-            search_url = f"https://www.googleapis.com/books/v1/volumes?q={search_query}&maxResults=3"
-            
-            response = requests.get(search_url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('items') and len(data['items']) > 0:
-                    # Find the best match
-                    for book in data['items']:
-                        if 'volumeInfo' in book and 'imageLinks' in book['volumeInfo']:
-                            cover_url = book['volumeInfo']['imageLinks'].get('thumbnail', '')
-                            if cover_url:
-                                # Convert to larger size
-                                cover_url = cover_url.replace('zoom=1', 'zoom=3')
-                                return cover_url
-            
-            time.sleep(0.2)  # Be respectful to the API
-            return None
-            
-        except Exception as e:
-            print(f"Google Books error for '{title}': {e}")
-            return None
-    
+        # Try exact title + author first, then just the title
+        for query, max_results in ((f"{title} {author}", 1), (title, 3)):
+            data = self._get_json(self.google_books_url, {'q': query, 'maxResults': max_results})
+            for book in (data or {}).get('items') or []:
+                cover_url = book.get('volumeInfo', {}).get('imageLinks', {}).get('thumbnail', '')
+                if cover_url:
+                    # Convert to larger size for better quality
+                    return cover_url.replace('zoom=1', 'zoom=3')
+        return None
+
     def _get_openlibrary_cover(self, title: str, author: str, genre: str) -> Optional[str]:
         """Get book cover from OpenLibrary API - Secondary source"""
-        try:
-            # Try exact title + author first
-            search_query = f"{title} {author}".replace(' ', '+')
-            search_url = f"https://openlibrary.org/search.json?title={search_query}&limit=3"
-            
-            response = requests.get(search_url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('docs') and len(data['docs']) > 0:
-                    # Find the best match
-                    for book in data['docs']:
-                        if 'cover_i' in book:
-                            cover_id = book['cover_i']
-                            cover_url = f"https://covers.openlibrary.org/b/id/{cover_id}-L.jpg"
-                            return cover_url
-            
-            # If exact match fails, try just title
-            search_query = title.replace(' ', '+')
-            search_url = f"https://openlibrary.org/search.json?title={search_query}&limit=3"
-            
-            response = requests.get(search_url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('docs') and len(data['docs']) > 0:
-                    for book in data['docs']:
-                        if 'cover_i' in book:
-                            cover_id = book['cover_i']
-                            cover_url = f"https://covers.openlibrary.org/b/id/{cover_id}-L.jpg"
-                            return cover_url
-            
-            time.sleep(0.2)  # Be respectful to the API
-            return None
-            
-        except Exception as e:
-            print(f"OpenLibrary error for '{title}': {e}")
-            return None
-    
+        # Try exact title + author first, then just the title
+        for query in (f"{title} {author}", title):
+            data = self._get_json(self.openlibrary_url, {'title': query, 'limit': 3})
+            for book in (data or {}).get('docs') or []:
+                if 'cover_i' in book:
+                    return f"{OPENLIBRARY_COVERS_URL}/{book['cover_i']}-L.jpg"
+        return None
+
     def _get_simple_placeholder(self, title: str, author: str, genre: str) -> str:
         """Generate a simple text-based placeholder as final fallback"""
         # Get genre-specific colors
@@ -132,12 +209,12 @@ class BookCoverService:
             'Innovation': '7c2d12',  # Brown
             'Business Model': '1e293b',  # Slate
         }
-        
+
         color = genre_colors.get(genre, '1f2937')
         title_words = title.split()[:3]  # Take first 3 words
         title_text = '+'.join(title_words)
-        
+
         return f"https://placehold.co/400x600/{color}/ffffff?text={title_text}&font=montserrat"
 
 # Global instance
-book_cover_service = BookCoverService() 
\ No newline at end of file
+book_cover_service = BookCoverService()
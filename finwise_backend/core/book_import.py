@@ -0,0 +1,113 @@
+import csv
+import json
+import random
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Book
+
+# Importable Book fields and how to parse them from CSV text / JSON values
+TEXT_FIELDS = [
+    'title', 'author', 'genre', 'sub_genre', 'description', 'isbn', 'cover_image_url', 'amazon_url',
+    'investment_level', 'financial_topics', 'difficulty_level',
+]
+FLOAT_FIELDS = ['rating', 'popularity_score']
+INT_FIELDS = ['pages', 'publication_year']
+DECIMAL_FIELDS = ['price']
+IMPORT_FIELDS = TEXT_FIELDS + FLOAT_FIELDS + INT_FIELDS + DECIMAL_FIELDS
+
+UNIQUE_FIELDS = ['title', 'author']
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def read_rows(path: Path, file_format: Optional[str] = None, skip: int = 0) -> Iterator[Tuple[int, dict]]:
+    """Stream (row_number, raw dict) from a CSV or JSONL file, skipping the first `skip` rows"""
+    file_format = file_format or ('jsonl' if path.suffix.lower() in ('.jsonl', '.ndjson') else 'csv')
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            rows = csv.DictReader(f)
+        else:
+            rows = (parse_json_line(line) for line in f if line.strip())
+        for number, row in enumerate(rows, start=1):
+            if number > skip:
+                yield number, row
+
+
+def parse_json_line(line: str) -> Optional[dict]:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None  # Reported as an invalid row by normalize_row
+
+
+def normalize_row(raw: Optional[dict]) -> Dict[str, object]:
+    """Book field values from one input row (unknown columns are ignored)"""
+    if not isinstance(raw, dict):
+        raise ImportRowError('Not a JSON object')
+    row = {}
+    for field in IMPORT_FIELDS:
+        value = raw.get(field)
+        if value is None or value == '':
+            continue
+        try:
+            if field in FLOAT_FIELDS:
+                value = float(value)
+            elif field in INT_FIELDS:
+                value = int(float(value))
+            elif field in DECIMAL_FIELDS:
+                value = Decimal(str(value)).quantize(Decimal('0.01'))
+            elif field == 'financial_topics' and isinstance(value, list):
+                value = json.dumps(value)
+            else:
+                value = str(value).strip()
+        except (TypeError, ValueError, InvalidOperation):
+            raise ImportRowError(f'Invalid {field}: {value!r}')
+        row[field] = value
+
+    if not row.get('title') or not row.get('author'):
+        raise ImportRowError('title and author are required')
+    if 'amazon_url' not in row:
+        row['amazon_url'] = f"https://www.amazon.com/s?k={row['title'].replace(' ', '+')}+{row['author'].replace(' ', '+')}"
+    return row
+
+
+def fill_sample_details(row: dict) -> dict:
+    """Price, pages, year and ISBN for the built-in sample books, stable across runs"""
+    rng = random.Random(f"{row['title']}|{row['author']}")
+    row.setdefault('price', Decimal(str(round(rng.uniform(10, 50), 2))))
+    row.setdefault('pages', rng.randint(200, 500))
+    row.setdefault('publication_year', rng.randint(1990, 2023))
+    row.setdefault('isbn', f"978-{rng.randint(100000000, 999999999)}")
+    return row
+
+
+def upsert_books(rows: List[dict]) -> int:
+    """Insert or update a chunk of normalized rows on (title, author) in one transaction.
+
+    Rows are upserted in groups with the same columns, so an existing book
+    only has the columns its row supplies overwritten; a column missing
+    from the row keeps its stored value instead of the model default.
+    """
+    # Later duplicates in the chunk win, as they would with row-by-row updates
+    unique = {(row['title'], row['author']): row for row in rows}
+    groups: Dict[Tuple[str, ...], List[dict]] = {}
+    for row in unique.values():
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    now = timezone.now()
+    with transaction.atomic():
+        for fields, group in groups.items():
+            Book.objects.bulk_create(
+                [Book(**row, updated_at=now) for row in group],
+                update_conflicts=True,
+                unique_fields=UNIQUE_FIELDS,
+                update_fields=[field for field in fields if field not in UNIQUE_FIELDS] + ['updated_at']
+            )
+    return len(unique)
@@ -0,0 +1,50 @@
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+CACHE_KEY = 'finwise:book_catalog_version'
+
+
+def bump_catalog_version():
+    """Tell per-process Book caches (similarity index, scoring engine) to reload.
+
+    Called by the Book signals and by bulk writers that skip them.
+    """
+    cache.set(CACHE_KEY, uuid.uuid4().hex, None)
+
+
+class CatalogVersion:
+    """Cheap staleness stamp for per-process structures built from the Book table.
+
+    current() is the cached version token (bumped on every Book write) plus a
+    fingerprint query over core_book. The query runs when the token changes
+    and otherwise at most once every BOOK_CATALOG_RECHECK_SECONDS, which
+    catches writes the token misses (other processes with a per-process
+    cache, raw SQL, queryset.update).
+    """
+
+    def __init__(self, fingerprint: Callable[[], tuple], recheck_seconds: Optional[float] = None):
+        self.fingerprint = fingerprint
+        self.recheck_seconds = (
+            recheck_seconds if recheck_seconds is not None
+            else getattr(settings, 'BOOK_CATALOG_RECHECK_SECONDS', 60)
+        )
+        self._token = None
+        self._fingerprint = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def current(self) -> tuple:
+        token = cache.get(CACHE_KEY)
+        with self._lock:
+            now = time.monotonic()
+            if (self._checked_at is None or token != self._token
+                    or now - self._checked_at >= self.recheck_seconds):
+                self._token = token
+                self._fingerprint = self.fingerprint()
+                self._checked_at = now
+            return token, self._fingerprint
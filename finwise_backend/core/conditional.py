@@ -0,0 +1,112 @@
+"""
+Conditional GET for views whose output derives from the requesting user's data.
+
+The ETag is a hash of the user's data version: the profile's, reading
+preferences' and newest reading history row's updated_at, the history row
+count and the newest stored book recommendation. All of it comes from one
+query, run before the view does any work. A matching If-None-Match gets a
+304 without calling the view (so no LLM calls either). A view that writes
+versioned data while it runs (e.g. stores fresh recommendations) gets its
+ETag recomputed afterwards, so the client's next revalidation can match.
+"""
+import hashlib
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
+from .models import BookRecommendation, UserProfile, UserReadingHistory, UserReadingPreference
+
+# Set when the response being built is a fallback (e.g. Gemini failed)
+_degraded: ContextVar[bool] = ContextVar('response_degraded', default=False)
+
+
+# Set when the view being served wrote data that the version covers
+_changed: ContextVar[bool] = ContextVar('user_data_changed', default=False)
+
+
+def mark_degraded():
+    """Keep the current response from getting an ETag, so clients do not hold on to a fallback"""
+    _degraded.set(True)
+
+
+def mark_user_data_changed():
+    """Recompute the current response's ETag once the view returns (see core/signals.py)"""
+    _changed.set(True)
+
+
+def _latest(queryset, expression):
+    """Per-user aggregate of a related table as a correlated subquery"""
+    return Subquery(queryset.filter(user=OuterRef('pk')).order_by().values('user').annotate(v=expression).values('v'))
+
+
+def user_data_version(user) -> tuple:
+    """Timestamps and counts that change whenever the user's derived views could"""
+    return User.objects.filter(pk=user.pk).annotate(
+        profile_updated=_latest(UserProfile.objects, Max('updated_at')),
+        preferences_updated=_latest(UserReadingPreference.objects, Max('updated_at')),
+        history_updated=_latest(UserReadingHistory.objects, Max('updated_at')),
+        history_count=_latest(UserReadingHistory.objects, Count('id')),
+        recommendations_updated=_latest(BookRecommendation.objects, Max('created_at')),
+    ).values_list(
+        'profile_updated', 'preferences_updated', 'history_updated', 'history_count', 'recommendations_updated'
+    ).first()
+
+
+def user_data_etag(request, view_name: str) -> str:
+    version = user_data_version(request.user)
+    key = f"{settings.CONDITIONAL_GET_VERSION}|{settings.TAX_ASSESSMENT_YEAR}|{view_name}|{request.get_full_path()}|{request.user.pk}|{version}"
+    return quote_etag(hashlib.sha256(key.encode('utf-8')).hexdigest()[:32])
+
+
+def _not_modified(request, etag: str) -> bool:
+    return etag in parse_etags(request.headers.get('If-None-Match', ''))
+
+
+def _finish(response, etag: str):
+    if response.status_code in (200, 304) and not _degraded.get():
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def conditional_on_user_data(get):
+    """Decorator for a view's get(): ETag from the user's data version, 304 before any work on a match"""
+    # Both flags are reset on entry, so _finish() only sees what this request's view marked
+    if iscoroutinefunction(get):
+        @wraps(get)
+        async def async_wrapper(self, request, *args, **kwargs):
+            tokens = _degraded.set(False), _changed.set(False)
+            try:
+                etag = await sync_to_async(user_data_etag)(request, type(self).__name__)
+                if _not_modified(request, etag):
+                    return _finish(HttpResponseNotModified(), etag)
+                response = await get(self, request, *args, **kwargs)
+                if _changed.get():
+                    etag = await sync_to_async(user_data_etag)(request, type(self).__name__)
+                return _finish(response, etag)
+            finally:
+                _degraded.reset(tokens[0])
+                _changed.reset(tokens[1])
+        return async_wrapper
+
+    @wraps(get)
+    def wrapper(self, request, *args, **kwargs):
+        tokens = _degraded.set(False), _changed.set(False)
+        try:
+            etag = user_data_etag(request, type(self).__name__)
+            if _not_modified(request, etag):
+                return _finish(HttpResponseNotModified(), etag)
+            response = get(self, request, *args, **kwargs)
+            if _changed.get():
+                etag = user_data_etag(request, type(self).__name__)
+            return _finish(response, etag)
+        finally:
+            _degraded.reset(tokens[0])
+            _changed.reset(tokens[1])
+    return wrapper
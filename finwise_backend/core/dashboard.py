@@ -0,0 +1,67 @@
+from .models import DashboardSummary
+
+
+def generate_tax_tips(profile):
+    tips = []
+
+    # Income-based tips
+    if profile.income > 1000000:
+        tips.append("Invest in ELSS for tax deduction under 80C.")
+        tips.append("Consider NPS for additional tax benefits.")
+
+    if profile.income > 500000:
+        tips.append("Maximize 80C deductions with PPF and ELSS.")
+
+    # Dependent-based tips
+    if profile.dependents >= 2:
+        tips.append("Claim deductions for dependent care under 80D.")
+        tips.append("Consider health insurance for family tax benefits.")
+
+    # Investment-based tips
+    if profile.investment_amount < profile.income * 0.1:
+        tips.append("Increase investment allocation to 10% of income.")
+
+    # Savings-based tips
+    if profile.monthly_savings < profile.income * 0.2:
+        tips.append("Aim to save at least 20% of your monthly income.")
+
+    # Emergency fund tips
+    if profile.emergency_fund < profile.income * 0.06:
+        tips.append("Build emergency fund equivalent to 6 months of income.")
+
+    # Retirement planning
+    if profile.retirement_savings < profile.income * 0.15:
+        tips.append("Allocate 15% of income for retirement planning.")
+
+    return tips
+
+
+def calculate_savings_progress(profile):
+    """Calculate savings progress and goals"""
+    if profile.savings_goal > 0:
+        progress = (profile.total_savings / profile.savings_goal) * 100
+    else:
+        progress = 0
+
+    return {
+        'total_savings': profile.total_savings,
+        'monthly_savings': profile.monthly_savings,
+        'savings_goal': profile.savings_goal,
+        'progress_percentage': min(progress, 100)
+    }
+
+
+def refresh_dashboard_summary(profile) -> DashboardSummary:
+    """Recompute and store the user's dashboard summary from their profile (on profile save, not on read)"""
+    savings_data = calculate_savings_progress(profile)
+    summary, _ = DashboardSummary.objects.update_or_create(
+        user_id=profile.user_id,
+        defaults={
+            'recommendations': ", ".join(generate_tax_tips(profile)),
+            'total_savings': savings_data['total_savings'],
+            'monthly_savings': savings_data['monthly_savings'],
+            'savings_goal': savings_data['savings_goal'],
+            'progress_percentage': savings_data['progress_percentage'],
+        }
+    )
+    return summary
@@ -0,0 +1,273 @@
+import math
+from bisect import bisect_right
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INF = math.inf
+
+# Declarative government scheme table, in display order.
+#
+# Numeric predicates are half-open [low, high) ranges on a profile field
+# (income, age, dependents, investment_amount; ages are whole years, so
+# "18-40" is (18, 41)). 'occupations' and 'states' restrict to listed values
+# (case-insensitive); omit a predicate to accept any value.
+SCHEMES: List[Dict[str, Any]] = [
+    {
+        "name": "PM-KISAN",
+        "description": "₹6,000/year income support for eligible farmers.",
+        "eligibility_reason": "Income below ₹12 lakh.",
+        "link": "https://pmkisan.gov.in",
+        "amount": "₹6,000/year",
+        "category": "Agriculture",
+        "estimatedTime": "15-30 days",
+        "rules": {"income": (-INF, 1200000)},
+    },
+    {
+        "name": "Ayushman Bharat",
+        "description": "₹5 lakh health insurance for low-income families.",
+        "eligibility_reason": "Income below ₹5 lakh.",
+        "link": "https://pmjay.gov.in",
+        "amount": "₹5 lakh/year",
+        "category": "Health",
+        "estimatedTime": "Instant",
+        "rules": {"income": (-INF, 500000)},
+    },
+    {
+        "name": "Senior Citizen Savings Scheme (SCSS)",
+        "description": "High interest savings for seniors with 8.2% interest rate.",
+        "eligibility_reason": "Age 60 or above.",
+        "link": "https://www.nsiindia.gov.in",
+        "amount": "8.2% interest",
+        "category": "Savings",
+        "estimatedTime": "7-15 days",
+        "rules": {"age": (60, INF)},
+    },
+    {
+        "name": "Atal Pension Yojana (APY)",
+        "description": "Guaranteed pension scheme for unorganized sector workers.",
+        "eligibility_reason": "Age between 18-40 years.",
+        "link": "https://npscra.nsdl.co.in",
+        "amount": "₹1,000-5,000/month",
+        "category": "Pension",
+        "estimatedTime": "15-30 days",
+        "rules": {"age": (18, 41)},
+    },
+    {
+        "name": "Pradhan Mantri Jeevan Jyoti Bima Yojana (PMJJBY)",
+        "description": "₹2 lakh life insurance for ₹330/year.",
+        "eligibility_reason": "Available to all savings account holders age 18-50.",
+        "link": "https://www.jansuraksha.gov.in",
+        "amount": "₹2 lakh coverage",
+        "category": "Insurance",
+        "estimatedTime": "Instant",
+        "rules": {},
+    },
+    {
+        "name": "Pradhan Mantri Suraksha Bima Yojana (PMSBY)",
+        "description": "Accidental death and disability insurance for ₹12/year.",
+        "eligibility_reason": "Available to all savings account holders age 18-70.",
+        "link": "https://www.jansuraksha.gov.in",
+        "amount": "₹2 lakh coverage",
+        "category": "Insurance",
+        "estimatedTime": "Instant",
+        "rules": {},
+    },
+    {
+        "name": "Public Provident Fund (PPF)",
+        "description": "Long-term savings with tax benefits under 80C.",
+        "eligibility_reason": "Available to all Indian residents.",
+        "link": "https://www.nsiindia.gov.in",
+        "amount": "7.1% interest",
+        "category": "Savings",
+        "estimatedTime": "7-15 days",
+        "rules": {"investment_amount": (-INF, 150000)},
+    },
+    {
+        "name": "Sukanya Samriddhi Yojana",
+        "description": "Small savings scheme for girl child with attractive interest rates.",
+        "eligibility_reason": "Available for girl child below 10 years.",
+        "link": "https://www.nsiindia.gov.in",
+        "amount": "8.2% interest",
+        "category": "Savings",
+        "estimatedTime": "7-15 days",
+        "rules": {"dependents": (1, INF)},
+    },
+    {
+        "name": "Pradhan Mantri Mudra Yojana",
+        "description": "Collateral-free loans for micro enterprises.",
+        "eligibility_reason": "For non-corporate, non-farm enterprises.",
+        "link": "https://mudra.org.in",
+        "amount": "Up to ₹10 lakh",
+        "category": "Business",
+        "estimatedTime": "30-45 days",
+        "rules": {"income": (-INF, 800000)},
+    },
+    {
+        "name": "Pradhan Mantri Awas Yojana (PMAY)",
+        "description": "Housing assistance for economically weaker sections.",
+        "eligibility_reason": "EWS/LIG families without pucca house.",
+        "link": "https://pmaymis.gov.in",
+        "amount": "Up to ₹2.67 lakh",
+        "category": "Housing",
+        "estimatedTime": "60-90 days",
+        "rules": {"income": (-INF, 600000)},
+    },
+]
+
+NUMERIC_FIELDS = ('income', 'age', 'dependents', 'investment_amount')
+CATEGORICAL_FIELDS = {'occupations': 'occupation', 'states': 'state'}
+
+# UserProfile columns loaded for batch evaluation
+PROFILE_COLUMNS = ('user_id',) + NUMERIC_FIELDS + tuple(CATEGORICAL_FIELDS.values())
+
+
+class IntervalIndex:
+    """Bitmask of the rules whose [low, high) range holds a value, by binary search over breakpoints"""
+
+    def __init__(self, ranges: Sequence[Optional[Tuple[float, float]]]):
+        self.breakpoints = sorted({
+            bound for bounds in ranges if bounds is not None for bound in bounds if math.isfinite(bound)
+        })
+        # Region i is [breakpoints[i-1], breakpoints[i]); every value in it satisfies the same rules
+        starts = [-INF] + self.breakpoints
+        self.masks = []
+        for start in starts:
+            mask = 0
+            for bit, bounds in enumerate(ranges):
+                if bounds is None or bounds[0] <= start < bounds[1]:
+                    mask |= 1 << bit
+            self.masks.append(mask)
+
+    def lookup(self, value: float) -> int:
+        return self.masks[bisect_right(self.breakpoints, value)]
+
+    def lookup_array(self, values: np.ndarray) -> np.ndarray:
+        return np.asarray(self.masks, dtype=np.int64)[np.searchsorted(self.breakpoints, values, side='right')]
+
+
+class ValueIndex:
+    """Bitmask of the rules accepting a categorical value"""
+
+    def __init__(self, allowed: Sequence[Optional[Sequence[str]]]):
+        self.any_mask = 0
+        self.masks: Dict[str, int] = {}
+        for bit, values in enumerate(allowed):
+            if values is None:
+                self.any_mask |= 1 << bit
+            else:
+                for value in values:
+                    key = value.strip().lower()
+                    self.masks[key] = self.masks.get(key, 0) | (1 << bit)
+
+    def lookup(self, value: str) -> int:
+        return self.any_mask | self.masks.get((value or '').strip().lower(), 0)
+
+    def lookup_array(self, encoded: Tuple[np.ndarray, List[str]]) -> np.ndarray:
+        """Masks for dictionary-encoded values (codes, distinct values), see profile_columns()"""
+        codes, values = encoded
+        # Few distinct occupations/states: look each up once
+        return np.array([self.lookup(value) for value in values], dtype=np.int64)[codes]
+
+
+class EligibilityEngine:
+    """Scheme table compiled into per-field indexes; match() ANDs one bitmask per field"""
+
+    def __init__(self, schemes: Sequence[Dict[str, Any]]):
+        for scheme in schemes:
+            unknown = set(scheme['rules']) - set(NUMERIC_FIELDS) - set(CATEGORICAL_FIELDS)
+            if unknown:
+                raise ValueError(f"Unknown eligibility rule(s) for {scheme['name']}: {', '.join(sorted(unknown))}")
+        self.benefits = [{k: v for k, v in scheme.items() if k != 'rules'} for scheme in schemes]
+        self.numeric = [
+            (field, IntervalIndex([scheme['rules'].get(field) for scheme in schemes])) for field in NUMERIC_FIELDS
+        ]
+        self.categorical = [
+            (field, ValueIndex([scheme['rules'].get(rule) for scheme in schemes]))
+            for rule, field in CATEGORICAL_FIELDS.items()
+        ]
+        self.all_mask = (1 << len(schemes)) - 1
+        self._selections: Dict[int, tuple] = {}
+
+    def match_mask(self, profile) -> int:
+        mask = self.all_mask
+        for field, index in self.numeric:
+            mask &= index.lookup(getattr(profile, field) or 0)
+        for field, index in self.categorical:
+            mask &= index.lookup(getattr(profile, field))
+        return mask
+
+    def match(self, profile) -> List[Dict[str, Any]]:
+        """Benefits the profile is eligible for, in table order (fresh dicts)"""
+        mask = self.match_mask(profile)
+        selection = self._selections.get(mask)
+        if selection is None:
+            selection = tuple(benefit for bit, benefit in enumerate(self.benefits) if mask >> bit & 1)
+            self._selections[mask] = selection
+        return [benefit.copy() for benefit in selection]
+
+    def match_masks(self, columns: Dict[str, Any]) -> np.ndarray:
+        """Eligibility bitmask per profile for profile_columns() output"""
+        masks = np.full(len(columns['income']), self.all_mask, dtype=np.int64)
+        for field, index in self.numeric:
+            masks &= index.lookup_array(columns[field])
+        for field, index in self.categorical:
+            masks &= index.lookup_array(columns[field])
+        return masks
+
+    def eligibility_matrix(self, masks: np.ndarray) -> np.ndarray:
+        """Boolean (profiles x schemes) matrix from match_masks()"""
+        bits = np.int64(1) << np.arange(len(self.benefits), dtype=np.int64)
+        return (masks[:, None] & bits) != 0
+
+    def scheme_counts(self, masks: np.ndarray) -> np.ndarray:
+        return self.eligibility_matrix(masks).sum(axis=0)
+
+    def count_profiles(self, queryset, chunk_size: int = 50000, on_chunk=None) -> Tuple[int, np.ndarray]:
+        """(profiles, eligible profiles per scheme) over a UserProfile queryset.
+
+        ``on_chunk(columns, masks)`` is called for every chunk, e.g. to write
+        per-user results.
+        """
+        total = 0
+        counts = np.zeros(len(self.benefits), dtype=np.int64)
+        for columns in iter_profile_columns(queryset, chunk_size):
+            masks = self.match_masks(columns)
+            counts += self.scheme_counts(masks)
+            total += len(masks)
+            if on_chunk is not None:
+                on_chunk(columns, masks)
+        return total, counts
+
+
+def iter_profile_columns(queryset, chunk_size: int = 50000) -> Iterator[Dict[str, Any]]:
+    """Stream UserProfile rows as column arrays, chunk_size profiles at a time"""
+    rows = queryset.order_by().values_list(*PROFILE_COLUMNS).iterator(chunk_size=chunk_size)
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield profile_columns(chunk)
+            chunk = []
+    if chunk:
+        yield profile_columns(chunk)
+
+
+def profile_columns(rows: List[tuple]) -> Dict[str, Any]:
+    """Column arrays from UserProfile value tuples; occupation and state are dictionary-encoded"""
+    def column(field):
+        return map(itemgetter(PROFILE_COLUMNS.index(field)), rows)
+
+    arrays = {'user_id': np.fromiter(column('user_id'), dtype=np.int64, count=len(rows))}
+    for field in NUMERIC_FIELDS:
+        arrays[field] = np.fromiter(column(field), dtype=np.float64, count=len(rows))
+    for field in CATEGORICAL_FIELDS.values():
+        vocab: Dict[str, int] = {}
+        codes = np.fromiter((vocab.setdefault(v, len(vocab)) for v in column(field)), dtype=np.int64, count=len(rows))
+        arrays[field] = (codes, list(vocab))
+    return arrays
+
+
+# Global instance
+eligibility_engine = EligibilityEngine(SCHEMES)
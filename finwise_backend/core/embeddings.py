@@ -0,0 +1,210 @@
+import json
+import math
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from django.db.models import Count, Max
+
+from .catalog_version import CatalogVersion
+from .models import Book
+
+EMBEDDING_DIM = 256
+EMBEDDING_DTYPE = np.float16  # 512 bytes per book
+EMBEDDING_BYTES = EMBEDDING_DIM * np.dtype(EMBEDDING_DTYPE).itemsize
+
+# Above this many books the similarity index also builds an LSH structure
+ANN_THRESHOLD = 50000
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    'a an and are as at be by for from how in is it of on or that the their this to what with who why your you'.split()
+)
+
+# Relative weight of each book field in the embedding
+FIELD_WEIGHTS = {
+    'genre': 2.0,
+    'sub_genre': 1.5,
+    'financial_topics': 2.0,
+    'description': 1.0,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def parse_topics(financial_topics: str) -> List[str]:
+    """Book.financial_topics holds a JSON list; tolerate plain comma-separated text"""
+    if not financial_topics:
+        return []
+    try:
+        topics = json.loads(financial_topics)
+        if isinstance(topics, list):
+            return [str(t) for t in topics]
+    except ValueError:
+        pass
+    return [t.strip() for t in financial_topics.split(',') if t.strip()]
+
+
+def book_features(book) -> Dict[str, float]:
+    """Weighted term counts for a book's description, topics, genre and sub-genre"""
+    features: Dict[str, float] = {}
+
+    def add(feature, weight):
+        features[feature] = features.get(feature, 0.0) + weight
+
+    for field in ('genre', 'sub_genre'):
+        value = getattr(book, field) or ''
+        if value:
+            add(f'{field}={value.lower()}', FIELD_WEIGHTS[field])
+        for token in tokenize(value):
+            add(token, FIELD_WEIGHTS[field])
+    for topic in parse_topics(book.financial_topics):
+        add(f'topic={topic.lower()}', FIELD_WEIGHTS['financial_topics'])
+        for token in tokenize(topic):
+            add(token, FIELD_WEIGHTS['financial_topics'])
+    for token in tokenize(book.description or ''):
+        add(token, FIELD_WEIGHTS['description'])
+    return features
+
+
+def hash_feature(feature: str, dim: int = EMBEDDING_DIM):
+    """Column and sign of a feature in the hashed vector space (stable across processes)"""
+    h = zlib.crc32(feature.encode('utf-8'))
+    return h % dim, (1.0 if (h >> 31) & 1 else -1.0)
+
+
+class HashingTfidfVectorizer:
+    """Signed feature hashing with sublinear TF and IDF fitted on the catalog (no vocabulary, no network)"""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.idf = np.ones(dim)
+
+    def _hashed_tf(self, features: Dict[str, float]):
+        row = np.zeros(self.dim)
+        for feature, count in features.items():
+            column, sign = hash_feature(feature, self.dim)
+            row[column] += sign * (1.0 + math.log(count))
+        return row
+
+    def fit_transform(self, books: Iterable) -> np.ndarray:
+        tf = np.array([self._hashed_tf(book_features(b)) for b in books]).reshape(-1, self.dim)
+        document_frequency = np.count_nonzero(tf, axis=0)
+        self.idf = np.log((1 + len(tf)) / (1 + document_frequency)) + 1.0
+        return self._normalize(tf * self.idf)
+
+    def transform(self, books: Iterable) -> np.ndarray:
+        tf = np.array([self._hashed_tf(book_features(b)) for b in books]).reshape(-1, self.dim)
+        return self._normalize(tf * self.idf)
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def encode_vector(vector: np.ndarray) -> bytes:
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def decode_vectors(blobs: List[bytes]) -> np.ndarray:
+    """Stack stored embeddings into a float32 (books x dim) matrix"""
+    if not blobs:
+        return np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+    return np.frombuffer(b''.join(blobs), dtype=EMBEDDING_DTYPE).reshape(len(blobs), EMBEDDING_DIM).astype(np.float32)
+
+
+class LSHIndex:
+    """Random-hyperplane LSH over unit vectors, used to shortlist candidates on big catalogs"""
+
+    def __init__(self, matrix: np.ndarray, n_tables: int = 8, n_bits: int = 12, seed: int = 0):
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((n_tables, n_bits, matrix.shape[1])).astype(np.float32)
+        self.powers = 1 << np.arange(n_bits)
+        self.tables = []
+        for planes in self.planes:
+            keys = ((matrix @ planes.T) > 0) @ self.powers
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            self.tables.append((sorted_keys, order))
+
+    def candidates(self, vector: np.ndarray) -> np.ndarray:
+        found = []
+        for planes, (sorted_keys, order) in zip(self.planes, self.tables):
+            key = ((planes @ vector) > 0) @ self.powers
+            start, end = np.searchsorted(sorted_keys, [key, key + 1])
+            found.append(order[start:end])
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+
+class SimilarityIndex:
+    """In-memory cosine-similarity index over stored book embeddings"""
+
+    def __init__(self, ids, matrix: np.ndarray, use_ann: Optional[bool] = None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.matrix = matrix
+        self.position = {book_id: i for i, book_id in enumerate(self.ids.tolist())}
+        if use_ann is None:
+            use_ann = len(self.ids) > ANN_THRESHOLD
+        self.lsh = LSHIndex(matrix) if use_ann and len(self.ids) else None
+
+    @classmethod
+    def from_db(cls, use_ann: Optional[bool] = None):
+        rows = [
+            (book_id, bytes(blob))
+            for book_id, blob in Book.objects.filter(embedding_vector__isnull=False).values_list('id', 'embedding_vector')
+            if blob is not None and len(blob) == EMBEDDING_BYTES
+        ]
+        return cls([r[0] for r in rows], decode_vectors([r[1] for r in rows]), use_ann)
+
+    def __contains__(self, book_id):
+        return book_id in self.position
+
+    def similar(self, book_id: int, k: int = 6) -> List[int]:
+        """Ids of the k most similar books, best first ([] if the book has no embedding)"""
+        position = self.position.get(book_id)
+        if position is None:
+            return []
+        vector = self.matrix[position]
+
+        if self.lsh is not None:
+            candidates = self.lsh.candidates(vector)
+            candidates = candidates[candidates != position]
+            # Too few collisions: fall back to the exact scan
+            if len(candidates) >= k:
+                return self._top_k(self.matrix[candidates] @ vector, self.ids[candidates], k)
+
+        sims = self.matrix @ vector
+        sims[position] = -np.inf
+        return self._top_k(sims, self.ids, min(k, len(sims) - 1))
+
+    @staticmethod
+    def _top_k(sims: np.ndarray, ids: np.ndarray, k: int) -> List[int]:
+        if k <= 0:
+            return []
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind='stable')]
+        return ids[top].tolist()
+
+
+_index: Optional[SimilarityIndex] = None
+_index_version = None
+_index_lock = threading.Lock()
+_catalog_version = CatalogVersion(lambda: tuple(Book.objects.aggregate(
+    count=Count('id'), embedded=Count('embedding_vector'), latest=Max('updated_at')
+).values()))
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Per-process index, reloaded when books or their embeddings change (see CatalogVersion)"""
+    global _index, _index_version
+    version = _catalog_version.current()
+    with _index_lock:
+        if _index is None or version != _index_version:
+            _index = SimilarityIndex.from_db()
+            _index_version = version
+        return _index
@@ -0,0 +1,71 @@
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Book
+
+# Facet name -> Book field (and the BookListView query parameter)
+FACETS = {
+    'genre': 'genre',
+    'difficulty': 'difficulty_level',
+    'investment_level': 'investment_level',
+}
+
+CACHE_KEY = 'finwise:book_facets'
+
+
+class BookFacetService:
+    """Facet counts for the book list from one grouped query.
+
+    Books are grouped by the combination of all facet fields, so a single
+    query yields enough to count every facet under any mix of facet filters
+    (each facet ignores its own filter, so the UI can still offer the other
+    values). The unfiltered grouping is cached and dropped on Book save or
+    delete; only searches need a query.
+    """
+
+    def __init__(self, ttl: Optional[int] = None):
+        self.ttl = ttl if ttl is not None else getattr(settings, 'BOOK_FACETS_CACHE_TTL', 300)
+
+    def get_combinations(self, queryset=None) -> List[Tuple[tuple, int]]:
+        """[((genre, difficulty_level, investment_level), count), ...]"""
+        if queryset is None:
+            combinations = cache.get(CACHE_KEY)
+            if combinations is None:
+                combinations = self._group(Book.objects.all())
+                cache.set(CACHE_KEY, combinations, self.ttl)
+            return combinations
+        return self._group(queryset)
+
+    @staticmethod
+    def _group(queryset) -> List[Tuple[tuple, int]]:
+        fields = list(FACETS.values())
+        rows = queryset.order_by().values_list(*fields).annotate(count=Count('id'))
+        return [(tuple(row[:-1]), row[-1]) for row in rows]
+
+    def get_facets(self, filters: Dict[str, str], queryset=None) -> Dict[str, Dict[str, int]]:
+        """{facet: {value: count}} under the given facet filters.
+
+        ``queryset`` carries any non-facet filtering (e.g. search); leave it
+        None for the whole catalog, which is served from the cache.
+        """
+        combinations = self.get_combinations(queryset)
+        names = list(FACETS)
+        facets = {}
+        for position, name in enumerate(names):
+            others = [(i, filters[other]) for i, other in enumerate(names) if other != name and filters.get(other)]
+            counts: Dict[str, int] = {}
+            for values, count in combinations:
+                if all(values[i] == value for i, value in others):
+                    counts[values[position]] = counts.get(values[position], 0) + count
+            facets[name] = dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+        return facets
+
+    def invalidate(self):
+        cache.delete(CACHE_KEY)
+
+
+# Global instance
+book_facet_service = BookFacetService()
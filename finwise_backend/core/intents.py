@@ -0,0 +1,113 @@
+import re
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .tax_optimizer import ALLOCATION_PATTERN, parse_allocation_question, parse_amount
+
+# Intent for messages no rule claims; these go to the LLM
+OPEN_INTENT = 'open_question'
+
+# Income heads, deductions and exemptions the profile-based slab answer does not model
+OTHER_TAX_HEADS = re.compile(
+    r'\b(?:capital gains?|ltcg|stcg|mutual funds?|shares?|stocks?|equity|dividends?|interest|fds?|'
+    r'fixed deposits?|rent(?:al)?|house property|(?:home|housing|education) loans?|hra|crypto\w*|'
+    r'business|freelanc\w*|gifts?|lottery|pension|bonus|80[a-z]*|section \d+\w*|deductions?|'
+    r'exemptions?|elss|ppf|nps|insurance|senior citizens?)\b',
+    re.IGNORECASE
+)
+
+
+def tax_slab_params(message: str) -> Optional[dict]:
+    """{} when the slab calculator can answer from the profile alone, else None (LLM)"""
+    if OTHER_TAX_HEADS.search(message) or parse_amount(message) is not None:
+        return None
+    return {}
+
+
+# Deterministic chat intents, in priority order: (name, pattern, extract).
+# extract(message) returns handler parameters, or None to let later intents try.
+CHAT_INTENTS: List[Tuple[str, str, Optional[Callable[[str], Optional[dict]]]]] = [
+    ('tax_allocation', ALLOCATION_PATTERN.pattern, parse_allocation_question),
+    ('tax_slab', (
+        r'\b(?:tax slabs?|slab rates?|income tax rates?|tax brackets?|which (?:tax )?regime|'
+        r'old (?:vs\.?|or|versus) new|new (?:vs\.?|or|versus) old|(?:old|new) (?:tax )?regime|'
+        r'my tax liability|(?:income )?tax (?:do|will|would|should) i (?:pay|owe))\b'
+    ), tax_slab_params),
+    ('health_score', (
+        r'\b(?:financial health|health score|financial score|how (?:am i|are my finances) doing)\b'
+    ), None),
+    ('savings_progress', (
+        r'\b(?:savings? (?:goal|progress|target)|progress (?:towards?|on) my (?:savings|goal)|'
+        r'how (?:much|far) (?:have i saved|am i from my (?:savings )?goal)|reach my (?:savings )?goal)\b'
+    ), None),
+]
+
+LATENCY_WINDOW = 1000  # Latest samples kept per intent for percentiles
+
+
+class IntentRouter:
+    """Keyword/regex intent classifier with per-intent hit and latency metrics.
+
+    Patterns are compiled once; classify() tries them in priority order and
+    costs microseconds, so it runs before any LLM call. Metrics live in
+    process memory (one set per worker).
+    """
+
+    def __init__(self, intents: Sequence[Tuple[str, str, Optional[Callable[[str], Optional[dict]]]]]):
+        self.intents = [
+            (name, re.compile(pattern, re.IGNORECASE), extract)
+            for name, pattern, extract in intents
+        ]
+        self.names = [name for name, _, _ in intents] + [OPEN_INTENT]
+        self._lock = threading.Lock()
+        self.reset_metrics()
+
+    def classify(self, message: str) -> Tuple[str, Dict[str, Any]]:
+        """(intent, handler parameters); OPEN_INTENT when no rule matches"""
+        for name, pattern, extract in self.intents:
+            if not pattern.search(message):
+                continue
+            params = extract(message) if extract is not None else {}
+            if params is not None:
+                return name, params
+        return OPEN_INTENT, {}
+
+    def record(self, intent: str, elapsed_ms: float):
+        with self._lock:
+            self._hits[intent] = self._hits.get(intent, 0) + 1
+            self._latencies.setdefault(intent, deque(maxlen=LATENCY_WINDOW)).append(elapsed_ms)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit count, share of traffic and latency percentiles per intent"""
+        with self._lock:
+            hits = dict(self._hits)
+            latencies = {name: np.array(samples) for name, samples in self._latencies.items()}
+        total = sum(hits.values())
+        intents = {}
+        for name in self.names:
+            samples = latencies.get(name)
+            intents[name] = {
+                'hits': hits.get(name, 0),
+                'hit_rate': round(hits.get(name, 0) / total, 4) if total else 0.0,
+                'avg_ms': round(float(samples.mean()), 2) if samples is not None else None,
+                'p50_ms': round(float(np.percentile(samples, 50)), 2) if samples is not None else None,
+                'p95_ms': round(float(np.percentile(samples, 95)), 2) if samples is not None else None,
+            }
+        local = total - hits.get(OPEN_INTENT, 0)
+        return {
+            'total': total,
+            'local_rate': round(local / total, 4) if total else 0.0,
+            'intents': intents,
+        }
+
+    def reset_metrics(self):
+        with self._lock:
+            self._hits: Dict[str, int] = {}
+            self._latencies: Dict[str, deque] = {}
+
+
+# Global instance
+chat_intent_router = IntentRouter(CHAT_INTENTS)
@@ -0,0 +1,78 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIClient
+
+from core.ai_recordings import LATENCY_MODES, RecordingStore, ReplayModel
+from core.ai_service import ai_service
+
+QUESTIONS = [
+    'Is gold a good investment right now?',
+    'Should I prepay my home loan or invest in mutual funds?',
+    'How much emergency fund do I need?',
+    'What is a good SIP amount for my income?',
+    'Should I buy term insurance or an endowment plan?',
+    'How do I start investing in index funds?',
+]
+
+ENDPOINTS = {
+    'chatbot': lambda client, i: client.post('/api/chatbot/', {'message': QUESTIONS[i % len(QUESTIONS)]}, format='json'),
+    'tax-savings': lambda client, i: client.get('/api/tax-savings/'),
+    'benefits': lambda client, i: client.get('/api/benefits/'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Load-test the AI views in-process against replayed LLM responses (no network)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='Existing user (with a profile) to send requests as')
+        parser.add_argument('--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS))
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--latency', choices=LATENCY_MODES, default='recorded')
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiplier on replayed latency')
+        parser.add_argument('--no-cache', action='store_true', help='Disable the AI response and chat caches')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']} does not exist")
+
+        model = ReplayModel(RecordingStore(settings.AI_RECORDINGS_PATH), latency=options['latency'], scale=options['scale'])
+        ai_service.model = model
+        if options['no_cache']:
+            ai_service.response_cache = None
+            ai_service.chat_cache = None
+
+        def send(endpoint, i):
+            client = APIClient(HTTP_HOST='localhost')
+            client.force_authenticate(user)
+            started = time.perf_counter()
+            try:
+                status = ENDPOINTS[endpoint](client, i).status_code
+            finally:
+                connection.close()
+            return status, (time.perf_counter() - started) * 1000
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            for endpoint in options['endpoints']:
+                started = time.perf_counter()
+                results = list(executor.map(lambda i: send(endpoint, i), range(options['requests'])))
+                elapsed = time.perf_counter() - started
+                latencies = np.array([ms for _, ms in results])
+                errors = sum(1 for status, _ in results if status >= 400)
+                self.stdout.write(
+                    f'{endpoint:>12}: {len(results) / elapsed:7.1f} req/s | p50 {np.percentile(latencies, 50):7.1f} ms | '
+                    f'p95 {np.percentile(latencies, 95):7.1f} ms | p99 {np.percentile(latencies, 99):7.1f} ms | '
+                    f'{errors} errors'
+                )
+
+        self.stdout.write(f'replay: {model.stats()}')
+        self.stdout.write(self.style.SUCCESS('Done'))
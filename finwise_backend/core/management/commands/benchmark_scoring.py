@@ -0,0 +1,110 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from core.recommendations import BookRecommender
+from core.scoring import BookCatalog, ScoringEngine
+
+GENRES = [
+    'Business & Management', 'Investment', 'Self-Help / Personal Growth', 'Psychology',
+    'Finance', 'Leadership', 'Entrepreneurship', 'Personal Finance'
+]
+LEVELS = ['Beginner', 'Intermediate', 'Advanced', '']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the vectorized book scoring engine on synthetic catalogs (no database)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help='Catalog sizes')
+        parser.add_argument('--users', type=int, default=200, help='Synthetic users per size')
+        parser.add_argument('--batch-size', type=int, default=64, help='Users per batch-mode pass')
+        parser.add_argument('--top-n', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        users = self.make_users(rng, options['users'])
+        recommender = BookRecommender()
+
+        for size in options['sizes']:
+            catalog = self.make_catalog(rng, size)
+            engine = ScoringEngine(catalog)
+            self.check_parity(engine, recommender, users[:20])
+
+            started = time.perf_counter()
+            for user in users:
+                scores = engine.score_user(user.income, user.age, user.investment_amount, user.preferred_genres)
+                engine.top_k(scores, None, options['top_n'])
+            per_user = (time.perf_counter() - started) / len(users)
+
+            batch_size = options['batch_size']
+            started = time.perf_counter()
+            for i in range(0, len(users), batch_size):
+                chunk = users[i:i + batch_size]
+                scores = engine.score_users(
+                    [u.income for u in chunk], [u.age for u in chunk], [u.investment_amount for u in chunk],
+                    engine.preferred_genre_matrix([u.preferred_genres for u in chunk])
+                )
+                for row in range(len(chunk)):
+                    engine.top_k(scores[row], None, options['top_n'])
+            per_user_batch = (time.perf_counter() - started) / len(users)
+
+            scalar_books = self.scalar_books(catalog, min(size, 2000))
+            started = time.perf_counter()
+            for user in users[:10]:
+                for book in scalar_books:
+                    recommender.calculate_recommendation_score(book, None, user, user)
+            per_user_scalar = (time.perf_counter() - started) / 10 * size / len(scalar_books)
+
+            self.stdout.write(
+                f'{size:>8} books: vectorized {per_user * 1000:8.3f} ms/user | '
+                f'batch {per_user_batch * 1000:8.3f} ms/user | '
+                f'scalar (extrapolated) {per_user_scalar * 1000:9.1f} ms/user'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Vectorized scores match the scalar formula'))
+
+    def make_catalog(self, rng, size):
+        return BookCatalog(
+            ids=np.arange(1, size + 1),
+            rating=np.round(rng.uniform(3.0, 5.0, size), 1),
+            popularity=np.round(rng.uniform(0.0, 10.0, size), 1),
+            genres=rng.choice(GENRES, size).tolist(),
+            investment_levels=rng.choice(LEVELS, size).tolist()
+        )
+
+    def make_users(self, rng, count):
+        return [
+            SimpleNamespace(
+                income=float(rng.choice([300000, 700000, 1500000])),
+                age=int(rng.integers(20, 70)),
+                investment_amount=float(rng.choice([50000, 300000, 800000])),
+                preferred_genres=rng.choice(GENRES, int(rng.integers(0, 3)), replace=False).tolist()
+            )
+            for _ in range(count)
+        ]
+
+    def scalar_books(self, catalog, count):
+        genres = {code: name for name, code in catalog.genre_vocab.items()}
+        levels = {code: name for name, code in catalog.level_vocab.items()}
+        return [
+            SimpleNamespace(
+                rating=float(catalog.rating[i]), popularity_score=float(catalog.popularity[i]),
+                genre=genres[int(catalog.genre_codes[i])], investment_level=levels[int(catalog.level_codes[i])]
+            )
+            for i in range(count)
+        ]
+
+    def check_parity(self, engine, recommender, users):
+        books = self.scalar_books(engine.catalog, min(len(engine.catalog), 500))
+        batch = engine.score_users(
+            [u.income for u in users], [u.age for u in users], [u.investment_amount for u in users],
+            engine.preferred_genre_matrix([u.preferred_genres for u in users])
+        )
+        for row, user in enumerate(users):
+            expected = [recommender.calculate_recommendation_score(b, None, user, user) for b in books]
+            vectorized = engine.score_user(user.income, user.age, user.investment_amount, user.preferred_genres)
+            if not (np.array_equal(vectorized[:len(books)], expected) and np.array_equal(batch[row, :len(books)], expected)):
+                raise CommandError('Vectorized scores differ from BookRecommender.calculate_recommendation_score')
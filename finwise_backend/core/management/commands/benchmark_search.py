@@ -0,0 +1,96 @@
+import sqlite3
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from core.search import SQLITE_CREATE, SQLITE_BM25, SQLITE_JOIN, SQLITE_POPULATE, SQLITE_TABLE, fts5_query, search_terms
+
+WORDS = (
+    'money investing wealth habits stock market value growth dividend index fund retirement tax saving '
+    'budget psychology behavior leadership startup strategy negotiation risk compounding real estate '
+    'portfolio bonds inflation economics mindset discipline entrepreneur frugal income passive'
+).split()
+AUTHORS = ['Morgan Housel', 'Benjamin Graham', 'Robert Kiyosaki', 'Ramit Sethi', 'Daniel Kahneman', 'Ray Dalio']
+GENRES = ['Business & Management', 'Investment', 'Self-Help / Personal Growth', 'Psychology', 'Personal Finance']
+QUERIES = ['psychology of money', 'inv', 'dividend', 'kahne', 'passive income', 'tax sav', 'leadership strategy']
+
+# The BookListView search before the full-text index
+ICONTAINS_SEARCH = (
+    "SELECT id FROM core_book WHERE title LIKE ? ESCAPE '\\' OR author LIKE ? ESCAPE '\\' "
+    "OR genre LIKE ? ESCAPE '\\' ORDER BY rating DESC, popularity_score DESC, id"
+)
+# First BookListView page of a search: every match, ranked by bm25
+FTS_PAGE = (
+    f"SELECT id FROM core_book, {SQLITE_TABLE} WHERE {' AND '.join(SQLITE_JOIN)} "
+    f"ORDER BY {SQLITE_BM25}, rating DESC, popularity_score DESC, id LIMIT 21"
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark FTS5 book search against the icontains scan on synthetic catalogs (in-memory SQLite)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help='Catalog sizes')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs of each query')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        db = sqlite3.connect(':memory:')
+        if not db.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0]:
+            raise CommandError('This SQLite build has no FTS5')
+        rng = np.random.default_rng(options['seed'])
+
+        for size in options['sizes']:
+            self.load_catalog(db, rng, size)
+            like_ms = self.time_queries(db, options['repeat'], lambda q: (
+                ICONTAINS_SEARCH, [f'%{q}%'] * 3
+            ))
+            fts_ms = self.time_queries(db, options['repeat'], lambda q: (
+                FTS_PAGE.replace('%s', '?'), [fts5_query(search_terms(q))]
+            ))
+            self.stdout.write(
+                f'{size:>8} books: icontains {like_ms:8.2f} ms/query | fts5 bm25 {fts_ms:7.2f} ms/query | '
+                f'{like_ms / fts_ms:6.1f}x'
+            )
+
+        self.stdout.write(self.style.SUCCESS('Done'))
+
+    def load_catalog(self, db, rng, size):
+        db.execute('DROP TABLE IF EXISTS core_book')
+        db.execute('DROP TABLE IF EXISTS core_book_fts')
+        db.execute(
+            'CREATE TABLE core_book (id INTEGER PRIMARY KEY, title TEXT, author TEXT, genre TEXT, '
+            'description TEXT, financial_topics TEXT, rating REAL, popularity_score REAL)'
+        )
+
+        # Real descriptions have a long-tail vocabulary: Zipf-distributed filler
+        # terms with the topical words spread over the frequent-to-rare ranks
+        vocabulary = [f'w{i}' for i in range(20000)]
+        for word, rank in zip(WORDS, np.geomspace(5, 5000, len(WORDS)).astype(int)):
+            vocabulary[rank] = word
+        vocabulary = np.array(vocabulary)
+        weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+        weights /= weights.sum()
+
+        def text(count):
+            return ' '.join(rng.choice(vocabulary, count, p=weights))
+
+        db.executemany('INSERT INTO core_book VALUES (?, ?, ?, ?, ?, ?, ?, ?)', (
+            (
+                i, text(4).title(), str(rng.choice(AUTHORS)), str(rng.choice(GENRES)), text(60),
+                '["' + '", "'.join(rng.choice(WORDS, 3)) + '"]',
+                float(rng.uniform(3, 5)), float(rng.uniform(0, 10))
+            )
+            for i in range(1, size + 1)
+        ))
+        db.execute(SQLITE_CREATE)
+        db.execute(SQLITE_POPULATE)
+        db.commit()
+
+    def time_queries(self, db, repeat, build):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for query in QUERIES:
+                sql, params = build(query)
+                db.execute(sql, params).fetchall()
+        return (time.perf_counter() - started) / (repeat * len(QUERIES)) * 1000
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.catalog_version import bump_catalog_version
+from core.embeddings import HashingTfidfVectorizer, encode_vector, get_similarity_index
+from core.models import Book
+
+
+class Command(BaseCommand):
+    help = 'Compute Book.embedding_vector from description, topics, genre and sub-genre (offline)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per bulk update')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        books = list(
+            Book.objects.order_by('id').only('id', 'description', 'financial_topics', 'genre', 'sub_genre')
+        )
+        if not books:
+            self.stdout.write(self.style.WARNING('No books to embed'))
+            return
+
+        vectors = HashingTfidfVectorizer().fit_transform(books)
+        now = timezone.now()
+        for book, vector in zip(books, vectors):
+            book.embedding_vector = encode_vector(vector)
+            book.updated_at = now  # bulk_update skips auto_now
+
+        batch_size = options['batch_size']
+        for i in range(0, len(books), batch_size):
+            Book.objects.bulk_update(books[i:i + batch_size], ['embedding_vector', 'updated_at'])
+            self.stdout.write(f'Embedded {min(i + batch_size, len(books))}/{len(books)} books...')
+        # bulk_update skips the Book signals; workers reload their index on this
+        bump_catalog_version()
+
+        index = get_similarity_index()
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(f'Embedded {len(books)} books ({len(index.ids)} indexed) in {elapsed:.1f}s')
+        )
@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from core.recommendations import refresh_recommendations_batch
+
+
+class Command(BaseCommand):
+    help = 'Precompute Wisdom Library book recommendations into BookRecommendation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild recommendations for this username')
+        parser.add_argument(
+            '--batch-size', type=int, default=64,
+            help='Users scored together in one (users x books) pass; bounds memory use'
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True).order_by('id')
+        if options['user']:
+            users = users.filter(username=options['user'])
+            if not users.exists():
+                raise CommandError(f"User not found: {options['user']}")
+
+        started = time.monotonic()
+        user_count = 0
+        row_count = 0
+        batch = []
+        for user in users.iterator(chunk_size=options['batch_size']):
+            batch.append(user)
+            if len(batch) == options['batch_size']:
+                row_count += self.process(batch)
+                user_count += len(batch)
+                batch = []
+                self.stdout.write(f'Processed {user_count} users...')
+        if batch:
+            row_count += self.process(batch)
+            user_count += len(batch)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Stored {row_count} recommendations for {user_count} users in {elapsed:.1f}s'
+            )
+        )
+
+    def process(self, users):
+        try:
+            return len(refresh_recommendations_batch(users))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Failed for users {users[0].id}-{users[-1].id}: {e}'))
+            return 0
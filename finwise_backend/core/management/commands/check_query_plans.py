@@ -0,0 +1,213 @@
+import re
+import time
+from datetime import timedelta
+from itertools import islice
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Book, UserReadingHistory
+from core.search import book_search_index
+
+GENRES = ['Business & Management', 'Investment', 'Self-Help / Personal Growth', 'Psychology', 'Personal Finance',
+          'Economics', 'Biography', 'Entrepreneurship']
+LEVELS = ['Beginner', 'Intermediate', 'Advanced']
+STATUSES = ['want_to_read', 'currently_reading', 'completed', 'abandoned']
+WORDS = ['money', 'investing', 'wealth', 'habits', 'stocks', 'tax', 'saving', 'leadership', 'psychology', 'risk']
+
+# A table read row by row: SQLite "SCAN t" without an index, PostgreSQL "Seq Scan on t".
+# "SCAN core_book_fts VIRTUAL TABLE INDEX ..." is an FTS5 MATCH lookup, not a scan.
+FULL_SCAN_PATTERNS = [
+    re.compile(r'\bSCAN ((?:core|auth)_\w+)\b(?! USING| VIRTUAL TABLE)'),
+    re.compile(r'\bSeq Scan on ((?:core|auth)_\w+)'),
+]
+# An index walked end to end: a full read too, unless a LIMIT stops it early (SQLite)
+FULL_INDEX_SCAN_PATTERN = re.compile(r'\bSCAN ((?:core|auth)_\w+) USING (?:COVERING )?INDEX\b')
+SORT_PATTERN = re.compile(r'USE TEMP B-TREE FOR ORDER BY|\bSort\b')
+
+# Statements that read all of core_book on purpose, and why that is acceptable
+ALLOWED_FULL_SCANS = [
+    (re.compile(r'^SELECT COUNT\("core_book"\."id"\) AS "count", '),
+     'catalog fingerprint, on catalog version bumps or every BOOK_CATALOG_RECHECK_SECONDS'),
+    (re.compile(r'"embedding_vector" FROM "core_book" WHERE "core_book"\."embedding_vector" IS NOT NULL ORDER BY'),
+     'similarity index load, only when the catalog version changes'),
+    (re.compile(r'"investment_level" AS "investment_level" FROM "core_book" ORDER BY'),
+     'scoring engine catalog load, only when the catalog version changes'),
+    (re.compile(r'COUNT\("core_book"\."id"\) AS "count" FROM "core_book" GROUP BY'),
+     'unfiltered facet counts, cached for BOOK_FACETS_CACHE_TTL'),
+]
+
+# (name, path) of each request made as a seeded user; {book} and {cursor} are filled in
+ENDPOINTS = [
+    ('BookListView', '/api/books/'),
+    ('BookListView next page', '/api/books/?cursor={cursor}'),
+    ('BookListView ?genre', '/api/books/?genre=Investment'),
+    ('BookListView ?difficulty', '/api/books/?difficulty=Advanced'),
+    ('BookListView ?investment_level', '/api/books/?investment_level=Advanced'),
+    ('BookListView ?search', '/api/books/?search=money'),
+    ('BookListView ?search next page', '/api/books/?search=money&cursor={cursor}'),
+    ('BookListView ?search&genre', '/api/books/?search=wealth%20hab&genre=Investment'),
+    ('BookSearchView', '/api/books/search/?q=inv'),
+    ('BookDetailView', '/api/books/{book}/'),
+    ('UserReadingHistoryView', '/api/reading-history/?page_size=5'),
+    ('UserReadingHistoryView next page', '/api/reading-history/?page_size=5&cursor={cursor}'),
+    ('WisdomLibraryView', '/api/wisdom-library/'),
+    ('UserPreferencesView', '/api/reading-preferences/'),
+    ('DashboardView', '/api/dashboard/'),
+]
+
+
+def batched(objects, size):
+    """Lists of up to `size` items, so seeding never holds every row in memory"""
+    objects = iter(objects)
+    while batch := list(islice(objects, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN every query the hot views issue on a seeded test database; fails on any full table scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=100000)
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--history', type=int, default=200000, help='Reading history rows')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan')
+
+    def handle(self, *args, **options):
+        if options['history'] > options['users'] * options['books']:
+            raise CommandError('More history rows than (user, book) pairs')
+
+        # Seeded copy of the schema; the configured database is left alone
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            started = time.monotonic()
+            self.seed(np.random.default_rng(options['seed']), options)
+            self.stdout.write(f"Seeded {options['books']} books, {options['history']} history rows "
+                              f"in {time.monotonic() - started:.1f}s")
+            failures = self.check_plans(self.capture_queries(), options['verbose_plans'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if failures:
+            raise CommandError(f"Full table scans in: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('No view query falls back to an unexplained full table scan'))
+
+    def seed(self, rng, options):
+        now = timezone.now()
+        books, users, history = options['books'], options['users'], options['history']
+
+        ratings = np.round(rng.uniform(3.0, 5.0, books), 1)
+        popularity = rng.uniform(0, 10, books)
+        genres = rng.integers(0, len(GENRES), books)
+        levels = rng.integers(0, len(LEVELS), (books, 2))
+        words = rng.integers(0, len(WORDS), (books, 3))
+        for batch in batched((
+            Book(
+                title=f'Book {i}', author=f'Author {i % 5000}', genre=GENRES[genres[i]],
+                description=' '.join(WORDS[w] for w in words[i]),
+                rating=float(ratings[i]), popularity_score=float(popularity[i]),
+                investment_level=LEVELS[levels[i, 0]], difficulty_level=LEVELS[levels[i, 1]]
+            )
+            for i in range(books)
+        ), 5000):
+            Book.objects.bulk_create(batch)
+        for batch in batched((User(username=f'user{i}', password='!') for i in range(users)), 5000):
+            User.objects.bulk_create(batch)
+
+        user_ids = np.array(User.objects.order_by('id').values_list('id', flat=True))
+        book_ids = np.array(Book.objects.order_by('id').values_list('id', flat=True))
+        per_user = -(-history // users)
+        statuses = rng.integers(0, len(STATUSES), history)
+        ages = rng.integers(0, 365 * 24 * 3600, history)
+
+        def history_rows():
+            for n in range(history):
+                user, k = divmod(n, per_user)
+                # Each user's books are consecutive ids from a per-user offset, so (user, book) stays unique
+                yield UserReadingHistory(
+                    user_id=int(user_ids[user]), book_id=int(book_ids[(user * 7919 + k) % books]),
+                    status=STATUSES[statuses[n]], user_rating=float(ratings[n % books]) if statuses[n] == 2 else None,
+                    updated_at=now - timedelta(seconds=int(ages[n]))
+                )
+
+        for batch in batched(history_rows(), 10000):
+            UserReadingHistory.objects.bulk_create(batch)
+
+        # bulk_create skips the Book signals
+        book_search_index.rebuild()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def capture_queries(self):
+        """[(endpoint, sql, params)] for every SELECT the endpoints issue, in order, without repeats"""
+        user = User.objects.order_by('id').first()
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(user)
+        book = Book.objects.order_by('id').first()
+        cursors = {}
+        captured = []
+        current = ['']
+
+        def capture(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+                captured.append((current[0], sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(capture):
+            for name, path in ENDPOINTS:
+                base = name.removesuffix(' next page')
+                if '{cursor}' in path and not cursors.get(base):
+                    raise CommandError(f'{base} has no second page; seed more rows')
+                current[0] = name
+                response = client.get(path.format(book=book.id, cursor=cursors.get(base)))
+                if response.status_code != 200:
+                    raise CommandError(f'{name}: {path} returned {response.status_code}')
+                cursors[name] = response.data.get('next_cursor') if isinstance(response.data, dict) else None
+
+        seen = set()
+        unique = []
+        for name, sql, params in captured:
+            if sql not in seen:
+                seen.add(sql)
+                unique.append((name, sql, params))
+        return unique
+
+    def check_plans(self, queries, verbose):
+        failures = []
+        prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        for name, sql, params in queries:
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                plan = '\n'.join(' '.join(str(column) for column in row) for row in cursor.fetchall())
+
+            scans = {match for pattern in FULL_SCAN_PATTERNS for match in pattern.findall(plan)}
+            if not re.search(r'\bLIMIT\b', sql):
+                scans.update(FULL_INDEX_SCAN_PATTERN.findall(plan))
+            scans = sorted(scans)
+            allowed = next((reason for pattern, reason in ALLOWED_FULL_SCANS if pattern.search(sql)), None)
+            if scans and allowed:
+                status = self.style.WARNING(f'full scan allowed: {allowed}')
+            elif scans:
+                failures.append(name)
+                status = self.style.ERROR(f"FULL SCAN of {', '.join(scans)}")
+            elif SORT_PATTERN.search(plan):
+                status = 'index, then sort'
+            else:
+                status = self.style.SUCCESS('index')
+            self.stdout.write(f'{name:<36} {self.summarize(sql):<72} {status}')
+            if verbose or (scans and not allowed):
+                self.stdout.write('    ' + sql)
+                self.stdout.write('    ' + plan.replace('\n', '\n    '))
+        return failures
+
+    @staticmethod
+    def summarize(sql):
+        """The statement from its first FROM on, shortened for the report"""
+        sql = sql[sql.find(' FROM ') + 1:] if ' FROM ' in sql else sql
+        return sql if len(sql) <= 72 else sql[:69] + '...'
@@ -0,0 +1,45 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand
+from core.eligibility import eligibility_engine
+from core.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Count how many user profiles qualify for each government benefit scheme'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=50000, help='Profiles loaded per chunk')
+        parser.add_argument(
+            '--output', help='Also write per-user eligibility (user_id plus one 0/1 column per scheme) to this CSV'
+        )
+
+    def handle(self, *args, **options):
+        names = [benefit['name'] for benefit in eligibility_engine.benefits]
+        started = time.monotonic()
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(['user_id'] + names)
+
+                def write_chunk(columns, masks):
+                    matrix = eligibility_engine.eligibility_matrix(masks).astype(int)
+                    writer.writerows(
+                        [user_id] + row for user_id, row in zip(columns['user_id'].tolist(), matrix.tolist())
+                    )
+
+                total, counts = eligibility_engine.count_profiles(
+                    UserProfile.objects.all(), options['chunk_size'], on_chunk=write_chunk
+                )
+        else:
+            total, counts = eligibility_engine.count_profiles(UserProfile.objects.all(), options['chunk_size'])
+
+        elapsed = time.monotonic() - started
+        for name, count in zip(names, counts.tolist()):
+            share = count / total * 100 if total else 0.0
+            self.stdout.write(f'{count:>10}  {share:5.1f}%  {name}')
+        self.stdout.write(self.style.SUCCESS(f'Evaluated {total} profiles in {elapsed:.2f}s'))
+        if options['output']:
+            self.stdout.write(f"Per-user eligibility written to {options['output']}")
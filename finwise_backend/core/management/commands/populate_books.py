@@ -1,14 +1,132 @@
-from django.core.management.base import BaseCommand
-from core.models import Book
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
 from core.book_covers import book_cover_service
-import random
+from core.book_import import ImportRowError, fill_sample_details, normalize_row, read_rows, upsert_books
+from core.catalog_version import bump_catalog_version
+from core.facets import book_facet_service
+from core.search import book_search_index
+
 
 class Command(BaseCommand):
-    help = 'Populate the database with sample financial books'
-    
+    help = 'Populate the database with sample financial books, or bulk import a CSV/JSONL catalog'
 
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*', help='CSV or JSONL catalog files (default: built-in sample books)')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='Input format (default: from file extension)')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Rows upserted per transaction')
+        parser.add_argument('--skip-covers', action='store_true', help='Do not look up cover images')
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Continue after the last committed chunk of an interrupted import (FILE.import-state.json)'
+        )
 
     def handle(self, *args, **options):
+        self.options = options
+        self.started = time.monotonic()
+        self.imported = 0
+        self.failed = 0
+
+        if options['files']:
+            for name in options['files']:
+                self.import_file(Path(name))
+        else:
+            rows = enumerate((fill_sample_details(dict(book)) for book in self.sample_books()), start=1)
+            self.run_pipeline(self.chunks(rows), checkpoint=None)
+
+        # bulk_create skips the Book signals
+        book_search_index.rebuild()
+        book_facet_service.invalidate()
+        bump_catalog_version()
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Imported {self.imported} books in {elapsed:.1f}s '
+                f'({self.imported / max(elapsed, 1e-9):.0f} books/s), {self.failed} rows skipped'
+            )
+        )
+        self.stdout.write('Run build_book_embeddings and build_recommendations to refresh derived data')
+
+    def import_file(self, path: Path):
+        if not path.exists():
+            raise CommandError(f'File not found: {path}')
+        checkpoint = path.with_name(path.name + '.import-state.json')
+        skip = self.load_checkpoint(path, checkpoint) if self.options['resume'] else 0
+        if skip:
+            self.stdout.write(f'{path}: resuming after row {skip}')
+        self.stdout.write(f'Importing {path}...')
+        rows = read_rows(path, self.options['format'], skip=skip)
+        self.run_pipeline(self.chunks(rows), checkpoint=(path, checkpoint))
+        checkpoint.unlink(missing_ok=True)
+
+    def chunks(self, rows):
+        """Yield (last_row_number, normalized rows) per chunk, skipping invalid rows"""
+        chunk = []
+        number = 0
+        for number, row in rows:
+            try:
+                chunk.append(normalize_row(row))
+            except ImportRowError as e:
+                self.failed += 1
+                if self.failed <= 20:
+                    self.stdout.write(self.style.WARNING(f'Row {number} skipped: {e}'))
+            if len(chunk) >= self.options['chunk_size']:
+                yield number, chunk
+                chunk = []
+        if chunk:
+            yield number, chunk
+
+    def run_pipeline(self, chunks, checkpoint):
+        """Resolve covers for the next chunk while the current one is written"""
+        with ThreadPoolExecutor(max_workers=1) as cover_stage:
+            pending = None
+            for number, rows in chunks:
+                covers = None if self.options['skip_covers'] else cover_stage.submit(self.resolve_covers, rows)
+                if pending:
+                    self.write_chunk(*pending, checkpoint)
+                pending = (number, rows, covers)
+            if pending:
+                self.write_chunk(*pending, checkpoint)
+
+    def resolve_covers(self, rows):
+        missing = [row for row in rows if not row.get('cover_image_url')]
+        # Get book covers from multiple sources with fallbacks, looked up concurrently
+        covers = book_cover_service.get_book_covers(
+            (row['title'], row['author'], row.get('genre', '')) for row in missing
+        )
+        for row, cover_image_url in zip(missing, covers):
+            row['cover_image_url'] = cover_image_url
+
+    def write_chunk(self, number, rows, covers, checkpoint):
+        if covers is not None:
+            covers.result()
+        self.imported += upsert_books(rows)
+        if checkpoint:
+            self.save_checkpoint(*checkpoint, number)
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(f'{self.imported} books ({self.imported / max(elapsed, 1e-9):.0f} books/s)')
+
+    def load_checkpoint(self, path: Path, checkpoint: Path) -> int:
+        """Rows already committed from this exact file (0 if it changed since)"""
+        try:
+            state = json.loads(checkpoint.read_text())
+        except (OSError, ValueError):
+            return 0
+        stat = path.stat()
+        if state.get('size') != stat.st_size or state.get('mtime') != stat.st_mtime:
+            self.stdout.write(self.style.WARNING(f'{path} changed since the interrupted import; starting over'))
+            return 0
+        return int(state.get('rows_done', 0))
+
+    def save_checkpoint(self, path: Path, checkpoint: Path, rows_done: int):
+        stat = path.stat()
+        checkpoint.write_text(json.dumps({'rows_done': rows_done, 'size': stat.st_size, 'mtime': stat.st_mtime}))
+
+    def sample_books(self):
         books_data = [
             # Business & Management Books
             {
@@ -259,45 +377,4 @@ class Command(BaseCommand):
             }
         ]
 
-        for book_data in books_data:
-            # Get book cover from multiple sources with fallbacks
-            book_data['cover_image_url'] = book_cover_service.get_book_cover(
-                book_data['title'], 
-                book_data['author'], 
-                book_data['genre']
-            )
-            
-            # Generate Amazon URL
-            book_data['amazon_url'] = f"https://www.amazon.com/s?k={book_data['title'].replace(' ', '+')}+{book_data['author'].replace(' ', '+')}"
-            
-            # Set random price between 10 and 50
-            book_data['price'] = round(random.uniform(10, 50), 2)
-            
-            # Set random pages between 200 and 500
-            book_data['pages'] = random.randint(200, 500)
-            
-            # Set publication year between 1990 and 2023
-            book_data['publication_year'] = random.randint(1990, 2023)
-            
-            # Generate ISBN
-            book_data['isbn'] = f"978-{random.randint(100000000, 999999999)}"
-            
-            # Create or update book
-            book, created = Book.objects.get_or_create(
-                title=book_data['title'],
-                author=book_data['author'],
-                defaults=book_data
-            )
-            
-            if created:
-                self.stdout.write(
-                    self.style.SUCCESS(f'Successfully created book: {book.title}')
-                )
-            else:
-                self.stdout.write(
-                    self.style.WARNING(f'Book already exists: {book.title}')
-                )
-
-        self.stdout.write(
-            self.style.SUCCESS(f'Successfully populated {len(books_data)} books')
-        ) 
\ No newline at end of file
+        return books_data
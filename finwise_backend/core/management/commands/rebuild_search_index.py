@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from core.models import Book
+from core.search import book_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the book full-text search index (needed after bulk_create or queryset.update)'
+
+    def handle(self, *args, **options):
+        if not book_search_index.is_supported():
+            self.stdout.write(self.style.WARNING('Database has no full-text support; search uses icontains'))
+            return
+        book_search_index.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {Book.objects.count()} books'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_book_userreadingpreference_bookrecommendation_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookrecommendation',
+            index=models.Index(fields=['user', '-recommendation_score'], name='bookrec_user_score_idx'),
+        ),
+    ]
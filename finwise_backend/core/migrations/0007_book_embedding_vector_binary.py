@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_bookrecommendation_user_score_index'),
+    ]
+
+    # The TextField was never written, so it is dropped and re-added as binary
+    # instead of converted in place.
+    operations = [
+        migrations.RemoveField(
+            model_name='book',
+            name='embedding_vector',
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='embedding_vector',
+            field=models.BinaryField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_book_embedding_vector_binary'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='book',
+            options={'ordering': ['-rating', '-popularity_score', 'id']},
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:40
+
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_book_fts USING fts5("
+    "title, author, genre, description, financial_topics, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "INSERT INTO core_book_fts(rowid, title, author, genre, description, financial_topics) "
+    "SELECT id, title, author, genre, description, financial_topics FROM core_book",
+]
+SQLITE_BACKWARD = ["DROP TABLE IF EXISTS core_book_fts"]
+
+POSTGRES_FORWARD = [
+    "CREATE TABLE IF NOT EXISTS core_book_search ("
+    "book_id bigint PRIMARY KEY REFERENCES core_book(id) ON DELETE CASCADE, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS core_book_search_document_idx ON core_book_search USING GIN (document)",
+    "INSERT INTO core_book_search(book_id, document) SELECT id, "
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(author, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(genre, '') || ' ' || coalesce(financial_topics, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'D') "
+    "FROM core_book",
+]
+POSTGRES_BACKWARD = ["DROP TABLE IF EXISTS core_book_search"]
+
+
+def run(statements_by_vendor):
+    def apply(apps, schema_editor):
+        statements = statements_by_vendor.get(schema_editor.connection.vendor, [])
+        if schema_editor.connection.vendor == 'sqlite':
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+                # Builds without FTS5 use the icontains fallback in core/search.py
+                if not cursor.fetchone()[0]:
+                    return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return apply
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_book_ordering_id_tiebreak'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:05
+
+from django.db import migrations, models
+
+
+def merge_duplicate_books(apps, schema_editor):
+    """Keep the oldest book of each (title, author) and move its duplicates' rows onto it"""
+    Book = apps.get_model('core', 'Book')
+    UserReadingHistory = apps.get_model('core', 'UserReadingHistory')
+    BookRecommendation = apps.get_model('core', 'BookRecommendation')
+
+    kept = {}
+    duplicates = {}  # duplicate book id -> kept book id
+    for book_id, title, author in Book.objects.order_by('id').values_list('id', 'title', 'author'):
+        if (title, author) in kept:
+            duplicates[book_id] = kept[(title, author)]
+        else:
+            kept[(title, author)] = book_id
+    if not duplicates:
+        return
+
+    # (user, book) is unique: where a user has rows for both books, the most recently updated one wins
+    for history in UserReadingHistory.objects.filter(book_id__in=duplicates).order_by('id'):
+        target = duplicates[history.book_id]
+        existing = UserReadingHistory.objects.filter(user_id=history.user_id, book_id=target).first()
+        if existing is not None:
+            if existing.updated_at >= history.updated_at:
+                history.delete()
+                continue
+            existing.delete()
+        UserReadingHistory.objects.filter(pk=history.pk).update(book_id=target)
+
+    # Recommendations are recomputed anyway; drop the ones that would collide
+    for recommendation in BookRecommendation.objects.filter(book_id__in=duplicates).order_by('id'):
+        target = duplicates[recommendation.book_id]
+        if BookRecommendation.objects.filter(user_id=recommendation.user_id, book_id=target).exists():
+            recommendation.delete()
+        else:
+            BookRecommendation.objects.filter(pk=recommendation.pk).update(book_id=target)
+
+    Book.objects.filter(id__in=duplicates).delete()
+
+    # Historical models send no signals; drop the SQLite full-text rows of the removed books
+    # (the Postgres search table cascades on its foreign key)
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite' and 'core_book_fts' in connection.introspection.table_names():
+        with connection.cursor() as cursor:
+            for book_id in duplicates:
+                cursor.execute("DELETE FROM core_book_fts WHERE rowid = %s", [book_id])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_book_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_books, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='book',
+            constraint=models.UniqueConstraint(fields=('title', 'author'), name='book_title_author_uniq'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def drop_duplicate_summaries(apps, schema_editor):
+    """Keep each user's newest summary; it is recomputed on the next profile save"""
+    DashboardSummary = apps.get_model('core', 'DashboardSummary')
+    newest = {}
+    for summary_id, user_id in DashboardSummary.objects.order_by('id').values_list('id', 'user_id'):
+        newest[user_id] = summary_id
+    DashboardSummary.objects.exclude(id__in=newest.values()).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_book_title_author_unique'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dashboardsummary',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(drop_duplicate_summaries, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='dashboardsummary',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
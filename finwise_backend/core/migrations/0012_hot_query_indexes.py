@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_dashboardsummary_one_per_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['-rating', '-popularity_score', 'id'], name='book_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['genre', '-rating', '-popularity_score', 'id'], name='book_genre_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['difficulty_level', '-rating', '-popularity_score', 'id'], name='book_difficulty_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['investment_level', '-rating', '-popularity_score', 'id'], name='book_level_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['-popularity_score', 'rating'], name='book_popularity_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userreadinghistory',
+            index=models.Index(fields=['user', '-updated_at', 'id'], name='history_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userreadinghistory',
+            index=models.Index(fields=['user', 'status'], name='history_user_status_idx'),
+        ),
+    ]
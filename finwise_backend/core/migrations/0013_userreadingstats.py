@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserReadingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_books', models.IntegerField(default=0)),
+                ('completed_books', models.IntegerField(default=0)),
+                ('currently_reading', models.IntegerField(default=0)),
+                ('want_to_read', models.IntegerField(default=0)),
+                ('rated_books', models.IntegerField(default=0)),
+                ('rating_total', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
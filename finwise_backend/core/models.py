@@ -43,13 +43,15 @@ class UserProfile(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
 class DashboardSummary(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    """Dashboard figures precomputed from the profile; refreshed when the profile is saved"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE)
     total_savings = models.FloatField(default=0.0)
     monthly_savings = models.FloatField(default=0.0)
     savings_goal = models.FloatField(default=0.0)
     progress_percentage = models.FloatField(default=0.0)
     recommendations = models.TextField(blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
 class Book(models.Model):
     """Financial and self-help books for the wisdom library"""
@@ -72,14 +74,27 @@ class Book(models.Model):
     difficulty_level = models.CharField(max_length=20, default='Beginner')  # Beginner, Intermediate, Advanced
     
     # ML features
-    embedding_vector = models.TextField(blank=True)  # Store book embedding for similarity
+    embedding_vector = models.BinaryField(null=True, blank=True, editable=False)  # float16 embedding, see core/embeddings.py
     popularity_score = models.FloatField(default=0.0)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['-rating', '-popularity_score']
+        ordering = ['-rating', '-popularity_score', 'id']
+        constraints = [
+            # Catalog identity; bulk imports upsert on it
+            models.UniqueConstraint(fields=['title', 'author'], name='book_title_author_uniq'),
+        ]
+        indexes = [
+            # Book list ordering and keyset pagination (core/pagination.py), unfiltered and per filter
+            models.Index(fields=['-rating', '-popularity_score', 'id'], name='book_rank_idx'),
+            models.Index(fields=['genre', '-rating', '-popularity_score', 'id'], name='book_genre_rank_idx'),
+            models.Index(fields=['difficulty_level', '-rating', '-popularity_score', 'id'], name='book_difficulty_rank_idx'),
+            models.Index(fields=['investment_level', '-rating', '-popularity_score', 'id'], name='book_level_rank_idx'),
+            # Popular-book fallback: rating >= x by popularity
+            models.Index(fields=['-popularity_score', 'rating'], name='book_popularity_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} by {self.author}"
@@ -141,6 +156,23 @@ class UserReadingHistory(models.Model):
 
     class Meta:
         unique_together = ['user', 'book']
+        indexes = [
+            # Reading history pages and recent books (newest first), data version for ETags
+            models.Index(fields=['user', '-updated_at', 'id'], name='history_user_updated_idx'),
+            # Per-status counts and completed books
+            models.Index(fields=['user', 'status'], name='history_user_status_idx'),
+        ]
+
+class UserReadingStats(models.Model):
+    """Per-user reading history counts, kept up to date incrementally (core/reading_stats.py)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    total_books = models.IntegerField(default=0)
+    completed_books = models.IntegerField(default=0)
+    currently_reading = models.IntegerField(default=0)
+    want_to_read = models.IntegerField(default=0)
+    rated_books = models.IntegerField(default=0)
+    rating_total = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
 
 class BookRecommendation(models.Model):
     """ML-generated book recommendations for users"""
@@ -163,3 +195,7 @@ class BookRecommendation(models.Model):
     class Meta:
         unique_together = ['user', 'book']
         ordering = ['-recommendation_score']
+        indexes = [
+            # Per-user top-N read in WisdomLibraryView
+            models.Index(fields=['user', '-recommendation_score'], name='bookrec_user_score_idx'),
+        ]
@@ -0,0 +1,102 @@
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPaginator:
+    """Keyset (seek) pagination over a fixed, unique ordering.
+
+    The cursor encodes the ordering values of the last row served, and the
+    next page is fetched with a lexicographic "after this row" filter, so
+    every page costs one indexed range scan however deep the client pages
+    and rows inserted meanwhile never shift or duplicate results. The last
+    ordering field must be unique (e.g. id) and none may be NULL.
+    """
+
+    def __init__(self, ordering, default_page_size=20, max_page_size=100):
+        self.ordering = ordering  # e.g. ['-rating', '-popularity_score', 'id']
+        self.default_page_size = default_page_size
+        self.max_page_size = max_page_size
+
+    def paginate(self, queryset, request):
+        """Return (rows, next_cursor); next_cursor is None on the last page"""
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            queryset = queryset.filter(self.after(queryset.model, self.decode_cursor(cursor)))
+
+        rows = list(queryset[:page_size + 1])
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, self.encode_cursor(rows[-1])
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get('page_size', self.default_page_size))
+        except (TypeError, ValueError):
+            page_size = self.default_page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def after(self, model, values):
+        """Q matching rows strictly after `values` in the ordering"""
+        condition = Q()
+        equal_prefix = {}
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            value = self.from_json(model, name, value)
+            condition |= Q(**equal_prefix, **{f'{name}__{lookup}': value})
+            equal_prefix[name] = value
+        return condition
+
+    def encode_cursor(self, row):
+        values = [self.to_json(getattr(row, field.lstrip('-'))) for field in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise InvalidCursor('Invalid cursor')
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidCursor('Invalid cursor')
+        return values
+
+    @staticmethod
+    def to_json(value):
+        # Full-precision ISO timestamps; DjangoJSONEncoder would drop microseconds
+        return value.isoformat() if hasattr(value, 'isoformat') else value
+
+    @staticmethod
+    def from_json(model, name, value):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            field = models.FloatField()  # numeric annotation, e.g. search_rank
+        if isinstance(field, models.DateTimeField):
+            parsed = parse_datetime(value) if isinstance(value, str) else None
+            if parsed is None:
+                raise InvalidCursor('Invalid cursor')
+            return parsed
+        if isinstance(field, (models.FloatField, models.IntegerField)):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise InvalidCursor('Invalid cursor')
+        return value
+
+
+book_paginator = KeysetPaginator(['-rating', '-popularity_score', 'id'])
+reading_history_paginator = KeysetPaginator(['-updated_at', 'id'])
+# Full-text matches, best first; ties (icontains fallback) keep the catalog order
+search_paginator = KeysetPaginator(['search_rank', '-rating', '-popularity_score', 'id'])
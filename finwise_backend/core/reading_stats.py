@@ -0,0 +1,110 @@
+from typing import Any, Dict, Optional, Tuple
+
+from django.db.models import Count, F, Q, Sum
+
+from .models import UserReadingHistory, UserReadingStats
+
+# Reading status -> UserReadingStats counter ('abandoned' only counts towards total_books)
+STATUS_COUNTERS = {
+    'completed': 'completed_books',
+    'currently_reading': 'currently_reading',
+    'want_to_read': 'want_to_read',
+}
+
+
+def reading_stats_counters() -> Dict[str, Any]:
+    """UserReadingStats fields as conditional aggregates over UserReadingHistory"""
+    counters = {
+        'total_books': Count('id'),
+        'rated_books': Count('user_rating'),
+        'rating_total': Sum('user_rating', default=0.0),
+    }
+    for status, field in STATUS_COUNTERS.items():
+        counters[field] = Count('id', filter=Q(status=status))
+    return counters
+
+
+def aggregate_reading_stats(user_id: int) -> Dict[str, Any]:
+    """All UserReadingStats counters for a user from their history, in one query"""
+    return UserReadingHistory.objects.filter(user_id=user_id).aggregate(**reading_stats_counters())
+
+
+def rebuild_reading_stats(user_id: int) -> UserReadingStats:
+    stats, _ = UserReadingStats.objects.update_or_create(user_id=user_id, defaults=aggregate_reading_stats(user_id))
+    return stats
+
+
+def history_state(history: UserReadingHistory) -> Optional[Tuple[str, Optional[float]]]:
+    """(status, user_rating) as loaded, or None if either field was deferred"""
+    values = history.__dict__
+    if 'status' not in values or 'user_rating' not in values:
+        return None
+    return values['status'], values['user_rating']
+
+
+def apply_history_save(history: UserReadingHistory, created: bool):
+    """Bring the stats row in step with a saved history row (post_save, see core/signals.py).
+
+    The previous status and rating come from the snapshot taken when the row
+    was loaded. queryset.update() and bulk writes skip signals; run
+    rebuild_reading_stats() after them.
+    """
+    old = None if created else getattr(history, '_stats_state', None)
+    if not created and old is None:
+        # Previous values unknown: drop the row, the next read rebuilds it
+        UserReadingStats.objects.filter(user_id=history.user_id).delete()
+    else:
+        old_status, old_rating = old or (None, None)
+        record_history_change(
+            history.user_id, created, old_status, old_rating, history.status, history.user_rating
+        )
+    history._stats_state = (history.status, history.user_rating)
+
+
+def record_history_change(user_id: int, created: bool, old_status: Optional[str], old_rating: Optional[float],
+                          new_status: str, new_rating: Optional[float]):
+    """Apply one history row's change to the user's stats row with in-place counter updates"""
+    deltas: Dict[str, float] = {}
+
+    def add(field, amount):
+        if field is not None:
+            deltas[field] = deltas.get(field, 0) + amount
+
+    if created:
+        add('total_books', 1)
+    elif old_status != new_status:
+        add(STATUS_COUNTERS.get(old_status), -1)
+    if created or old_status != new_status:
+        add(STATUS_COUNTERS.get(new_status), 1)
+    if new_rating != old_rating:
+        if old_rating is not None:
+            add('rated_books', -1)
+            add('rating_total', -old_rating)
+        if new_rating is not None:
+            add('rated_books', 1)
+            add('rating_total', new_rating)
+
+    deltas = {field: amount for field, amount in deltas.items() if amount}
+    if not deltas:
+        return
+    updated = UserReadingStats.objects.filter(user_id=user_id).update(
+        **{field: F(field) + amount for field, amount in deltas.items()}
+    )
+    if not updated:
+        # No row yet (or dropped after a delete): build it from the history, which already has the change
+        rebuild_reading_stats(user_id)
+
+
+def get_reading_statistics(user) -> Dict[str, Any]:
+    """Reading statistics for the Wisdom Library from the stats row (one query; built on first use)"""
+    stats = UserReadingStats.objects.filter(user=user).first() or rebuild_reading_stats(user.pk)
+    average = stats.rating_total / stats.rated_books if stats.rated_books else 0.0
+    total = stats.total_books
+    return {
+        'total_books': total,
+        'completed_books': stats.completed_books,
+        'currently_reading': stats.currently_reading,
+        'want_to_read': stats.want_to_read,
+        'average_rating': round(average, 1),
+        'completion_rate': round((stats.completed_books / total * 100) if total > 0 else 0, 1)
+    }
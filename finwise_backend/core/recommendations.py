@@ -0,0 +1,312 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .conditional import mark_user_data_changed
+from .models import Book, BookRecommendation, UserProfile, UserReadingHistory, UserReadingPreference
+from .scoring import get_scoring_engine
+
+RECOMMENDATION_TYPE = 'content-based'
+
+
+class BookRecommender:
+    """Content-based book scoring from the user's financial profile and reading preferences"""
+
+    def get_financial_genres(self, profile):
+        """Determine relevant genres based on financial profile"""
+        genres = []
+
+        if profile.income > 1000000:  # High income
+            genres.extend(['Business & Management', 'Investment'])
+        elif profile.income > 500000:  # Medium income
+            genres.extend(['Business & Management', 'Self-Help / Personal Growth'])
+        else:  # Lower income
+            genres.extend(['Self-Help / Personal Growth', 'Psychology'])
+
+        if profile.age < 30:
+            genres.append('Self-Help / Personal Growth')
+        elif profile.age > 50:
+            genres.extend(['Investment', 'Psychology'])
+
+        if profile.investment_amount > 100000:
+            genres.append('Investment')
+
+        return list(set(genres))
+
+    def get_investment_levels(self, profile):
+        """Determine appropriate investment levels based on profile"""
+        if profile.investment_amount > 500000:
+            return ['Advanced', 'Intermediate']
+        elif profile.investment_amount > 100000:
+            return ['Intermediate', 'Beginner']
+        else:
+            return ['Beginner']
+
+    def get_candidate_mask(self, engine, profile, preferences, completed_book_ids):
+        """Books matching the user's genres or investment levels, minus completed ones"""
+        catalog = engine.catalog
+        preferred_genres = set(preferences.preferred_genres) | set(self.get_financial_genres(profile))
+        mask = catalog.genre_mask(preferred_genres) | catalog.level_mask(self.get_investment_levels(profile))
+        if completed_book_ids:
+            mask &= ~np.isin(catalog.ids, list(completed_book_ids))
+        return mask
+
+    def calculate_recommendation_score(self, book, user, profile, preferences):
+        """Calculate ML-based recommendation score (reference for ScoringEngine)"""
+        score = 0.0
+
+        # Base score from book rating
+        score += book.rating * 0.3
+
+        # Genre preference score
+        if book.genre in preferences.preferred_genres:
+            score += 0.4
+
+        # Financial relevance score
+        financial_relevance = self.calculate_financial_relevance(book, profile)
+        score += financial_relevance * 0.3
+
+        # Popularity bonus
+        score += book.popularity_score * 0.1
+
+        return score
+
+    def calculate_financial_relevance(self, book, profile):
+        """Calculate how relevant a book is to user's financial situation"""
+        relevance = 0.0
+
+        # Income-based relevance
+        if profile.income > 1000000 and book.genre == 'Business & Management':
+            relevance += 0.5
+        elif profile.income < 500000 and book.genre == 'Self-Help / Personal Growth':
+            relevance += 0.5
+
+        # Investment level relevance
+        if profile.investment_amount > 500000 and book.investment_level == 'Advanced':
+            relevance += 0.3
+        elif profile.investment_amount < 100000 and book.investment_level == 'Beginner':
+            relevance += 0.3
+
+        # Age-based relevance
+        if profile.age < 30 and book.genre == 'Self-Help / Personal Growth':
+            relevance += 0.2
+        elif profile.age > 50 and book.genre == 'Investment':
+            relevance += 0.2
+
+        return relevance
+
+    def get_recommendation_reason(self, book, profile, preferences):
+        """Generate human-readable reason for recommendation"""
+        reasons = []
+
+        if book.genre in preferences.preferred_genres:
+            reasons.append(f"Matches your preferred genre: {book.genre}")
+
+        if profile.income > 1000000 and book.genre == 'Business & Management':
+            reasons.append("Perfect for high-income professionals")
+        elif profile.income < 500000 and book.genre == 'Self-Help / Personal Growth':
+            reasons.append("Great for building financial foundation")
+
+        if book.rating >= 4.0:
+            reasons.append("Highly rated by readers")
+
+        if book.investment_level == 'Beginner' and profile.investment_amount < 100000:
+            reasons.append("Perfect for beginners")
+        elif book.investment_level == 'Advanced' and profile.investment_amount > 500000:
+            reasons.append("Advanced strategies for experienced investors")
+
+        return " • ".join(reasons) if reasons else "Recommended based on your profile"
+
+    def rank_books(self, user, profile, preferences, limit):
+        """Score the whole catalog and return the top (book, score, reason) tuples"""
+        engine = get_scoring_engine()
+        completed = UserReadingHistory.objects.filter(user=user, status='completed').values_list('book_id', flat=True)
+        scores = engine.score_user(profile.income, profile.age, profile.investment_amount, preferences.preferred_genres)
+        mask = self.get_candidate_mask(engine, profile, preferences, set(completed))
+        positions = engine.top_k(scores, mask, limit)
+        return self._ranked_books(engine, positions, scores, profile, preferences)
+
+    def rank_books_batch(self, users, profiles, preferences, completed, limit):
+        """rank_books for many users with one vectorized (users x books) scoring pass"""
+        engine = get_scoring_engine()
+        scores = engine.score_users(
+            [profiles[u.id].income for u in users],
+            [profiles[u.id].age for u in users],
+            [profiles[u.id].investment_amount for u in users],
+            engine.preferred_genre_matrix([preferences[u.id].preferred_genres for u in users])
+        )
+        top_positions = {}
+        for row, user in enumerate(users):
+            mask = self.get_candidate_mask(engine, profiles[user.id], preferences[user.id], completed.get(user.id))
+            top_positions[user.id] = (row, engine.top_k(scores[row], mask, limit))
+
+        book_ids = set()
+        for _, positions in top_positions.values():
+            book_ids.update(engine.catalog.ids[positions].tolist())
+        books = Book.objects.in_bulk(book_ids)
+        return {
+            user.id: self._ranked_books(
+                engine, top_positions[user.id][1], scores[top_positions[user.id][0]],
+                profiles[user.id], preferences[user.id], books
+            )
+            for user in users
+        }
+
+    def _ranked_books(self, engine, positions, scores, profile, preferences, books=None):
+        book_ids = engine.catalog.ids[positions].tolist()
+        if books is None:
+            books = Book.objects.in_bulk(book_ids)
+        return [
+            (books[book_id], float(scores[position]), self.get_recommendation_reason(books[book_id], profile, preferences))
+            for book_id, position in zip(book_ids, positions.tolist()) if book_id in books
+        ]
+
+
+recommender = BookRecommender()
+
+
+def refresh_recommendations(user, profile=None, preferences=None):
+    """Recompute and persist the user's top-N BookRecommendation rows"""
+    if profile is None:
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+    if preferences is None:
+        preferences, _ = UserReadingPreference.objects.get_or_create(user=user)
+
+    ranked = recommender.rank_books(user, profile, preferences, settings.BOOK_RECOMMENDATIONS_TOP_N)
+    return store_recommendations({user.id: ranked})
+
+
+def refresh_recommendations_batch(users):
+    """Recompute recommendations for a batch of users with one scoring pass"""
+    users = list(users)
+    user_ids = [u.id for u in users]
+    profiles = {p.user_id: p for p in UserProfile.objects.filter(user_id__in=user_ids)}
+    preferences = {p.user_id: p for p in UserReadingPreference.objects.filter(user_id__in=user_ids)}
+    completed = {}
+    for user_id, book_id in UserReadingHistory.objects.filter(
+        user_id__in=user_ids, status='completed'
+    ).values_list('user_id', 'book_id'):
+        completed.setdefault(user_id, set()).add(book_id)
+
+    # Users without saved rows are scored with model defaults, like get_or_create would
+    for user in users:
+        profiles.setdefault(user.id, UserProfile(user=user))
+        preferences.setdefault(user.id, UserReadingPreference(user=user))
+
+    ranked = recommender.rank_books_batch(
+        users, profiles, preferences, completed, settings.BOOK_RECOMMENDATIONS_TOP_N
+    )
+    return store_recommendations(ranked)
+
+
+def store_recommendations(ranked_by_user):
+    """Replace the BookRecommendation rows of each user with the ranked books"""
+    user_ids = list(ranked_by_user)
+    expires_at = timezone.now() + timedelta(hours=settings.BOOK_RECOMMENDATIONS_TTL_HOURS)
+
+    with transaction.atomic():
+        # Keep interaction flags for books that stay recommended
+        flags = {
+            (row['user_id'], row['book_id']): row
+            for row in BookRecommendation.objects.filter(user_id__in=user_ids).values(
+                'user_id', 'book_id', 'is_viewed', 'is_clicked', 'is_added_to_list'
+            )
+        }
+        BookRecommendation.objects.filter(user_id__in=user_ids).delete()
+        rows = []
+        for user_id, ranked in ranked_by_user.items():
+            for book, score, reason in ranked:
+                previous = flags.get((user_id, book.id), {})
+                rows.append(BookRecommendation(
+                    user_id=user_id,
+                    book=book,
+                    recommendation_score=score,
+                    recommendation_reason=reason,
+                    recommendation_type=RECOMMENDATION_TYPE,
+                    is_viewed=previous.get('is_viewed', False),
+                    is_clicked=previous.get('is_clicked', False),
+                    is_added_to_list=previous.get('is_added_to_list', False),
+                    expires_at=expires_at
+                ))
+        rows = BookRecommendation.objects.bulk_create(rows)
+    # bulk_create sends no signals; the stored rows are part of the conditional GET version
+    mark_user_data_changed()
+    return rows
+
+
+class RecommendationRefresher:
+    """Recomputes stored recommendations off the request path.
+
+    schedule() runs once the current transaction commits and hands the user
+    to a single background worker; a user already queued is not queued
+    again, so a burst of writes costs one recompute.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def schedule(self, user_id):
+        transaction.on_commit(lambda: self.submit(user_id))
+
+    def submit(self, user_id):
+        if not getattr(settings, 'BOOK_RECOMMENDATIONS_REFRESH_IN_BACKGROUND', True):
+            self.run(user_id)
+            return None
+        with self._lock:
+            if user_id in self._pending:
+                return None
+            self._pending.add(user_id)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='recommendations')
+        return self._executor.submit(self._run_queued, user_id)
+
+    def _run_queued(self, user_id):
+        # Leave the queue before reading, so a write made during the recompute queues another
+        with self._lock:
+            self._pending.discard(user_id)
+        try:
+            self.run(user_id)
+        finally:
+            close_old_connections()
+
+    def run(self, user_id):
+        try:
+            user = User.objects.filter(pk=user_id).first()
+            if user is not None:
+                refresh_recommendations(user)
+        except Exception as e:
+            print(f"Recommendation refresh error for user {user_id}: {e}")
+
+
+refresher = RecommendationRefresher()
+
+
+def refresh_recommendations_later(user):
+    """After a profile, preference or reading-history change: expire the stored rows, recompute in the background.
+
+    Until the recompute lands, readers rank in memory (rank_current_recommendations).
+    """
+    BookRecommendation.objects.filter(user=user, expires_at__gt=timezone.now()).update(expires_at=timezone.now())
+    refresher.schedule(user.id)
+
+
+def rank_current_recommendations(user, profile, preferences):
+    """(book, score, reason) tuples computed now, without storing them"""
+    return recommender.rank_books(user, profile, preferences, settings.BOOK_RECOMMENDATIONS_TOP_N)
+
+
+def get_stored_recommendations(user):
+    """Unexpired precomputed recommendations, best first, with their books"""
+    return list(
+        BookRecommendation.objects.filter(user=user, expires_at__gt=timezone.now())
+        .select_related('book')
+        .order_by('-recommendation_score')[:settings.BOOK_RECOMMENDATIONS_TOP_N]
+    )
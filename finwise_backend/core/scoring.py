@@ -0,0 +1,171 @@
+import threading
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+from django.db.models import Count, Max
+
+from .catalog_version import CatalogVersion
+from .models import Book
+
+# Genres and investment levels referenced by the scoring rules
+BUSINESS = 'Business & Management'
+SELF_HELP = 'Self-Help / Personal Growth'
+INVESTMENT = 'Investment'
+ADVANCED = 'Advanced'
+BEGINNER = 'Beginner'
+
+
+class BookCatalog:
+    """Column arrays of the book catalog, in Book.Meta.ordering order"""
+
+    def __init__(self, ids, rating, popularity, genres: Sequence[str], investment_levels: Sequence[str]):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.rating = np.asarray(rating, dtype=np.float64)
+        self.popularity = np.asarray(popularity, dtype=np.float64)
+        self.genre_vocab, self.genre_codes = self._encode(genres)
+        self.level_vocab, self.level_codes = self._encode(investment_levels)
+
+    @staticmethod
+    def _encode(values: Sequence[str]):
+        vocab: Dict[str, int] = {}
+        codes = np.fromiter((vocab.setdefault(v, len(vocab)) for v in values), dtype=np.int32, count=len(values))
+        return vocab, codes
+
+    @classmethod
+    def from_db(cls):
+        rows = list(
+            Book.objects.order_by('-rating', '-popularity_score', 'id')
+            .values_list('id', 'rating', 'popularity_score', 'genre', 'investment_level')
+        )
+        if not rows:
+            return cls([], [], [], [], [])
+        ids, rating, popularity, genres, levels = zip(*rows)
+        return cls(ids, rating, popularity, genres, levels)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def genre_mask(self, genres: Iterable[str]) -> np.ndarray:
+        codes = [self.genre_vocab[g] for g in genres if g in self.genre_vocab]
+        return np.isin(self.genre_codes, codes)
+
+    def level_mask(self, levels: Iterable[str]) -> np.ndarray:
+        codes = [self.level_vocab[l] for l in levels if l in self.level_vocab]
+        return np.isin(self.level_codes, codes)
+
+    def is_genre(self, genre: str) -> np.ndarray:
+        return self.genre_codes == self.genre_vocab.get(genre, -1)
+
+    def is_level(self, level: str) -> np.ndarray:
+        return self.level_codes == self.level_vocab.get(level, -1)
+
+
+class ScoringEngine:
+    """Vectorized BookRecommender.calculate_recommendation_score over a whole catalog.
+
+    The profile rules only branch on income, investment and age thresholds,
+    so the financial-relevance term is precomputed once per (income, investment,
+    age) class. Terms are added in the same order as the scalar formula, so
+    scores match it exactly (bit for bit in float64).
+    """
+
+    def __init__(self, catalog: BookCatalog):
+        self.catalog = catalog
+        self._base = catalog.rating * 0.3
+        self._popularity_term = catalog.popularity * 0.1
+        self._relevance_terms = self._build_relevance_terms()
+
+    def _build_relevance_terms(self) -> np.ndarray:
+        """relevance * 0.3 for each of the 27 profile classes, shape (27, books)"""
+        c = self.catalog
+        business, self_help, investment = c.is_genre(BUSINESS), c.is_genre(SELF_HELP), c.is_genre(INVESTMENT)
+        advanced, beginner = c.is_level(ADVANCED), c.is_level(BEGINNER)
+        # Class 0 and 1 are the if/elif branches of each rule, class 2 matches neither
+        income_rules = [(business, 0.5), (self_help, 0.5), (None, 0.0)]
+        investment_rules = [(advanced, 0.3), (beginner, 0.3), (None, 0.0)]
+        age_rules = [(self_help, 0.2), (investment, 0.2), (None, 0.0)]
+
+        terms = np.zeros((27, len(c)))
+        for i, income_rule in enumerate(income_rules):
+            for j, investment_rule in enumerate(investment_rules):
+                for k, age_rule in enumerate(age_rules):
+                    relevance = np.zeros(len(c))
+                    for mask, weight in (income_rule, investment_rule, age_rule):
+                        if mask is not None:
+                            relevance += np.where(mask, weight, 0.0)
+                    terms[i * 9 + j * 3 + k] = relevance * 0.3
+        return terms
+
+    @staticmethod
+    def profile_class(income, age, investment_amount) -> np.ndarray:
+        """Index into the relevance terms for scalar or array profile values"""
+        income = np.asarray(income, dtype=np.float64)
+        age = np.asarray(age, dtype=np.float64)
+        investment_amount = np.asarray(investment_amount, dtype=np.float64)
+        income_class = np.where(income > 1000000, 0, np.where(income < 500000, 1, 2))
+        investment_class = np.where(investment_amount > 500000, 0, np.where(investment_amount < 100000, 1, 2))
+        age_class = np.where(age < 30, 0, np.where(age > 50, 1, 2))
+        return income_class * 9 + investment_class * 3 + age_class
+
+    def score_user(self, income: float, age: float, investment_amount: float,
+                   preferred_genres: Iterable[str]) -> np.ndarray:
+        """Scores of every book in the catalog for one user"""
+        score = self._base + np.where(self.catalog.genre_mask(preferred_genres), 0.4, 0.0)
+        score += self._relevance_terms[int(self.profile_class(income, age, investment_amount))]
+        score += self._popularity_term
+        return score
+
+    def score_users(self, income: Sequence[float], age: Sequence[float], investment_amount: Sequence[float],
+                    preferred: np.ndarray) -> np.ndarray:
+        """Score matrix (users x books) for many users at once.
+
+        ``preferred`` is a (users x len(genre_vocab)) boolean matrix of each
+        user's preferred genres, see preferred_genre_matrix().
+        """
+        score = np.where(preferred[:, self.catalog.genre_codes], 0.4, 0.0)
+        score += self._base
+        score += self._relevance_terms[self.profile_class(income, age, investment_amount)]
+        score += self._popularity_term
+        return score
+
+    def preferred_genre_matrix(self, preferred_genres: Sequence[Iterable[str]]) -> np.ndarray:
+        """Boolean (users x genres) matrix from each user's preferred genre list"""
+        vocab = self.catalog.genre_vocab
+        matrix = np.zeros((len(preferred_genres), max(len(vocab), 1)), dtype=bool)
+        for row, genres in enumerate(preferred_genres):
+            matrix[row, [vocab[g] for g in genres if g in vocab]] = True
+        return matrix
+
+    @staticmethod
+    def top_k(scores: np.ndarray, mask: Optional[np.ndarray], k: int) -> np.ndarray:
+        """Catalog positions of the k best masked scores (ties keep catalog order)"""
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+        # Widen to every position tied with the k-th score so tie-breaking is stable
+        threshold = scores[candidates].min()
+        candidates = np.flatnonzero(scores >= threshold)
+        order = np.lexsort((candidates, -scores[candidates]))
+        return candidates[order][:k]
+
+
+_engine: Optional[ScoringEngine] = None
+_engine_version = None
+_engine_lock = threading.Lock()
+_catalog_version = CatalogVersion(
+    lambda: tuple(Book.objects.aggregate(count=Count('id'), latest=Max('updated_at')).values())
+)
+
+
+def get_scoring_engine() -> ScoringEngine:
+    """Per-process engine, rebuilt when books are added, changed or deleted (see CatalogVersion)"""
+    global _engine, _engine_version
+    version = _catalog_version.current()
+    with _engine_lock:
+        if _engine is None or version != _engine_version:
+            _engine = ScoringEngine(BookCatalog.from_db())
+            _engine_version = version
+        return _engine
@@ -0,0 +1,200 @@
+import re
+from typing import List
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Book
+
+SEARCH_TERM_RE = re.compile(r'[^\W_]+')
+
+# SQLite: FTS5 table keyed by rowid = book id. prefix='2 3' keeps typeahead
+# prefix queries on the index instead of scanning the term list.
+SQLITE_TABLE = 'core_book_fts'
+SQLITE_CREATE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5("
+    "title, author, genre, description, financial_topics, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+SQLITE_UPSERT = (
+    f"INSERT OR REPLACE INTO {SQLITE_TABLE}(rowid, title, author, genre, description, financial_topics) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+SQLITE_POPULATE = (
+    f"INSERT INTO {SQLITE_TABLE}(rowid, title, author, genre, description, financial_topics) "
+    "SELECT id, title, author, genre, description, financial_topics FROM core_book"
+)
+# bm25 column weights: title, author, genre, description, financial_topics
+SQLITE_BM25 = f"bm25({SQLITE_TABLE}, 10.0, 5.0, 2.0, 1.0, 3.0)"
+SQLITE_SEARCH = (
+    f"SELECT rowid FROM {SQLITE_TABLE} WHERE {SQLITE_TABLE} MATCH %s "
+    f"ORDER BY {SQLITE_BM25}, rowid LIMIT %s"
+)
+# Join onto core_book (every match, no LIMIT); bm25 is lower for better matches
+SQLITE_JOIN = [f"{SQLITE_TABLE}.rowid = core_book.id", f"{SQLITE_TABLE} MATCH %s"]
+
+# Postgres: tsvector side table with a GIN index. The 'simple' configuration
+# (no stemming) keeps prefix matching predictable while the user is typing.
+POSTGRES_TABLE = 'core_book_search'
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce({title}, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce({author}, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce({genre}, '') || ' ' || coalesce({financial_topics}, '')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce({description}, '')), 'D')"
+)
+POSTGRES_CREATE = [
+    f"CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} ("
+    "book_id bigint PRIMARY KEY REFERENCES core_book(id) ON DELETE CASCADE, "
+    "document tsvector NOT NULL)",
+    f"CREATE INDEX IF NOT EXISTS {POSTGRES_TABLE}_document_idx ON {POSTGRES_TABLE} USING GIN (document)",
+]
+POSTGRES_UPSERT = (
+    f"INSERT INTO {POSTGRES_TABLE}(book_id, document) VALUES (%s, "
+    + POSTGRES_DOCUMENT.format(title='%s', author='%s', genre='%s', financial_topics='%s', description='%s')
+    + ") ON CONFLICT (book_id) DO UPDATE SET document = EXCLUDED.document"
+)
+POSTGRES_POPULATE = (
+    f"INSERT INTO {POSTGRES_TABLE}(book_id, document) SELECT id, "
+    + POSTGRES_DOCUMENT.format(
+        title='title', author='author', genre='genre', financial_topics='financial_topics', description='description'
+    )
+    + " FROM core_book"
+)
+POSTGRES_SEARCH = (
+    f"SELECT book_id FROM {POSTGRES_TABLE} WHERE document @@ to_tsquery('simple', %s) "
+    "ORDER BY ts_rank(document, to_tsquery('simple', %s)) DESC, book_id LIMIT %s"
+)
+POSTGRES_JOIN = [f"{POSTGRES_TABLE}.book_id = core_book.id", "document @@ to_tsquery('simple', %s)"]
+# Negated so that, as with bm25, lower is better
+POSTGRES_RANK = "-ts_rank(document, to_tsquery('simple', %s))"
+
+def search_terms(query: str) -> List[str]:
+    """Lowercased word terms of a user query (quotes and operators are dropped)"""
+    return SEARCH_TERM_RE.findall(query.lower())
+
+
+def fts5_query(terms: List[str]) -> str:
+    """Every term must match, the last one as a prefix (typeahead)"""
+    parts = [f'"{t}"' for t in terms[:-1]] + [f'"{terms[-1]}"*']
+    return ' '.join(parts)
+
+
+def tsquery(terms: List[str]) -> str:
+    return ' & '.join([t for t in terms[:-1]] + [f'{terms[-1]}:*'])
+
+
+class BookSearchIndex:
+    """Full-text index over Book title, author, genre, description and financial topics.
+
+    Uses an FTS5 table on SQLite and a tsvector/GIN table on Postgres, kept in
+    sync by the Book signals in core/signals.py. Other databases (or SQLite
+    builds without FTS5) fall back to icontains filters.
+    """
+
+    def __init__(self):
+        self._sqlite_fts5 = None
+
+    @property
+    def vendor(self) -> str:
+        return connection.vendor
+
+    def is_supported(self) -> bool:
+        if self.vendor == 'sqlite':
+            if self._sqlite_fts5 is None:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+                    self._sqlite_fts5 = bool(cursor.fetchone()[0])
+            return self._sqlite_fts5
+        return self.vendor == 'postgresql'
+
+    def search_ids(self, query: str, limit: int) -> List[int]:
+        """Ids of the `limit` best matching books, best match first"""
+        terms = search_terms(query)
+        if not terms:
+            return []
+        with connection.cursor() as cursor:
+            if self.vendor == 'sqlite':
+                cursor.execute(SQLITE_SEARCH, [fts5_query(terms), limit])
+            else:
+                q = tsquery(terms)
+                cursor.execute(POSTGRES_SEARCH, [q, q, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+    def suggest(self, query: str, limit: int = 8) -> List[Book]:
+        """Best matching books for typeahead"""
+        if not self.is_supported():
+            return list(self.filter_icontains(Book.objects.all(), query)[:limit])
+        ids = self.search_ids(query, limit)
+        books = Book.objects.in_bulk(ids)
+        return [books[book_id] for book_id in ids if book_id in books]
+
+    def filter(self, queryset, query: str):
+        """Restrict a Book queryset to every match, annotated with search_rank (lower is better).
+
+        The full-text table is joined in, so further filters, keyset
+        pagination and facet counts all apply to the complete result set.
+        """
+        if not self.is_supported():
+            return self.filter_icontains(queryset, query)
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+        if self.vendor == 'sqlite':
+            q = fts5_query(terms)
+            table, where, rank = SQLITE_TABLE, SQLITE_JOIN, RawSQL(SQLITE_BM25, [], output_field=FloatField())
+        else:
+            q = tsquery(terms)
+            table, where, rank = POSTGRES_TABLE, POSTGRES_JOIN, RawSQL(POSTGRES_RANK, [q], output_field=FloatField())
+        return queryset.extra(tables=[table], where=where, params=[q]).annotate(search_rank=rank)
+
+    @staticmethod
+    def filter_icontains(queryset, query: str):
+        condition = Q()
+        for term in search_terms(query):
+            condition &= (
+                Q(title__icontains=term) | Q(author__icontains=term) | Q(genre__icontains=term) |
+                Q(description__icontains=term) | Q(financial_topics__icontains=term)
+            )
+        return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def update(self, book: Book):
+        if not self.is_supported():
+            return
+        with connection.cursor() as cursor:
+            if self.vendor == 'sqlite':
+                cursor.execute(SQLITE_UPSERT, [
+                    book.id, book.title, book.author, book.genre, book.description, book.financial_topics
+                ])
+            else:
+                cursor.execute(POSTGRES_UPSERT, [
+                    book.id, book.title, book.author, book.genre, book.financial_topics, book.description
+                ])
+
+    def remove(self, book_id: int):
+        if not self.is_supported():
+            return
+        with connection.cursor() as cursor:
+            if self.vendor == 'sqlite':
+                cursor.execute(f"DELETE FROM {SQLITE_TABLE} WHERE rowid = %s", [book_id])
+            else:
+                cursor.execute(f"DELETE FROM {POSTGRES_TABLE} WHERE book_id = %s", [book_id])
+
+    def rebuild(self):
+        """Re-index every book (after bulk_create / queryset.update, which skip signals)"""
+        if not self.is_supported():
+            return
+        with connection.cursor() as cursor:
+            if self.vendor == 'sqlite':
+                cursor.execute(SQLITE_CREATE)
+                cursor.execute(f"DELETE FROM {SQLITE_TABLE}")
+                cursor.execute(SQLITE_POPULATE)
+            else:
+                for statement in POSTGRES_CREATE:
+                    cursor.execute(statement)
+                cursor.execute(f"DELETE FROM {POSTGRES_TABLE}")
+                cursor.execute(POSTGRES_POPULATE)
+
+
+# Global instance
+book_search_index = BookSearchIndex()
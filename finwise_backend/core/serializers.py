@@ -7,6 +7,30 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name']
 
+class UserReferenceField(serializers.Field):
+    """A row's owner as UserSerializer data, built once per user for the whole serializer call.
+
+    Rows belonging to the requesting user (context['request']) reuse
+    request.user, so nested rows cost no user queries; other owners are
+    loaded through the row (select_related('user') avoids the per-row query).
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        users = self.context.setdefault('serialized_users', {})
+        if instance.user_id not in users:
+            request = self.context.get('request')
+            if request is not None and request.user.pk == instance.user_id:
+                user = request.user
+            else:
+                user = instance.user
+            users[instance.user_id] = UserSerializer(user).data
+        return users[instance.user_id]
+
 class UserProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     
@@ -22,7 +46,7 @@ class DashboardSummarySerializer(serializers.ModelSerializer):
 class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
-        fields = '__all__'
+        exclude = ['embedding_vector']
 
 class BookListSerializer(serializers.ModelSerializer):
     """Simplified serializer for book lists"""
@@ -30,8 +54,13 @@ class BookListSerializer(serializers.ModelSerializer):
         model = Book
         fields = ['id', 'title', 'author', 'genre', 'sub_genre', 'rating', 'cover_image_url', 'difficulty_level', 'investment_level']
 
+    @classmethod
+    def related_fields(cls, relation):
+        """only() arguments loading just the serialized columns of a related book"""
+        return [f'{relation}__{field}' for field in cls.Meta.fields]
+
 class UserReadingPreferenceSerializer(serializers.ModelSerializer):
-    user = UserSerializer(read_only=True)
+    user = UserReferenceField()
     
     class Meta:
         model = UserReadingPreference
@@ -39,7 +68,7 @@ class UserReadingPreferenceSerializer(serializers.ModelSerializer):
 
 class UserReadingHistorySerializer(serializers.ModelSerializer):
     book = BookListSerializer(read_only=True)
-    user = UserSerializer(read_only=True)
+    user = UserReferenceField()
     
     class Meta:
         model = UserReadingHistory
@@ -47,7 +76,7 @@ class UserReadingHistorySerializer(serializers.ModelSerializer):
 
 class BookRecommendationSerializer(serializers.ModelSerializer):
     book = BookListSerializer(read_only=True)
-    user = UserSerializer(read_only=True)
+    user = UserReferenceField()
     
     class Meta:
         model = BookRecommendation
@@ -0,0 +1,62 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .catalog_version import bump_catalog_version
+from .conditional import mark_user_data_changed
+from .dashboard import refresh_dashboard_summary
+from .facets import book_facet_service
+from .models import Book, UserProfile, UserReadingHistory, UserReadingPreference, UserReadingStats
+from .reading_stats import apply_history_save, history_state
+from .search import book_search_index
+
+
+@receiver(post_save, sender=Book)
+def index_book(sender, instance, **kwargs):
+    """Keep the full-text search index, facet counts and per-process catalogs in sync with saved books"""
+    book_search_index.update(instance)
+    book_facet_service.invalidate()
+    bump_catalog_version()
+
+
+@receiver(post_delete, sender=Book)
+def unindex_book(sender, instance, **kwargs):
+    book_search_index.remove(instance.id)
+    book_facet_service.invalidate()
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=UserProfile)
+def refresh_dashboard(sender, instance, raw=False, **kwargs):
+    """Recompute the dashboard summary whenever its inputs (the profile) change"""
+    if raw:
+        return
+    refresh_dashboard_summary(instance)
+
+
+@receiver(post_init, sender=UserReadingHistory)
+def remember_history_state(sender, instance, **kwargs):
+    """Snapshot status and rating so a later save can apply the difference to the stats row"""
+    instance._stats_state = history_state(instance)
+
+
+@receiver(post_save, sender=UserReadingHistory)
+def update_reading_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        UserReadingStats.objects.filter(user_id=instance.user_id).delete()
+        return
+    apply_history_save(instance, created)
+
+
+@receiver(post_delete, sender=UserReadingHistory)
+def drop_reading_stats(sender, instance, **kwargs):
+    """Deleted history rows (e.g. with their book) make the stats row stale; it is rebuilt on next read"""
+    UserReadingStats.objects.filter(user_id=instance.user_id).delete()
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=UserReadingPreference)
+@receiver(post_save, sender=UserReadingHistory)
+@receiver(post_delete, sender=UserReadingHistory)
+def user_data_changed(sender, **kwargs):
+    """Writes made while serving a conditional GET (e.g. get_or_create) change its ETag"""
+    mark_user_data_changed()
@@ -0,0 +1,269 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+INF = np.inf
+
+# Deduction caps (old regime only; the new regime allows none of these)
+DEDUCTION_LIMITS = {
+    '80C': 150000,
+    '80D_self': 25000,
+    '80D_self_senior': 50000,       # self/spouse aged 60+
+    '80D_parents': 25000,
+    '80D_parents_senior': 50000,    # parents aged 60+
+    '80CCD(1B)': 50000,
+}
+# Section -> keyword argument carrying the amount already claimed under it
+SECTION_KEYS = {'80C': 'd80c', '80D_self': 'd80d_self', '80D_parents': 'd80d_parents', '80CCD(1B)': 'd80ccd_1b'}
+SECTIONS = tuple(SECTION_KEYS)
+
+CESS_RATE = 0.04  # Health and education cess on tax plus surcharge
+
+OLD_SLABS = [(250000, 0.0), (500000, 0.05), (1000000, 0.20), (INF, 0.30)]
+OLD_SENIOR_SLABS = [(300000, 0.0), (500000, 0.05), (1000000, 0.20), (INF, 0.30)]          # age 60-79
+OLD_SUPER_SENIOR_SLABS = [(500000, 0.0), (1000000, 0.20), (INF, 0.30)]                    # age 80+
+OLD_SURCHARGE = [(5000000, 0.10), (10000000, 0.15), (20000000, 0.25), (50000000, 0.37)]
+NEW_SURCHARGE = [(5000000, 0.10), (10000000, 0.15), (20000000, 0.25)]                     # capped at 25%
+
+# Slab tables per assessment year. Rebate u/s 87A: full rebate up to
+# rebate_max when taxable income <= rebate_limit; the new regime also gives
+# marginal relief just above the limit.
+ASSESSMENT_YEARS: Dict[str, Dict[str, Dict[str, Any]]] = {
+    '2024-25': {
+        'old': {
+            'slabs': OLD_SLABS, 'senior_slabs': OLD_SENIOR_SLABS, 'super_senior_slabs': OLD_SUPER_SENIOR_SLABS,
+            'standard_deduction': 50000, 'rebate_limit': 500000, 'rebate_max': 12500, 'rebate_marginal_relief': False,
+            'surcharge': OLD_SURCHARGE, 'allows_deductions': True,
+        },
+        'new': {
+            'slabs': [(300000, 0.0), (600000, 0.05), (900000, 0.10), (1200000, 0.15), (1500000, 0.20), (INF, 0.30)],
+            'standard_deduction': 50000, 'rebate_limit': 700000, 'rebate_max': 25000, 'rebate_marginal_relief': True,
+            'surcharge': NEW_SURCHARGE, 'allows_deductions': False,
+        },
+    },
+    '2025-26': {
+        'old': {
+            'slabs': OLD_SLABS, 'senior_slabs': OLD_SENIOR_SLABS, 'super_senior_slabs': OLD_SUPER_SENIOR_SLABS,
+            'standard_deduction': 50000, 'rebate_limit': 500000, 'rebate_max': 12500, 'rebate_marginal_relief': False,
+            'surcharge': OLD_SURCHARGE, 'allows_deductions': True,
+        },
+        'new': {
+            'slabs': [(300000, 0.0), (700000, 0.05), (1000000, 0.10), (1200000, 0.15), (1500000, 0.20), (INF, 0.30)],
+            'standard_deduction': 75000, 'rebate_limit': 700000, 'rebate_max': 25000, 'rebate_marginal_relief': True,
+            'surcharge': NEW_SURCHARGE, 'allows_deductions': False,
+        },
+    },
+    '2026-27': {
+        'old': {
+            'slabs': OLD_SLABS, 'senior_slabs': OLD_SENIOR_SLABS, 'super_senior_slabs': OLD_SUPER_SENIOR_SLABS,
+            'standard_deduction': 50000, 'rebate_limit': 500000, 'rebate_max': 12500, 'rebate_marginal_relief': False,
+            'surcharge': OLD_SURCHARGE, 'allows_deductions': True,
+        },
+        'new': {
+            'slabs': [
+                (400000, 0.0), (800000, 0.05), (1200000, 0.10), (1600000, 0.15), (2000000, 0.20), (2400000, 0.25),
+                (INF, 0.30)
+            ],
+            'standard_deduction': 75000, 'rebate_limit': 1200000, 'rebate_max': 60000, 'rebate_marginal_relief': True,
+            'surcharge': NEW_SURCHARGE, 'allows_deductions': False,
+        },
+    },
+}
+DEFAULT_ASSESSMENT_YEAR = '2026-27'
+
+
+class SlabTable:
+    """Progressive slab tax, vectorized over any array of taxable incomes"""
+
+    def __init__(self, slabs: Sequence[Tuple[float, float]]):
+        self.slabs = list(slabs)
+        uppers = np.array([upper for upper, _ in slabs], dtype=np.float64)
+        self.lower = np.concatenate([[0.0], uppers[:-1]])
+        self.width = uppers - self.lower
+        self.rates = np.array([rate for _, rate in slabs], dtype=np.float64)
+
+    def tax(self, taxable) -> np.ndarray:
+        taxable = np.asarray(taxable, dtype=np.float64)[..., None]
+        return (np.clip(taxable - self.lower, 0.0, self.width) * self.rates).sum(axis=-1)
+
+
+class RegimeRules:
+    """Slab tax, 87A rebate, surcharge (with marginal relief) and cess for one regime and year"""
+
+    def __init__(self, name: str, rules: Dict[str, Any]):
+        self.name = name
+        self.slabs = SlabTable(rules['slabs'])
+        self.senior_slabs = SlabTable(rules.get('senior_slabs', rules['slabs']))
+        self.super_senior_slabs = SlabTable(rules.get('super_senior_slabs', rules['slabs']))
+        self.standard_deduction = rules['standard_deduction']
+        self.rebate_limit = rules['rebate_limit']
+        self.rebate_max = rules['rebate_max']
+        self.rebate_marginal_relief = rules['rebate_marginal_relief']
+        self.surcharge = rules['surcharge']
+        self.allows_deductions = rules['allows_deductions']
+
+    def slab_tax(self, taxable, age) -> np.ndarray:
+        age = np.asarray(age, dtype=np.float64)
+        if age.ndim == 0:
+            table = self.super_senior_slabs if age >= 80 else self.senior_slabs if age >= 60 else self.slabs
+            return table.tax(taxable)
+        taxable, age = np.broadcast_arrays(np.asarray(taxable, dtype=np.float64), age)
+        return np.select(
+            [age >= 80, age >= 60],
+            [self.super_senior_slabs.tax(taxable), self.senior_slabs.tax(taxable)],
+            self.slabs.tax(taxable)
+        )
+
+    def compute(self, income, age, deductions, salaried=True) -> Dict[str, np.ndarray]:
+        """Full breakdown; every argument may be an array (scenarios broadcast together)"""
+        income = np.asarray(income, dtype=np.float64)
+        standard_deduction = np.minimum(income, self.standard_deduction) if salaried else np.zeros_like(income)
+        deductions = np.asarray(deductions, dtype=np.float64) if self.allows_deductions else np.zeros_like(income)
+        taxable = np.maximum(income - standard_deduction - deductions, 0.0)
+
+        slab_tax = self.slab_tax(taxable, age)
+
+        rebate = np.where(taxable <= self.rebate_limit, np.minimum(slab_tax, self.rebate_max), 0.0)
+        if self.rebate_marginal_relief:
+            # Tax just above the limit may not exceed the income above the limit
+            excess = taxable - self.rebate_limit
+            rebate = rebate + np.where((taxable > self.rebate_limit) & (slab_tax > excess), slab_tax - excess, 0.0)
+        tax = slab_tax - rebate
+
+        surcharge = np.zeros_like(tax)
+        previous_rate = 0.0
+        for threshold, rate in self.surcharge:
+            # Marginal relief: tax + surcharge may not exceed that at the threshold plus the income above it
+            at_threshold = self.slab_tax(threshold, age) * (1 + previous_rate)
+            capped = np.minimum(tax * rate, at_threshold + (taxable - threshold) - tax)
+            surcharge = np.where(taxable > threshold, np.maximum(capped, 0.0), surcharge)
+            previous_rate = rate
+
+        cess = (tax + surcharge) * CESS_RATE
+        return {
+            'gross_income': income,
+            'standard_deduction': standard_deduction,
+            'deductions': deductions,
+            'taxable_income': taxable,
+            'slab_tax': slab_tax,
+            'rebate_87a': rebate,
+            'surcharge': surcharge,
+            'cess': cess,
+            'total_tax': np.round(tax + surcharge + cess),
+        }
+
+
+class TaxEngine:
+    """Indian income-tax liability under the old and new regimes for one assessment year.
+
+    All methods accept scalars or NumPy arrays, so thousands of what-if
+    scenarios evaluate in one vectorized call.
+    """
+
+    def __init__(self, assessment_year: str = DEFAULT_ASSESSMENT_YEAR):
+        if assessment_year not in ASSESSMENT_YEARS:
+            raise ValueError(f'No tax tables for assessment year {assessment_year}')
+        self.assessment_year = assessment_year
+        self.regimes = {name: RegimeRules(name, rules) for name, rules in ASSESSMENT_YEARS[assessment_year].items()}
+
+    @staticmethod
+    def capped_deductions(age=30, d80c=0, d80d_self=0, d80d_parents=0, d80ccd_1b=0, parents_senior=False) -> np.ndarray:
+        """Total Chapter VI-A deductions after the per-section caps"""
+        self_cap = np.where(np.asarray(age) >= 60, DEDUCTION_LIMITS['80D_self_senior'], DEDUCTION_LIMITS['80D_self'])
+        parents_cap = np.where(
+            np.asarray(parents_senior), DEDUCTION_LIMITS['80D_parents_senior'], DEDUCTION_LIMITS['80D_parents']
+        )
+        return (
+            np.clip(d80c, 0, DEDUCTION_LIMITS['80C'])
+            + np.clip(d80d_self, 0, self_cap)
+            + np.clip(d80d_parents, 0, parents_cap)
+            + np.clip(d80ccd_1b, 0, DEDUCTION_LIMITS['80CCD(1B)'])
+        ).astype(np.float64)
+
+    def compute(self, income, regime: str = 'new', age=30, salaried=True, **deductions) -> Dict[str, np.ndarray]:
+        """Breakdown under one regime; deductions are d80c, d80d_self, d80d_parents, d80ccd_1b, parents_senior"""
+        return self.regimes[regime].compute(income, age, self.capped_deductions(age, **deductions), salaried)
+
+    def liability(self, income, regime: str = 'new', age=30, salaried=True, **deductions) -> np.ndarray:
+        return self.compute(income, regime, age, salaried, **deductions)['total_tax']
+
+    def best_liability(self, income, age=30, salaried=True, **deductions) -> np.ndarray:
+        """Tax under whichever regime is cheaper, per scenario"""
+        return np.minimum(
+            self.liability(income, 'old', age, salaried, **deductions),
+            self.liability(income, 'new', age, salaried, **deductions)
+        )
+
+    def compare_regimes(self, income, age=30, salaried=True, **deductions) -> Dict[str, Any]:
+        """Scalar old vs new breakdowns and the cheaper regime"""
+        result = {}
+        for name in ('old', 'new'):
+            result[name] = {
+                key: round(float(value), 2) for key, value in self.compute(income, name, age, salaried, **deductions).items()
+            }
+        recommended = 'old' if result['old']['total_tax'] < result['new']['total_tax'] else 'new'
+        result['recommended_regime'] = recommended
+        result['regime_savings'] = abs(result['old']['total_tax'] - result['new']['total_tax'])
+        result['assessment_year'] = self.assessment_year
+        return result
+
+    def deduction_savings(self, section: str, amounts, income, age=30, salaried=True, **deductions) -> np.ndarray:
+        """Tax saved by investing `amounts` more under a section (best regime before vs after)"""
+        if section not in SECTIONS:
+            raise ValueError(f'Unknown section {section}')
+        key = SECTION_KEYS[section]
+        after = dict(deductions)
+        after[key] = np.asarray(deductions.get(key, 0), dtype=np.float64) + np.asarray(amounts, dtype=np.float64)
+        return (
+            self.best_liability(income, age, salaried, **deductions)
+            - self.best_liability(income, age, salaried, **after)
+        )
+
+    def claimed_savings(self, income, age=30, salaried=True, **deductions) -> np.ndarray:
+        """Tax the claimed deductions save versus claiming none (best regime either way)"""
+        return self.best_liability(income, age, salaried) - self.best_liability(income, age, salaried, **deductions)
+
+    def headroom(self, section: str, age=30, parents_senior=False, **deductions) -> float:
+        """Deduction still available under a section"""
+        key = SECTION_KEYS[section]
+        if section == '80D_self':
+            cap = DEDUCTION_LIMITS['80D_self_senior' if age >= 60 else '80D_self']
+        elif section == '80D_parents':
+            cap = DEDUCTION_LIMITS['80D_parents_senior' if parents_senior else '80D_parents']
+        else:
+            cap = DEDUCTION_LIMITS[section]
+        return max(cap - float(deductions.get(key, 0) or 0), 0.0)
+
+
+def profile_tax_inputs(profile) -> Dict[str, Any]:
+    """Engine keyword arguments for a UserProfile.
+
+    investment_amount counts as 80C investments and tax_deductions as
+    health insurance (80D) premiums, as the tax views already assume.
+    """
+    return {
+        'income': profile.income or 0,
+        'age': profile.age or 30,
+        'd80c': profile.investment_amount or 0,
+        'd80d_self': profile.tax_deductions or 0,
+    }
+
+
+_engines: Dict[str, TaxEngine] = {}
+
+
+def get_tax_engine(assessment_year: Optional[str] = None) -> TaxEngine:
+    """Shared engine for an assessment year (settings.TAX_ASSESSMENT_YEAR by default)"""
+    assessment_year = assessment_year or getattr(settings, 'TAX_ASSESSMENT_YEAR', DEFAULT_ASSESSMENT_YEAR)
+    if assessment_year not in _engines:
+        _engines[assessment_year] = TaxEngine(assessment_year)
+    return _engines[assessment_year]
+
+
+def available_assessment_years() -> List[str]:
+    return sorted(ASSESSMENT_YEARS)
+
+
+# Global instance
+tax_engine = get_tax_engine()
@@ -0,0 +1,176 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .tax import SECTION_KEYS, TaxEngine, tax_engine
+
+# Tax-saving instruments, as offered by TaxSavingsView.calculate_tax_options.
+# 'limit' is a per-instrument cap below the section's; without one an
+# instrument can take the section's whole (age-dependent) headroom.
+# lock_in_years None means locked in until age 60.
+TAX_INSTRUMENTS: List[Dict[str, Any]] = [
+    {'name': 'ELSS Mutual Funds', 'section': '80C', 'returns': '12-15%', 'expected_return': 0.135,
+     'risk': 'High', 'lockIn': '3 years', 'lock_in_years': 3},
+    {'name': 'PPF', 'section': '80C', 'returns': '7-8%', 'expected_return': 0.071,
+     'risk': 'Low', 'lockIn': '15 years', 'lock_in_years': 15},
+    {'name': 'NSC', 'section': '80C', 'limit': 100000, 'returns': '6-7%', 'expected_return': 0.065,
+     'risk': 'Low', 'lockIn': '5 years', 'lock_in_years': 5},
+    {'name': 'NPS Investment', 'section': '80CCD(1B)', 'returns': '8-10%', 'expected_return': 0.09,
+     'risk': 'Medium', 'lockIn': 'Till 60', 'lock_in_years': None},
+    {'name': 'Health Insurance Premium', 'section': '80D_self', 'returns': 'Tax Benefit',
+     'expected_return': 0.0, 'risk': 'Low', 'lockIn': '1 year', 'lock_in_years': 1},
+    {'name': 'Parents Health Insurance', 'section': '80D_parents', 'returns': 'Tax Benefit',
+     'expected_return': 0.0, 'risk': 'Low', 'lockIn': '1 year', 'lock_in_years': 1},
+]
+
+RISK_LEVELS = {'Low': 0, 'Medium': 1, 'High': 2}
+
+
+class TaxAllocationOptimizer:
+    """Tax-minimizing split of a budget across deduction instruments.
+
+    Deductions under every section lower taxable income rupee for rupee, so
+    tax depends only on how much new deduction is claimed. The solver
+    evaluates the tax on a vectorized grid of total spends (up to what the
+    allowed instruments and section caps can absorb), keeps the smallest
+    spend reaching the minimum (spending more would not lower tax, e.g. past
+    the 87A rebate or when the new regime stays cheaper), then fills it
+    greedily into the allowed instruments by expected return.
+    """
+
+    def __init__(self, engine: TaxEngine, instruments: Sequence[Dict[str, Any]] = TAX_INSTRUMENTS, step: int = 100):
+        self.engine = engine
+        self.instruments = list(instruments)
+        self.step = step
+
+    def allowed_instruments(self, age=30, max_risk: str = 'High', max_lock_in_years: Optional[float] = None,
+                            names: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Instruments within the risk and lock-in limits, best expected return first"""
+        allowed = []
+        for instrument in self.instruments:
+            lock_in = instrument['lock_in_years']
+            if lock_in is None:
+                lock_in = max(60 - age, 0)
+            if RISK_LEVELS[instrument['risk']] > RISK_LEVELS[max_risk]:
+                continue
+            if max_lock_in_years is not None and lock_in > max_lock_in_years:
+                continue
+            if names is not None and instrument['name'] not in names:
+                continue
+            allowed.append(instrument)
+        return sorted(allowed, key=lambda i: -i['expected_return'])
+
+    def fill(self, amount: float, instruments: Sequence[Dict[str, Any]], headroom: Dict[str, float]) -> List[dict]:
+        """Greedy allocation of `amount` in instrument order, within instrument limits and section headroom"""
+        headroom = dict(headroom)
+        allocations = []
+        for instrument in instruments:
+            if amount <= 0:
+                break
+            # Section caps (DEDUCTION_LIMITS, by age for 80D) come in through the headroom
+            invest = min(amount, instrument.get('limit', amount), headroom[instrument['section']])
+            if invest <= 0:
+                continue
+            headroom[instrument['section']] -= invest
+            amount -= invest
+            allocations.append({
+                'name': instrument['name'],
+                'section': instrument['section'],
+                'amount': round(invest, 2),
+                'returns': instrument['returns'],
+                'risk': instrument['risk'],
+                'lockIn': instrument['lockIn'],
+            })
+        return allocations
+
+    def optimize(self, budget: float, income: float, age=30, max_risk: str = 'High',
+                 max_lock_in_years: Optional[float] = None, instruments: Optional[Sequence[str]] = None,
+                 salaried: bool = True, **deductions) -> Dict[str, Any]:
+        """Best allocation of `budget` on top of the deductions already claimed"""
+        if max_risk not in RISK_LEVELS:
+            raise ValueError(f"max_risk must be one of {', '.join(RISK_LEVELS)}")
+
+        allowed = self.allowed_instruments(age, max_risk, max_lock_in_years, instruments)
+        parents_senior = deductions.get('parents_senior', False)
+        claimed = {key: value for key, value in deductions.items() if key in SECTION_KEYS.values()}
+        headroom = {
+            section: self.engine.headroom(section, age, parents_senior, **claimed) for section in SECTION_KEYS
+        }
+        capacity = sum(allocation['amount'] for allocation in self.fill(budget, allowed, headroom))
+
+        # Tax at every total spend on the grid; the new regime ignores deductions
+        spends = np.unique(np.append(np.arange(0, capacity, self.step), capacity))
+        base = self.engine.capped_deductions(age, **deductions)
+        old = self.engine.regimes['old'].compute(income, age, base + spends, salaried)['total_tax']
+        new = self.engine.liability(income, 'new', age, salaried)
+        taxes = np.minimum(old, new)
+        best = int(np.argmax(taxes <= taxes.min() + 0.5))
+        spend = float(spends[best])
+
+        allocations = self.fill(spend, allowed, headroom)
+        tax_before, tax_after = float(taxes[0]), float(taxes[best])
+        return {
+            'budget': budget,
+            'allocations': allocations,
+            'total_allocated': round(spend, 2),
+            'unallocated': round(budget - spend, 2),
+            'tax_before': tax_before,
+            'tax_after': tax_after,
+            'tax_saved': round(tax_before - tax_after, 2),
+            'regime': 'old' if old[best] < new else 'new',
+            'expected_annual_return': round(sum(
+                allocation['amount'] * next(i['expected_return'] for i in allowed if i['name'] == allocation['name'])
+                for allocation in allocations
+            ), 2),
+            'assessment_year': self.engine.assessment_year,
+        }
+
+
+AMOUNT_PATTERN = re.compile(
+    r'(?:₹|rs\.?|inr)?\s*(\d[\d,]*(?:\.\d+)?)\s*(lakhs?|lacs?|l|k|thousand|crores?|cr)?\b', re.IGNORECASE
+)
+AMOUNT_UNITS = {'l': 1e5, 'lac': 1e5, 'lacs': 1e5, 'lakh': 1e5, 'lakhs': 1e5, 'k': 1e3, 'thousand': 1e3,
+                'cr': 1e7, 'crore': 1e7, 'crores': 1e7}
+ALLOCATION_PATTERN = re.compile(
+    r'\b(split|allocat\w*|distribut\w*|divide|spread|how (?:should|do|can) i (?:invest|put|use)|where (?:should|do) i (?:invest|put))\b',
+    re.IGNORECASE
+)
+TAX_PATTERN = re.compile(r'\b(tax\w*|80c|80d|80ccd|elss|ppf|nps|nsc|deductions?|health insurance)\b', re.IGNORECASE)
+LOCK_IN_PATTERN = re.compile(r'(\d+)\s*(?:years?|yrs?)\b', re.IGNORECASE)
+
+
+def parse_amount(text: str) -> Optional[float]:
+    """First rupee amount in free text ("₹1.5 lakh", "50k", "Rs 60,000"); bare numbers need >= 1000"""
+    for match in AMOUNT_PATTERN.finditer(text):
+        value = float(match.group(1).replace(',', ''))
+        unit = (match.group(2) or '').lower()
+        if unit:
+            return value * AMOUNT_UNITS[unit]
+        if value >= 1000 or match.group(0).strip()[:1] in ('₹', 'r', 'R', 'i', 'I'):
+            return value
+    return None
+
+
+def parse_allocation_question(text: str) -> Optional[Dict[str, Any]]:
+    """optimize() arguments for "how should I split ₹X across ELSS/PPF/NPS..." questions, else None"""
+    if not ALLOCATION_PATTERN.search(text) or not TAX_PATTERN.search(text):
+        return None
+    budget = parse_amount(text)
+    if not budget:
+        return None
+    options: Dict[str, Any] = {'budget': budget}
+    lowered = text.lower()
+    if 'low risk' in lowered or 'safe' in lowered:
+        options['max_risk'] = 'Low'
+    elif 'medium risk' in lowered or 'moderate' in lowered:
+        options['max_risk'] = 'Medium'
+    if 'lock' in lowered:
+        lock_in = LOCK_IN_PATTERN.search(lowered)
+        if lock_in:
+            options['max_lock_in_years'] = int(lock_in.group(1))
+    return options
+
+
+# Global instance
+tax_optimizer = TaxAllocationOptimizer(tax_engine)
@@ -0,0 +1,2003 @@
+import base64
+import contextvars
+import io
+import itertools
+import json
+import math
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count
+from django.db.models.signals import post_save
+from django.http import HttpResponse
+from django.test import (
+    AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+)
+from django.utils import timezone
+from rest_framework import permissions
+from rest_framework.test import APIClient
+from rest_framework.throttling import UserRateThrottle
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.ai_cache import (
+    InMemoryCacheBackend, ProfileResponseCache, SemanticAnswerCache, normalize_question, profile_band, question_vector
+)
+from core.ai_recordings import RecordingModel, RecordingStore, ReplayModel
+from core.ai_resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientCaller
+from core.book_covers import OPENLIBRARY_COVERS_URL, BookCoverService
+from core.book_import import normalize_row, upsert_books
+from core.catalog_version import bump_catalog_version
+from core.conditional import conditional_on_user_data, mark_degraded
+from core.dashboard import generate_tax_tips
+from core.embeddings import (
+    EMBEDDING_DIM, HashingTfidfVectorizer, SimilarityIndex, book_features, decode_vectors, encode_vector,
+    get_similarity_index, hash_feature, parse_topics
+)
+from core.eligibility import INF, SCHEMES, EligibilityEngine, eligibility_engine
+from core.facets import CACHE_KEY as FACETS_CACHE_KEY
+from core.facets import FACETS, BookFacetService, book_facet_service
+from core.intents import CHAT_INTENTS, OPEN_INTENT, IntentRouter, chat_intent_router
+from core.management.commands.check_query_plans import Command as QueryPlanCommand
+from core.models import (
+    Book, BookRecommendation, DashboardSummary, UserProfile, UserReadingHistory, UserReadingPreference,
+    UserReadingStats
+)
+from core.pagination import search_paginator
+from core.reading_stats import aggregate_reading_stats, get_reading_statistics, rebuild_reading_stats
+from core.recommendations import BookRecommender, RecommendationRefresher, refresher
+from core.ai_backends import STUB_SENTENCES, StubModel, available_backends, create_model
+from core.ai_service import (
+    EMPTY_RESPONSE, GeminiAIService, LazyAIService, StreamingResponseCleaner, request_options
+)
+from core.async_views import AsyncBenefitsView, AsyncChatbotView, AsyncTaxSavingsView
+from core.scoring import get_scoring_engine
+from core.search import BookSearchIndex, book_search_index, fts5_query, search_terms, tsquery
+from core.tax import DEDUCTION_LIMITS, SECTION_KEYS, TaxEngine
+from core.tax_optimizer import RISK_LEVELS, TaxAllocationOptimizer
+from core.views import BenefitsView, ChatbotView, TaxSavingsView, build_tax_profile_dict
+
+
+class StandInAPI:
+    """Local HTTP server answering like Google Books or OpenLibrary search.
+
+    ``results`` maps a query string to the JSON body to return; unknown
+    queries get an empty result set and ``status`` forces an error status.
+    Every request is recorded as (monotonic time, query).
+    """
+
+    def __init__(self, results_key):
+        self.results_key = results_key  # 'items' (Google Books) or 'docs' (OpenLibrary)
+        self.results = {}
+        self.status = 200
+        self.requests = []
+        self._lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = parse_qs(urlsplit(self.path).query)
+                query = (params.get('q') or params.get('title') or [''])[0]
+                with api._lock:
+                    api.requests.append((time.monotonic(), query))
+                if api.status != 200:
+                    self.send_response(api.status)
+                    self.end_headers()
+                    return
+                body = json.dumps({api.results_key: api.results.get(query, [])}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def queries(self):
+        with self._lock:
+            return [query for _, query in self.requests]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class BookCoverServiceTests(SimpleTestCase):
+    def setUp(self):
+        self.google = StandInAPI('items')
+        self.openlibrary = StandInAPI('docs')
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmpdir, 'covers.sqlite3')
+
+    def tearDown(self):
+        self.google.close()
+        self.openlibrary.close()
+        shutil.rmtree(self.tmpdir)
+
+    def service(self, rate_limit=0, **kwargs):
+        return BookCoverService(
+            cache_path=self.cache_path, max_workers=4, rate_limit=rate_limit,
+            google_books_url=f'{self.google.url}/books/v1/volumes',
+            openlibrary_url=f'{self.openlibrary.url}/search.json', **kwargs
+        )
+
+    def test_google_books_hit(self):
+        self.google.results['Deep Work Cal Newport'] = [
+            {'volumeInfo': {'imageLinks': {'thumbnail': 'http://books.example/deep-work?zoom=1'}}}
+        ]
+        cover = self.service().get_book_cover('Deep Work', 'Cal Newport')
+
+        self.assertEqual(cover, 'http://books.example/deep-work?zoom=3')
+        self.assertEqual(self.openlibrary.queries(), [])
+
+    def test_openlibrary_fallback_hit(self):
+        self.openlibrary.results['Deep Work'] = [{'cover_i': 42}]
+        cover = self.service().get_book_cover('Deep Work', 'Cal Newport')
+
+        self.assertEqual(cover, f'{OPENLIBRARY_COVERS_URL}/42-L.jpg')
+        self.assertEqual(self.google.queries(), ['Deep Work Cal Newport', 'Deep Work'])
+
+    def test_miss_leaves_negative_entry(self):
+        service = self.service()
+        cover = service.get_book_cover('Unknown Book', 'Nobody', 'Psychology')
+
+        self.assertTrue(cover.startswith('https://placehold.co/400x600/7c3aed/'))
+        self.assertEqual(service.cache.get('unknown book|nobody'), '')
+        requests_made = len(self.google.requests) + len(self.openlibrary.requests)
+
+        self.assertEqual(service.get_book_cover('Unknown Book', 'Nobody', 'Psychology'), cover)
+        self.assertEqual(len(self.google.requests) + len(self.openlibrary.requests), requests_made)
+
+    def test_server_error_is_not_cached(self):
+        self.google.status = 503
+        self.openlibrary.status = 503
+        service = self.service()
+        with redirect_stdout(io.StringIO()):  # the service prints source errors
+            service.get_book_cover('Deep Work', 'Cal Newport')
+
+        self.assertIsNone(service.cache.get('deep work|cal newport'))
+
+        self.google.status = 200
+        self.google.results['Deep Work Cal Newport'] = [
+            {'volumeInfo': {'imageLinks': {'thumbnail': 'http://books.example/deep-work'}}}
+        ]
+        self.assertEqual(service.get_book_cover('Deep Work', 'Cal Newport'), 'http://books.example/deep-work')
+
+    def test_cache_persists_across_instances(self):
+        self.google.results['Deep Work Cal Newport'] = [
+            {'volumeInfo': {'imageLinks': {'thumbnail': 'http://books.example/deep-work'}}}
+        ]
+        self.service().get_book_cover('Deep Work', 'Cal Newport')
+        self.service().get_book_cover('Missing', 'Nobody')
+        requests_made = len(self.google.requests) + len(self.openlibrary.requests)
+
+        service = self.service()
+        self.assertEqual(service.get_book_cover('Deep Work', 'Cal Newport'), 'http://books.example/deep-work')
+        self.assertEqual(service.cache.get('missing|nobody'), '')
+        service.get_book_cover('Missing', 'Nobody')
+        self.assertEqual(len(self.google.requests) + len(self.openlibrary.requests), requests_made)
+
+    def test_rate_limit_is_per_host(self):
+        rate = 10.0
+        service = self.service(rate_limit=rate)
+        books = [(f'Book {i}', 'Author', 'Investment') for i in range(3)]
+        covers = service.get_book_covers(books)
+
+        self.assertEqual(len(covers), 3)
+        for api in (self.google, self.openlibrary):
+            times = sorted(t for t, _ in api.requests)
+            self.assertEqual(len(times), 6)  # title + author, then title alone, per book
+            # Arrival times jitter per request, but their overall spread still reflects the limit
+            self.assertGreaterEqual(times[-1] - times[0], (len(times) - 1) / rate * 0.9)
+            gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+            self.assertGreaterEqual(min(gaps), 1 / rate * 0.5)
+        # The hosts have separate budgets: OpenLibrary is queried while Google Books is still busy
+        self.assertLess(min(t for t, _ in self.openlibrary.requests), max(t for t, _ in self.google.requests))
+
+
+class FakeGeminiModel:
+    """Stand-in for genai.GenerativeModel with injected latency and errors.
+
+    Latency is lognormal around `median` seconds, with a `tail_rate` share of
+    calls taking `tail` seconds; `error_rate` of calls raise. Like the SDK, a
+    call gives up once request_options['timeout'] has passed.
+    """
+
+    def __init__(self, median=0.05, tail=1.0, tail_rate=0.0, error_rate=0.0, seed=0):
+        self.median = median
+        self.tail = tail
+        self.tail_rate = tail_rate
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False, request_options=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+            slow = self._rng.random() < self.tail_rate
+            fails = self._rng.random() < self.error_rate
+            latency = self.tail if slow else self.median * self._rng.lognormvariate(0, 0.25)
+        timeout = (request_options or {}).get('timeout')
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError('Deadline exceeded')
+        time.sleep(latency)
+        if fails:
+            raise RuntimeError('503 Service Unavailable')
+        return SimpleNamespace(text=f'Answer to: {prompt}')
+
+
+class ResilientCallerTests(SimpleTestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=16)
+
+    def tearDown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def ask(caller, model):
+        return caller.call(lambda timeout: model.generate_content('q', request_options={'timeout': timeout}))
+
+    def test_deadline_cuts_off_slow_call(self):
+        model = FakeGeminiModel(median=2.0)
+        caller = ResilientCaller(self.executor, timeout=0.3, min_call_time=0.05)
+        started = time.perf_counter()
+        with self.assertRaises((DeadlineExceeded, TimeoutError)):
+            self.ask(caller, model)
+
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+    def test_breaker_opens_fails_fast_and_probe_closes_it(self):
+        model = FakeGeminiModel(median=0.02, error_rate=1.0)
+        caller = ResilientCaller(self.executor, timeout=1.0,
+                                 breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.2))
+        for _ in range(3):
+            with self.assertRaises(RuntimeError):
+                self.ask(caller, model)
+        for _ in range(7):
+            started = time.perf_counter()
+            with self.assertRaises(CircuitOpenError):
+                self.ask(caller, model)
+            self.assertLess(time.perf_counter() - started, 0.01)  # model calls take ~20 ms
+
+        self.assertEqual(model.calls, 3)
+        self.assertEqual(caller.breaker.state, CircuitBreaker.OPEN)
+
+        # After the reset timeout one probe goes through and closes the circuit
+        model.error_rate = 0.0
+        time.sleep(0.25)
+        self.ask(caller, model)
+        self.assertEqual(caller.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_hedging_reduces_tail_latency(self):
+        p99 = {}
+        for hedge in (False, True):
+            model = FakeGeminiModel(median=0.02, tail=0.5, tail_rate=0.05, seed=1)
+            caller = ResilientCaller(self.executor, timeout=2.0, hedge=hedge, hedge_min_samples=20)
+            latencies = []
+            for _ in range(200):
+                started = time.perf_counter()
+                self.ask(caller, model)
+                latencies.append(time.perf_counter() - started)
+            p99[hedge] = np.percentile(latencies[20:], 99)  # After warm-up
+
+        self.assertLess(p99[True], p99[False])
+
+
+@override_settings(BOOK_RECOMMENDATIONS_REFRESH_IN_BACKGROUND=False)
+class EndpointQueryCountTests(TestCase):
+    """Query counts per endpoint must not grow with the reading history"""
+
+    # Path and queries of a warmed-up request
+    QUERY_COUNTS = {
+        'reading-history': ('/api/reading-history/?page_size=100', 1),
+        'wisdom-library': ('/api/wisdom-library/', 6),
+        'book-detail': ('/api/books/{book_id}/', 3),
+        'reading-preferences': ('/api/reading-preferences/', 1),
+    }
+    HISTORY_SIZES = (1, 10, 100)
+
+    @classmethod
+    def setUpTestData(cls):
+        # Beginner books, so the default profile gets stored recommendations
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=f'Author {i}', genre='Investment', description='',
+                 rating=4.0 + i % 10 / 10, investment_level='Beginner')
+            for i in range(max(cls.HISTORY_SIZES) + 20)
+        )
+        bump_catalog_version()  # bulk_create sends no Book signals
+        cls.books = list(Book.objects.order_by('id'))
+
+    def test_query_counts_do_not_grow_with_history(self):
+        for size in self.HISTORY_SIZES:
+            user = User.objects.create(username=f'reader{size}', email=f'reader{size}@example.com')
+            UserReadingHistory.objects.bulk_create(
+                UserReadingHistory(user=user, book=book, status='completed' if i % 2 else 'currently_reading')
+                for i, book in enumerate(self.books[:size])
+            )
+            client = APIClient(HTTP_HOST='localhost')
+            client.force_authenticate(user)
+            for name, (path, queries) in self.QUERY_COUNTS.items():
+                path = path.format(book_id=self.books[0].id)
+                with self.subTest(endpoint=name, history_rows=size):
+                    # First request creates the profile, preferences and (once it commits) stored recommendations
+                    with self.captureOnCommitCallbacks(execute=True):
+                        client.get(path)
+                    with self.assertNumQueries(queries):
+                        response = client.get(path)
+                    self.assertEqual(response.status_code, 200)
+
+
+class UpsertBooksTests(TestCase):
+    def test_partial_row_keeps_columns_it_leaves_out(self):
+        upsert_books([normalize_row({
+            'title': 'Deep Work', 'author': 'Cal Newport', 'genre': 'Productivity',
+            'description': 'Rules for focused success', 'rating': '4.6', 'pages': '296',
+        })])
+        # In one chunk with a full row, a partial row must not reset the other columns
+        upsert_books([
+            normalize_row({'title': 'Deep Work', 'author': 'Cal Newport', 'rating': '4.8'}),
+            normalize_row({
+                'title': 'Atomic Habits', 'author': 'James Clear', 'genre': 'Self-Help',
+                'description': 'Tiny changes', 'rating': '4.7', 'pages': '320',
+            }),
+        ])
+
+        book = Book.objects.get(title='Deep Work', author='Cal Newport')
+        self.assertEqual(book.rating, 4.8)
+        self.assertEqual(book.genre, 'Productivity')
+        self.assertEqual(book.description, 'Rules for focused success')
+        self.assertEqual(book.pages, 296)
+        self.assertEqual(Book.objects.get(title='Atomic Habits').pages, 320)
+        self.assertEqual(Book.objects.count(), 2)
+
+
+class ScoringEngineParityTests(TestCase):
+    """ScoringEngine must score and rank exactly like BookRecommender.calculate_recommendation_score"""
+
+    GENRES = [
+        'Business & Management', 'Investment', 'Self-Help / Personal Growth', 'Psychology', 'Leadership',
+    ]
+    LEVELS = ['Beginner', 'Intermediate', 'Advanced', '']
+    # (income, age, investment_amount, preferred genres), on and around every rule threshold
+    PROFILES = [
+        (1000001, 29, 500001, ['Investment']),
+        (1000000, 30, 500000, []),
+        (500000, 50, 100000, ['Psychology', 'Leadership']),
+        (499999, 51, 99999, ['Self-Help / Personal Growth']),
+        (0, 0, 0, ['Business & Management', 'Investment', 'Unknown Genre']),
+        (750000, 40, 250000, ['Leadership']),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(7)
+        # Ratings and popularity on a coarse grid, so ties exercise the tie-breaking order
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=f'Author {i}', description='', genre=rng.choice(cls.GENRES),
+                 investment_level=rng.choice(cls.LEVELS), rating=rng.choice([3.5, 4.0, 4.5, 5.0]),
+                 popularity_score=rng.choice([0.0, 0.5, 1.0]))
+            for i in range(150)
+        )
+        bump_catalog_version()  # bulk_create sends no Book signals
+        cls.books = list(Book.objects.order_by('-rating', '-popularity_score', 'id'))
+
+    def profiles(self):
+        for income, age, investment_amount, genres in self.PROFILES:
+            yield (UserProfile(income=income, age=age, investment_amount=investment_amount),
+                   UserReadingPreference(preferred_genres=genres))
+
+    def test_scores_match_scalar_formula(self):
+        recommender = BookRecommender()
+        engine = get_scoring_engine()
+        self.assertEqual(engine.catalog.ids.tolist(), [book.id for book in self.books])
+
+        profiles = list(self.profiles())
+        batch = engine.score_users(
+            [p.income for p, _ in profiles], [p.age for p, _ in profiles],
+            [p.investment_amount for p, _ in profiles],
+            engine.preferred_genre_matrix([prefs.preferred_genres for _, prefs in profiles])
+        )
+        for row, (profile, preferences) in enumerate(profiles):
+            expected = [recommender.calculate_recommendation_score(book, None, profile, preferences)
+                        for book in self.books]
+            with self.subTest(profile=self.PROFILES[row]):
+                scores = engine.score_user(profile.income, profile.age, profile.investment_amount,
+                                           preferences.preferred_genres)
+                self.assertEqual(scores.tolist(), expected)
+                self.assertEqual(batch[row].tolist(), expected)
+
+    def test_ranking_matches_scalar_formula(self):
+        recommender = BookRecommender()
+        user = User.objects.create(username='reader', email='reader@example.com')
+        completed = {book.id for book in self.books[::7]}
+        UserReadingHistory.objects.bulk_create(
+            UserReadingHistory(user=user, book_id=book_id, status='completed') for book_id in completed
+        )
+        for profile, preferences in self.profiles():
+            genres = set(preferences.preferred_genres) | set(recommender.get_financial_genres(profile))
+            levels = recommender.get_investment_levels(profile)
+            # Catalog order breaks score ties
+            expected = [
+                (book.id, score) for score, book in sorted(
+                    ((recommender.calculate_recommendation_score(book, user, profile, preferences), book)
+                     for book in self.books
+                     if (book.genre in genres or book.investment_level in levels) and book.id not in completed),
+                    key=lambda pair: -pair[0]
+                )
+            ][:20]
+            with self.subTest(profile=(profile.income, profile.age, profile.investment_amount)):
+                ranked = recommender.rank_books(user, profile, preferences, 20)
+                self.assertEqual([(book.id, score) for book, score, _ in ranked], expected)
+                batch = recommender.rank_books_batch(
+                    [user], {user.id: profile}, {user.id: preferences}, {user.id: completed}, 20
+                )
+                self.assertEqual([(book.id, score) for book, score, _ in batch[user.id]], expected)
+
+
+class TaxEngineTests(SimpleTestCase):
+    """Liabilities checked by hand against the published slabs (salaried, standard deduction applied)"""
+
+    def test_new_regime_2026_27(self):
+        engine = TaxEngine('2026-27')
+        cases = [
+            (1275000, 0),        # Taxable 12L: full 87A rebate
+            (1280000, 5200),     # Marginal relief: tax capped at the 5,000 above 12L, plus cess
+            (1500000, 97500),
+            (6000000, 1552980),  # 10% surcharge with marginal relief at 50L
+        ]
+        for income, expected in cases:
+            with self.subTest(income=income):
+                self.assertEqual(engine.liability(income, 'new'), expected)
+
+    def test_old_regime_2026_27(self):
+        engine = TaxEngine('2026-27')
+        self.assertEqual(engine.liability(500000, 'old'), 0)
+        self.assertEqual(engine.liability(6000000, 'old'), 1827540)
+        # Deductions above the 80C and 80D caps count only up to the caps
+        self.assertEqual(engine.liability(1000000, 'old', d80c=200000, d80d_self=40000), 70200)
+
+    def test_new_regime_2024_25(self):
+        self.assertEqual(TaxEngine('2024-25').liability(1000000, 'new'), 54600)
+
+    def test_vectorized_matches_scalar(self):
+        engine = TaxEngine('2026-27')
+        incomes = [1275000, 1280000, 1500000, 6000000]
+        self.assertEqual(engine.liability(incomes, 'new').tolist(), [0, 5200, 97500, 1552980])
+
+    def test_unknown_assessment_year(self):
+        with self.assertRaises(ValueError):
+            TaxEngine('1999-00')
+
+
+class TaxAllocationOptimizerTests(SimpleTestCase):
+    # (budget, income, age, optimize() keyword arguments). AY 2024-25, where the old
+    # regime with deductions can still beat the new one at these incomes.
+    SCENARIOS = [
+        (400000, 900000, 35, {}),
+        (400000, 1000000, 65, {'parents_senior': True}),
+        (100000, 900000, 35, {}),  # Budget smaller than the caps
+        (400000, 900000, 35, {'d80c': 120000, 'd80d_self': 10000}),
+        (400000, 900000, 65, {'max_risk': 'Low'}),
+        (400000, 900000, 35, {'max_lock_in_years': 5}),
+        (200000, 600000, 28, {}),   # Within the 87A rebate: investing saves nothing
+        (400000, 1800000, 35, {}),  # New regime stays cheaper whatever is invested
+    ]
+
+    def setUp(self):
+        self.engine = TaxEngine('2024-25')
+        self.optimizer = TaxAllocationOptimizer(self.engine, step=1000)
+
+    def scenarios(self):
+        for budget, income, age, options in self.SCENARIOS:
+            with self.subTest(budget=budget, income=income, age=age, **options):
+                yield budget, income, age, options, self.optimizer.optimize(budget, income, age, **options)
+
+    def test_allocations_stay_within_section_caps(self):
+        for budget, income, age, options, result in self.scenarios():
+            caps = {
+                '80C': DEDUCTION_LIMITS['80C'],
+                '80D_self': DEDUCTION_LIMITS['80D_self_senior' if age >= 60 else '80D_self'],
+                '80D_parents': DEDUCTION_LIMITS['80D_parents_senior' if options.get('parents_senior') else '80D_parents'],
+                '80CCD(1B)': DEDUCTION_LIMITS['80CCD(1B)'],
+            }
+            for section, key in SECTION_KEYS.items():
+                allocated = sum(a['amount'] for a in result['allocations'] if a['section'] == section)
+                self.assertLessEqual(allocated + options.get(key, 0), max(caps[section], options.get(key, 0)))
+            for allocation in result['allocations']:
+                if allocation['name'] == 'NSC':
+                    self.assertLessEqual(allocation['amount'], 100000)
+
+    def test_fills_senior_health_insurance_cap(self):
+        result = self.optimizer.optimize(400000, 1000000, 65, parents_senior=True)
+        by_section = {a['section']: a['amount'] for a in result['allocations']}
+        self.assertEqual(by_section['80D_self'], 50000)
+        self.assertEqual(by_section['80D_parents'], 50000)
+        self.assertLess(result['tax_after'], result['tax_before'])
+
+    def test_budget_constraint_holds(self):
+        for budget, income, age, options, result in self.scenarios():
+            allocated = sum(a['amount'] for a in result['allocations'])
+            self.assertAlmostEqual(allocated, result['total_allocated'], places=2)
+            self.assertLessEqual(result['total_allocated'], budget)
+            self.assertAlmostEqual(result['unallocated'], budget - result['total_allocated'], places=2)
+            self.assertTrue(all(a['amount'] > 0 for a in result['allocations']))
+
+    def test_no_worse_than_investing_nothing(self):
+        for budget, income, age, options, result in self.scenarios():
+            deductions = {key: value for key, value in options.items()
+                          if key in SECTION_KEYS.values() or key == 'parents_senior'}
+            baseline = float(self.engine.best_liability(income, age, **deductions))
+            self.assertEqual(result['tax_before'], baseline)
+            self.assertLessEqual(result['tax_after'], baseline)
+            self.assertAlmostEqual(result['tax_saved'], baseline - result['tax_after'], places=2)
+
+            # The reported tax is what the chosen allocation actually yields
+            after = dict(deductions)
+            for allocation in result['allocations']:
+                key = SECTION_KEYS[allocation['section']]
+                after[key] = after.get(key, 0) + allocation['amount']
+            self.assertEqual(result['tax_after'], float(self.engine.best_liability(income, age, **after)))
+
+    def test_respects_risk_and_lock_in_filters(self):
+        by_name = {i['name']: i for i in self.optimizer.instruments}
+        for budget, income, age, options, result in self.scenarios():
+            for allocation in result['allocations']:
+                instrument = by_name[allocation['name']]
+                if 'max_risk' in options:
+                    self.assertLessEqual(RISK_LEVELS[instrument['risk']], RISK_LEVELS[options['max_risk']])
+                if 'max_lock_in_years' in options:
+                    lock_in = instrument['lock_in_years']
+                    self.assertLessEqual(max(60 - age, 0) if lock_in is None else lock_in,
+                                         options['max_lock_in_years'])
+
+
+def legacy_scheme_names(profile):
+    """Scheme names from the if-chain BenefitsView used before the rule engine"""
+    names = []
+    if profile.income < 1200000:
+        names.append('PM-KISAN')
+    if profile.income < 500000:
+        names.append('Ayushman Bharat')
+    if profile.age >= 60:
+        names.append('Senior Citizen Savings Scheme (SCSS)')
+    if profile.age >= 18 and profile.age <= 40:
+        names.append('Atal Pension Yojana (APY)')
+    names.append('Pradhan Mantri Jeevan Jyoti Bima Yojana (PMJJBY)')
+    names.append('Pradhan Mantri Suraksha Bima Yojana (PMSBY)')
+    if profile.investment_amount < 150000:
+        names.append('Public Provident Fund (PPF)')
+    if profile.dependents > 0:
+        names.append('Sukanya Samriddhi Yojana')
+    if profile.income < 800000:
+        names.append('Pradhan Mantri Mudra Yojana')
+    if profile.income < 600000:
+        names.append('Pradhan Mantri Awas Yojana (PMAY)')
+    return names
+
+
+# Values on both sides of every threshold in SCHEMES
+BOUNDARY_INCOMES = [0, 499999, 500000, 599999, 600000, 799999, 800000, 1199999, 1200000, 5000000]
+BOUNDARY_AGES = [0, 17, 18, 40, 41, 59, 60, 95]
+BOUNDARY_DEPENDENTS = [0, 1, 3]
+BOUNDARY_INVESTMENTS = [0, 149999, 150000]
+
+
+class EligibilityMatchTests(SimpleTestCase):
+    def names(self, engine=eligibility_engine, **fields):
+        return [benefit['name'] for benefit in engine.match(UserProfile(**fields))]
+
+    def test_matches_legacy_if_chain_at_every_boundary(self):
+        for income, age, dependents, investment_amount in itertools.product(
+                BOUNDARY_INCOMES, BOUNDARY_AGES, BOUNDARY_DEPENDENTS, BOUNDARY_INVESTMENTS):
+            profile = UserProfile(income=income, age=age, dependents=dependents, investment_amount=investment_amount)
+            with self.subTest(income=income, age=age, dependents=dependents, investment_amount=investment_amount):
+                self.assertEqual([b['name'] for b in eligibility_engine.match(profile)], legacy_scheme_names(profile))
+
+    def test_rule_boundaries(self):
+        # (profile field, value, scheme, eligible)
+        cases = [
+            ('income', 1199999, 'PM-KISAN', True),
+            ('income', 1200000, 'PM-KISAN', False),
+            ('income', 499999, 'Ayushman Bharat', True),
+            ('income', 500000, 'Ayushman Bharat', False),
+            ('income', 599999, 'Pradhan Mantri Awas Yojana (PMAY)', True),
+            ('income', 600000, 'Pradhan Mantri Awas Yojana (PMAY)', False),
+            ('income', 799999, 'Pradhan Mantri Mudra Yojana', True),
+            ('income', 800000, 'Pradhan Mantri Mudra Yojana', False),
+            ('age', 59, 'Senior Citizen Savings Scheme (SCSS)', False),
+            ('age', 60, 'Senior Citizen Savings Scheme (SCSS)', True),
+            ('age', 17, 'Atal Pension Yojana (APY)', False),
+            ('age', 18, 'Atal Pension Yojana (APY)', True),
+            ('age', 40, 'Atal Pension Yojana (APY)', True),
+            ('age', 41, 'Atal Pension Yojana (APY)', False),
+            ('dependents', 0, 'Sukanya Samriddhi Yojana', False),
+            ('dependents', 1, 'Sukanya Samriddhi Yojana', True),
+            ('investment_amount', 149999, 'Public Provident Fund (PPF)', True),
+            ('investment_amount', 150000, 'Public Provident Fund (PPF)', False),
+        ]
+        for field, value, scheme, eligible in cases:
+            with self.subTest(field=field, value=value, scheme=scheme):
+                self.assertEqual(scheme in self.names(**{field: value}), eligible)
+
+    def test_category_rules(self):
+        engine = EligibilityEngine([
+            {'name': 'Farmers', 'rules': {'occupations': ['Farmer'], 'income': (-INF, 300000)}},
+            {'name': 'Kerala', 'rules': {'states': ['Kerala', 'Tamil Nadu']}},
+            {'name': 'Anyone', 'rules': {}},
+        ])
+        self.assertEqual(self.names(engine, occupation=' farmer ', income=299999), ['Farmers', 'Anyone'])
+        self.assertEqual(self.names(engine, occupation='Farmer', income=300000), ['Anyone'])
+        self.assertEqual(self.names(engine, occupation='Teacher', income=0), ['Anyone'])
+        self.assertEqual(self.names(engine, state='TAMIL NADU'), ['Kerala', 'Anyone'])
+        self.assertEqual(self.names(engine, occupation='', state=''), ['Anyone'])
+
+    def test_unknown_rule_is_rejected(self):
+        with self.assertRaises(ValueError):
+            EligibilityEngine([{'name': 'Bad', 'rules': {'pincode': (0, 1)}}])
+
+    def test_returns_fresh_dicts(self):
+        first = eligibility_engine.match(UserProfile(income=0, age=30))
+        first[0]['name'] = 'Changed'
+        self.assertEqual(eligibility_engine.match(UserProfile(income=0, age=30))[0]['name'], SCHEMES[0]['name'])
+
+
+class EligibilityBatchTests(TestCase):
+    """count_profiles() and the admin stats view must agree with match() per profile"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(13)
+        users = User.objects.bulk_create(
+            User(username=f'profile{i}', email=f'profile{i}@example.com') for i in range(120)
+        )
+        UserProfile.objects.bulk_create(
+            UserProfile(
+                user=user, income=rng.choice(BOUNDARY_INCOMES), age=rng.choice(BOUNDARY_AGES),
+                dependents=rng.choice(BOUNDARY_DEPENDENTS), investment_amount=rng.choice(BOUNDARY_INVESTMENTS),
+                occupation=rng.choice(['', 'Farmer', 'farmer ', 'Teacher']), state=rng.choice(['', 'Kerala', 'Goa'])
+            )
+            for user in users
+        )
+        cls.admin = User.objects.create(username='admin', email='admin@example.com', is_staff=True)
+
+    def expected_counts(self, engine=eligibility_engine):
+        counts = [0] * len(engine.benefits)
+        names = [benefit['name'] for benefit in engine.benefits]
+        for profile in UserProfile.objects.all():
+            for benefit in engine.match(profile):
+                counts[names.index(benefit['name'])] += 1
+        return counts
+
+    def test_counts_equal_per_profile_match(self):
+        # A chunk size that does not divide the profile count exercises the last partial chunk
+        total, counts = eligibility_engine.count_profiles(UserProfile.objects.all(), chunk_size=7)
+        self.assertEqual(total, UserProfile.objects.count())
+        self.assertEqual(counts.tolist(), self.expected_counts())
+
+    def test_per_user_masks_equal_match(self):
+        masks_by_user = {}
+
+        def collect(columns, masks):
+            masks_by_user.update(zip(columns['user_id'].tolist(), masks.tolist()))
+
+        eligibility_engine.count_profiles(UserProfile.objects.all(), chunk_size=50, on_chunk=collect)
+        for profile in UserProfile.objects.all():
+            self.assertEqual(masks_by_user[profile.user_id], eligibility_engine.match_mask(profile))
+
+    def test_category_rules_in_batch(self):
+        engine = EligibilityEngine([
+            {'name': 'Farmers', 'category': 'Agriculture', 'rules': {'occupations': ['Farmer']}},
+            {'name': 'Kerala', 'category': 'State', 'rules': {'states': ['kerala'], 'age': (18, 61)}},
+        ])
+        total, counts = engine.count_profiles(UserProfile.objects.all(), chunk_size=11)
+        self.assertEqual(counts.tolist(), self.expected_counts(engine))
+        self.assertGreater(counts.min(), 0)
+
+    def test_stats_view(self):
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(self.admin)
+        response = client.get('/api/admin/benefits-eligibility/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_profiles'], 120)
+        self.assertEqual([scheme['eligible'] for scheme in response.data['schemes']], self.expected_counts())
+        self.assertEqual([scheme['name'] for scheme in response.data['schemes']], [s['name'] for s in SCHEMES])
+
+    def test_stats_view_is_admin_only(self):
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(User.objects.get(username='profile0'))
+        self.assertEqual(client.get('/api/admin/benefits-eligibility/').status_code, 403)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='saver', email='saver@example.com')
+        cls.book = Book.objects.create(title='Deep Work', author='Cal Newport', genre='Productivity', description='')
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def etag(self, path='/api/dashboard/'):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_repeat_get_with_matching_etag_is_not_modified(self):
+        etag = self.etag()
+        response = self.client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get('/api/dashboard/', HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_saves_change_the_etag(self):
+        etag = self.etag()  # Creates the profile
+        changes = {
+            'profile': lambda: UserProfile.objects.get(user=self.user).save(),
+            'preferences': lambda: UserReadingPreference.objects.update_or_create(
+                user=self.user, defaults={'preferred_genres': ['Investment']}),
+            'history': lambda: UserReadingHistory.objects.create(user=self.user, book=self.book, status='wishlist'),
+            'history update': lambda: UserReadingHistory.objects.get(user=self.user).save(),
+        }
+        for name, change in changes.items():
+            with self.subTest(change=name):
+                change()
+                response = self.client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+                etag = response['ETag']
+
+    def test_degraded_response_has_no_etag(self):
+        failing = mock.Mock(**{'generate_tax_recommendations.side_effect': RuntimeError('503 Service Unavailable')})
+        with mock.patch('core.views.ai_service', failing), redirect_stdout(io.StringIO()):
+            response = self.client.get('/api/tax-savings/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_degraded_flag_from_earlier_in_the_context_is_ignored(self):
+        etag = self.etag()
+
+        def revalidate():
+            mark_degraded()  # Left over from earlier work in the same context
+            return self.client.get('/api/dashboard/', HTTP_IF_NONE_MATCH=etag)
+
+        response = contextvars.copy_context().run(revalidate)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_async_view(self):
+        class View:
+            degrade = False
+
+            @conditional_on_user_data
+            async def get(self, request):
+                if self.degrade:
+                    mark_degraded()
+                return HttpResponse('ok')
+
+        request = RequestFactory().get('/async/')
+        request.user = self.user
+        etag = async_to_sync(View().get)(request)['ETag']
+
+        def revalidate():
+            mark_degraded()
+            request = RequestFactory().get('/async/', HTTP_IF_NONE_MATCH=etag)
+            request.user = self.user
+            return async_to_sync(View().get)(request)
+
+        response = contextvars.copy_context().run(revalidate)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        view = View()
+        view.degrade = True
+        self.assertFalse(async_to_sync(view.get)(request).has_header('ETag'))
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Few distinct ratings and popularity scores, so most ordering ties fall to id
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=f'Author {i}', genre='Investment', description='',
+                 rating=4.0 + i % 3 / 2, popularity_score=i % 2)
+            for i in range(30)
+        )
+        cls.user = User.objects.create(username='pager', email='pager@example.com')
+        UserReadingHistory.objects.bulk_create(
+            UserReadingHistory(user=cls.user, book=book, status='wishlist') for book in Book.objects.all()[:17]
+        )
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def pages(self, path, key, page_size):
+        ids, cursor = [], None
+        while True:
+            params = {'page_size': page_size, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get(path, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data[key]), page_size)
+            ids.append([row['id'] for row in response.data[key]])
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                return ids
+
+    def test_book_pages_follow_catalog_order(self):
+        pages = self.pages('/api/books/', 'books', 7)
+
+        expected = list(Book.objects.order_by('-rating', '-popularity_score', 'id').values_list('id', flat=True))
+        self.assertEqual([book_id for page in pages for book_id in page], expected)
+        self.assertEqual([len(page) for page in pages], [7, 7, 7, 7, 2])
+
+    def test_exact_multiple_ends_without_empty_page(self):
+        pages = self.pages('/api/books/', 'books', 10)
+        self.assertEqual([len(page) for page in pages], [10, 10, 10])
+
+    def test_inserts_between_pages_do_not_shift_results(self):
+        first = self.client.get('/api/books/', {'page_size': 10}).data
+        # A new book that sorts before everything already served
+        Book.objects.create(title='New', author='Someone', genre='Investment', description='', rating=5.0,
+                            popularity_score=5)
+        second = self.client.get('/api/books/', {'page_size': 10, 'cursor': first['next_cursor']}).data
+
+        expected = list(Book.objects.exclude(title='New').order_by('-rating', '-popularity_score', 'id')
+                        .values_list('id', flat=True))
+        self.assertEqual([b['id'] for b in first['books'] + second['books']], expected[:20])
+
+    def test_reading_history_pages(self):
+        pages = self.pages('/api/reading-history/', 'results', 5)
+
+        expected = list(UserReadingHistory.objects.filter(user=self.user).order_by('-updated_at', 'id')
+                        .values_list('id', flat=True))
+        self.assertEqual([history_id for page in pages for history_id in page], expected)
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 2])
+
+    def test_single_page_has_no_next_cursor(self):
+        response = self.client.get('/api/reading-history/')
+        self.assertEqual(len(response.data['results']), 17)
+        self.assertIsNone(response.data['next_cursor'])
+
+    def test_tampered_cursor_is_rejected(self):
+        cursor = self.client.get('/api/books/', {'page_size': 5}).data['next_cursor']
+        history_cursor = self.client.get('/api/reading-history/', {'page_size': 5}).data['next_cursor']
+        encode = lambda values: base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+        tampered = [
+            ('/api/books/', 'not-a-cursor!'),
+            ('/api/books/', cursor[:-3]),
+            ('/api/books/', encode([4.5, 1.0])),              # Wrong number of values
+            ('/api/books/', encode(['4.5', 1.0, 3])),         # Rating as a string
+            ('/api/books/', encode({'rating': 4.5})),
+            ('/api/reading-history/', encode(['yesterday', 3])),
+            ('/api/reading-history/', cursor),                # A book cursor on the history endpoint
+            ('/api/reading-history/', history_cursor + 'x'),
+        ]
+        for path, value in tampered:
+            with self.subTest(path=path, cursor=value):
+                response = self.client.get(path, {'cursor': value})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data, {'error': 'Invalid cursor'})
+
+
+class ProfileResponseCacheTests(SimpleTestCase):
+    PROFILE = {'income': 900000, 'age': 34, 'investment_amount': 50000, 'tax_deductions': 0}
+
+    def cache(self, ttl=60):
+        return ProfileResponseCache(InMemoryCacheBackend(max_entries=8), ttl=ttl)
+
+    def test_hit_and_miss(self):
+        cache = self.cache()
+        self.assertIsNone(cache.get('tax', self.PROFILE))
+        cache.set('tax', self.PROFILE, {'tips': ['ELSS']})
+
+        # Key order does not matter; the kind and every value do
+        self.assertEqual(cache.get('tax', dict(reversed(list(self.PROFILE.items())))), {'tips': ['ELSS']})
+        self.assertIsNone(cache.get('benefits', self.PROFILE))
+        self.assertIsNone(cache.get('tax', {**self.PROFILE, 'income': 900001}))
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 3})
+
+    def test_returns_copies(self):
+        cache = self.cache()
+        cache.set('tax', self.PROFILE, {'tips': ['ELSS']})
+        cache.get('tax', self.PROFILE)['tips'].append('changed')
+        self.assertEqual(cache.get('tax', self.PROFILE), {'tips': ['ELSS']})
+
+    def test_entries_expire_after_ttl(self):
+        cache = self.cache(ttl=60)
+        with mock.patch('core.ai_cache.time.monotonic', return_value=1000.0):
+            cache.set('tax', self.PROFILE, 'answer')
+        with mock.patch('core.ai_cache.time.monotonic', return_value=1059.0):
+            self.assertEqual(cache.get('tax', self.PROFILE), 'answer')
+        with mock.patch('core.ai_cache.time.monotonic', return_value=1061.0):
+            self.assertIsNone(cache.get('tax', self.PROFILE))
+
+    def test_service_calls_model_once_per_profile(self):
+        model = FakeGeminiModel(median=0.001)
+        service = GeminiAIService(response_cache=self.cache(), model=model)
+        first = service.generate_tax_recommendations(self.PROFILE)
+        self.assertEqual(service.generate_tax_recommendations(dict(self.PROFILE)), first)
+        self.assertEqual(model.calls, 1)
+
+        service.generate_tax_recommendations({**self.PROFILE, 'income': 1500000})
+        self.assertEqual(model.calls, 2)
+
+    def test_fallback_is_not_cached(self):
+        model = FakeGeminiModel(median=0.001, error_rate=1.0)
+        cache = self.cache()
+        service = GeminiAIService(response_cache=cache, model=model)
+        with self.assertLogs('core.ai_service', 'ERROR'):
+            service.generate_tax_recommendations(self.PROFILE)
+        self.assertIsNone(cache.get('tax', self.PROFILE))
+
+
+class ProfileUpdateCacheTests(TestCase):
+    def test_update_keeps_entries_shared_with_other_users(self):
+        alice = User.objects.create(username='alice', email='alice@example.com')
+        bob = User.objects.create(username='bob', email='bob@example.com')
+        for user in (alice, bob):
+            UserProfile.objects.create(user=user, income=900000, age=34)
+        shared = build_tax_profile_dict(UserProfile.objects.get(user=bob))
+        service = GeminiAIService(response_cache=ProfileResponseCache(InMemoryCacheBackend(), ttl=60),
+                                  model=FakeGeminiModel(median=0.001))
+        service.response_cache.set('tax', shared, {'tips': ['cached for both']})
+
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(alice)
+        with mock.patch('core.views.ai_service', service), redirect_stdout(io.StringIO()):
+            response = client.put('/api/profile/', {'income': 1500000}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        # Bob's profile is unchanged, so his cached answer still serves; Alice's new values miss
+        self.assertEqual(service.response_cache.get('tax', shared), {'tips': ['cached for both']})
+        alice_profile = build_tax_profile_dict(UserProfile.objects.get(user=alice))
+        self.assertIsNone(service.response_cache.get('tax', alice_profile))
+
+
+class OncePerMinuteThrottle(UserRateThrottle):
+    rate = '1/min'
+
+
+class AsyncViewPolicyTests(TestCase):
+    """The async AI views enforce the same DRF policy as their sync counterparts"""
+
+    VIEWS = [
+        (AsyncChatbotView, ChatbotView, 'post', {'message': 'What is my tax liability?'}),
+        (AsyncTaxSavingsView, TaxSavingsView, 'get', None),
+        (AsyncBenefitsView, BenefitsView, 'get', None),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='async', email='async@example.com')
+        UserProfile.objects.create(user=cls.user, income=900000, age=34)
+
+    def setUp(self):
+        failing = mock.Mock(**{
+            'agenerate_tax_recommendations': mock.AsyncMock(side_effect=RuntimeError('503 Service Unavailable'))
+        })
+        patcher = mock.patch('core.async_views.ai_service', failing)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def call(self, view_class, method, data=None, token=None, **attrs):
+        # AsyncRequestFactory takes headers by name, not as META keys
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        factory = AsyncRequestFactory()
+        if method == 'post':
+            request = factory.post('/api/async/', data, content_type='application/json', headers=headers)
+        else:
+            request = factory.get('/api/async/', headers=headers)
+        with redirect_stdout(io.StringIO()):
+            response = async_to_sync(view_class.as_view(**attrs))(request)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def test_policy_matches_sync_views(self):
+        for async_view, sync_view, _, _ in self.VIEWS:
+            with self.subTest(view=async_view.__name__):
+                self.assertEqual(async_view.permission_classes, sync_view.permission_classes)
+                self.assertEqual(async_view.authentication_classes, sync_view.authentication_classes)
+                self.assertEqual(async_view.throttle_classes, sync_view.throttle_classes)
+                self.assertEqual(async_view.parser_classes, sync_view.parser_classes)
+
+    def test_requires_valid_token(self):
+        for view, _, method, data in self.VIEWS:
+            with self.subTest(view=view.__name__):
+                self.assertEqual(self.call(view, method, data).status_code, 401)
+                self.assertEqual(self.call(view, method, data, token='not-a-jwt').status_code, 401)
+
+    def test_authenticated_request_is_served(self):
+        token = str(AccessToken.for_user(self.user))
+        for view, _, method, data in self.VIEWS:
+            with self.subTest(view=view.__name__):
+                self.assertEqual(self.call(view, method, data, token=token).status_code, 200)
+
+    def test_permission_classes_are_enforced(self):
+        token = str(AccessToken.for_user(self.user))
+        response = self.call(AsyncBenefitsView, 'get', token=token, permission_classes=[permissions.IsAdminUser])
+        self.assertEqual(response.status_code, 403)
+
+    def test_throttle_classes_are_enforced(self):
+        token = str(AccessToken.for_user(self.user))
+        self.assertEqual(self.call(AsyncBenefitsView, 'get', token=token,
+                                   throttle_classes=[OncePerMinuteThrottle]).status_code, 200)
+        self.assertEqual(self.call(AsyncBenefitsView, 'get', token=token,
+                                   throttle_classes=[OncePerMinuteThrottle]).status_code, 429)
+
+    def test_unsupported_method(self):
+        token = str(AccessToken.for_user(self.user))
+        self.assertEqual(self.call(AsyncBenefitsView, 'post', {}, token=token).status_code, 405)
+
+
+class RequestOptionsTests(SimpleTestCase):
+    def test_only_passes_a_deadline_when_there_is_one(self):
+        self.assertEqual(request_options(None), {})
+        self.assertEqual(request_options(2.5), {'request_options': {'timeout': 2.5}})
+
+    def test_async_native_call_sends_request_options_only_with_a_deadline(self):
+        class Model:
+            async def generate_content_async(self, prompt, **kwargs):
+                self.kwargs = kwargs
+                return SimpleNamespace(text=' answer ')
+
+        model = Model()
+        service = GeminiAIService(model=model)
+        service.async_mode = 'native'
+        self.assertEqual(async_to_sync(service._agenerate_text)('q'), 'answer')
+        self.assertEqual(model.kwargs, {'request_options': {'timeout': service.resilience.timeout}})
+
+        # A caller without a deadline runs the completion with timeout None
+        with mock.patch.object(service.resilience, 'acall', new=lambda complete: complete(None)):
+            self.assertEqual(async_to_sync(service._agenerate_text)('q'), 'answer')
+        self.assertEqual(model.kwargs, {})
+
+
+class RecommendationRefreshTests(TestCase):
+    """Writes expire stored recommendations and recompute them after the response, not inside it"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=f'Author {i}', genre='Investment', description='',
+                 rating=4.0 + i % 10 / 10, investment_level='Beginner')
+            for i in range(30)
+        )
+        bump_catalog_version()  # bulk_create sends no Book signals
+        cls.user = User.objects.create(username='writer', email='writer@example.com')
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def store_now(self):
+        with override_settings(BOOK_RECOMMENDATIONS_REFRESH_IN_BACKGROUND=False):
+            refresher.submit(self.user.id)
+
+    def fresh_rows(self):
+        return BookRecommendation.objects.filter(user=self.user, expires_at__gt=timezone.now())
+
+    def test_writes_defer_the_recompute(self):
+        writes = [
+            lambda: self.client.put('/api/profile/', {'income': 1500000}, format='json'),
+            lambda: self.client.put('/api/reading-preferences/', {'preferred_genres': ['Investment']}, format='json'),
+            lambda: self.client.post('/api/reading-history/', {'book_id': Book.objects.first().id,
+                                                               'status': 'completed'}, format='json'),
+        ]
+        for write in writes:
+            self.store_now()
+            self.assertEqual(self.fresh_rows().count(), 10)
+            with self.subTest(write=write), redirect_stdout(io.StringIO()):
+                with mock.patch('core.recommendations.recommender.rank_books') as rank_books, \
+                        self.captureOnCommitCallbacks() as callbacks:
+                    self.assertEqual(write().status_code, 200)
+                rank_books.assert_not_called()
+                self.assertEqual(self.fresh_rows().count(), 0)  # Expired, so readers do not serve them
+                self.assertEqual(len(callbacks), 1)
+
+                with override_settings(BOOK_RECOMMENDATIONS_REFRESH_IN_BACKGROUND=False):
+                    callbacks[0]()
+                self.assertEqual(self.fresh_rows().count(), 10)
+
+    def test_completed_book_leaves_recommendations_after_refresh(self):
+        self.store_now()
+        book = self.fresh_rows().order_by('-recommendation_score').first().book
+        with self.captureOnCommitCallbacks(execute=True), \
+                override_settings(BOOK_RECOMMENDATIONS_REFRESH_IN_BACKGROUND=False):
+            self.client.post('/api/reading-history/', {'book_id': book.id, 'status': 'completed'}, format='json')
+        self.assertFalse(self.fresh_rows().filter(book=book).exists())
+
+    def test_library_miss_ranks_in_memory_without_writing(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.get('/api/wisdom-library/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['recommendations']), 10)
+        self.assertFalse(BookRecommendation.objects.filter(user=self.user).exists())
+        self.assertEqual(len(callbacks), 1)
+
+        # Once stored, the library serves the same recommendations from the table
+        with override_settings(BOOK_RECOMMENDATIONS_REFRESH_IN_BACKGROUND=False):
+            callbacks[0]()
+        with self.captureOnCommitCallbacks() as callbacks:
+            stored = self.client.get('/api/wisdom-library/')
+        self.assertEqual(callbacks, [])
+        self.assertEqual(
+            [(r['book']['id'], r['score']) for r in stored.data['recommendations']],
+            [(r['book']['id'], r['score']) for r in response.data['recommendations']]
+        )
+
+    def test_queued_user_is_not_queued_twice(self):
+        queue = RecommendationRefresher()
+        queue._executor = mock.Mock()
+        queue.submit(self.user.id)
+        queue.submit(self.user.id)
+        self.assertEqual(queue._executor.submit.call_count, 1)
+
+        # Once the worker picks the user up, a new write queues them again
+        (run, user_id), _ = queue._executor.submit.call_args
+        with mock.patch.object(queue, 'run'):
+            run(user_id)
+        queue.submit(self.user.id)
+        self.assertEqual(queue._executor.submit.call_count, 2)
+
+
+class BackgroundRecommendationRefreshTests(TransactionTestCase):
+    def test_worker_stores_recommendations(self):
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=f'Author {i}', genre='Investment', description='',
+                 rating=4.0, investment_level='Beginner')
+            for i in range(12)
+        )
+        bump_catalog_version()
+        user = User.objects.create(username='background', email='background@example.com')
+
+        RecommendationRefresher().submit(user.id).result(timeout=10)
+        self.assertEqual(BookRecommendation.objects.filter(user=user).count(), 10)
+
+
+class QueryPlanTests(TestCase):
+    """check_query_plans on a small seed, so a full-scan regression fails the suite; the command keeps the large run"""
+
+    def test_view_queries_use_indexes(self):
+        command = QueryPlanCommand(stdout=io.StringIO())
+        command.seed(np.random.default_rng(42), {'books': 3000, 'users': 200, 'history': 4000})
+        bump_catalog_version()
+
+        queries = command.capture_queries()
+        failures = command.check_plans(queries, verbose=False)
+        self.assertEqual(failures, [], command.stdout.getvalue())
+
+
+class BookSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.title_match = Book.objects.create(title='Wealth Habits', author='Ann Lee', genre='Personal Finance',
+                                              description='Small daily choices.', rating=4.0)
+        cls.description_match = Book.objects.create(title='Quiet Money', author='Bo Chan', genre='Investment',
+                                                    description='On wealth built slowly.', rating=4.9)
+        cls.author_match = Book.objects.create(title='Ledger Lines', author='Ada Wealthington', genre='Economics',
+                                               description='Accounts.', rating=4.5)
+        cls.unrelated = Book.objects.create(title='Garden Paths', author='Cy Dale', genre='Self-Help',
+                                            description='Flowers.', rating=5.0)
+        # Many matches, so a search result spans several pages
+        Book.objects.bulk_create(
+            Book(title=f'Compounding {i}', author=f'Author {i}', genre='Investment', description='index funds',
+                 rating=3.0 + i % 20 / 10)
+            for i in range(250)
+        )
+        book_search_index.rebuild()  # bulk_create skips the signals that index books
+        cls.user = User.objects.create(username='searcher', email='searcher@example.com')
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def search(self, query):
+        return list(book_search_index.filter(Book.objects.all(), query)
+                    .order_by(*search_paginator.ordering).values_list('id', flat=True))
+
+    def test_terms(self):
+        self.assertEqual(search_terms('Wealth, "habits" OR -tax_2'), ['wealth', 'habits', 'or', 'tax', '2'])
+        self.assertEqual(fts5_query(['wealth', 'hab']), '"wealth" "hab"*')
+        self.assertEqual(tsquery(['wealth', 'hab']), 'wealth & hab:*')
+
+    def test_title_matches_rank_first_and_last_term_is_a_prefix(self):
+        # title (weight 10), then author (5), then description (1); rating only breaks ties
+        ranked = [self.title_match.id, self.author_match.id, self.description_match.id]
+        self.assertEqual(self.search('wealth'), ranked)
+        self.assertEqual(self.search('weal'), ranked)
+        self.assertEqual(self.search('wealthing'), [self.author_match.id])
+        # Every term must match; only the last one is a prefix
+        self.assertEqual(self.search('wealth hab'), [self.title_match.id])
+        self.assertEqual(self.search('weal habits'), [])
+        self.assertEqual(self.search('"*" --'), [])
+        response = self.client.get('/api/books/', {'search': '"*" --'})
+        self.assertEqual((response.status_code, response.data['books']), (200, []))
+
+    def test_index_follows_saves_and_deletes(self):
+        self.unrelated.title = 'Garden of Wealth'
+        self.unrelated.save()
+        self.assertIn(self.unrelated.id, self.search('wealth'))
+
+        self.unrelated.delete()
+        self.assertNotIn(self.unrelated.id, self.search('wealth'))
+        self.assertEqual(self.search('garden'), [])
+
+    def test_book_list_pages_through_every_match(self):
+        ids, cursor = [], None
+        while True:
+            response = self.client.get('/api/books/', {'search': 'compounding', 'page_size': 100,
+                                                       **({'cursor': cursor} if cursor else {})})
+            self.assertEqual(response.status_code, 200)
+            ids += [book['id'] for book in response.data['books']]
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                break
+
+        self.assertEqual(len(ids), 250)
+        self.assertEqual(ids, self.search('compounding'))
+        self.assertEqual(response.data['facets']['genre'], {'Investment': 250})
+
+    def test_search_combines_with_filters(self):
+        response = self.client.get('/api/books/', {'search': 'wealth', 'genre': 'Investment'})
+        self.assertEqual([book['id'] for book in response.data['books']], [self.description_match.id])
+        # Each facet ignores its own filter, so the other matching genres are still offered
+        self.assertEqual(response.data['facets']['genre'], {'Economics': 1, 'Investment': 1, 'Personal Finance': 1})
+
+    def test_suggestions(self):
+        response = self.client.get('/api/books/search/', {'q': 'wealth', 'limit': 1})
+        self.assertEqual([book['id'] for book in response.data['results']], [self.title_match.id])
+        self.assertEqual(self.client.get('/api/books/search/', {'q': '  '}).data['results'], [])
+        self.assertEqual(len(self.client.get('/api/books/search/', {'q': 'compounding', 'limit': 99})
+                             .data['results']), 20)
+
+    def test_icontains_fallback_matches_the_same_books(self):
+        fallback = BookSearchIndex()
+        fallback._sqlite_fts5 = False
+        with mock.patch('core.tests.book_search_index', fallback):
+            self.assertEqual(sorted(self.search('wealth hab')), [self.title_match.id])
+            self.assertEqual(sorted(self.search('wealth')),
+                             sorted([self.title_match.id, self.description_match.id, self.author_match.id]))
+
+
+class BookFacetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(9)
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=f'Author {i}', genre=rng.choice(['Investment', 'Psychology', 'Economics']),
+                 difficulty_level=rng.choice(['Beginner', 'Advanced']), description='',
+                 investment_level=rng.choice(['Beginner', 'Intermediate', 'Advanced']))
+            for i in range(120)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def expected(self, filters, queryset=None):
+        """The per-facet GROUP BY the grouped query replaces"""
+        facets = {}
+        for name, field in FACETS.items():
+            rows = (queryset if queryset is not None else Book.objects.all()).filter(**{
+                FACETS[other]: value for other, value in filters.items() if other != name and value
+            }).order_by().values_list(field).annotate(count=Count('id'))
+            facets[name] = dict(sorted(rows, key=lambda row: (-row[1], row[0])))
+        return facets
+
+    def test_counts_match_a_query_per_facet(self):
+        for genre, difficulty, level in itertools.product(['', 'Investment'], ['', 'Advanced'], ['', 'Beginner']):
+            filters = {'genre': genre, 'difficulty': difficulty, 'investment_level': level}
+            with self.subTest(**filters):
+                facets = book_facet_service.get_facets(filters)
+                self.assertEqual(facets, self.expected(filters))
+                self.assertEqual([list(counts) for counts in facets.values()],
+                                 [list(counts) for counts in self.expected(filters).values()])  # Same order
+
+    def test_catalog_grouping_is_cached_until_a_book_changes(self):
+        with self.assertNumQueries(1):
+            book_facet_service.get_facets({})
+            book_facet_service.get_facets({'genre': 'Investment'})
+
+        book = Book.objects.filter(genre='Investment').first()
+        book.genre = 'Biography'
+        book.save()
+        with self.assertNumQueries(1):
+            facets = book_facet_service.get_facets({})
+        self.assertEqual(facets['genre']['Biography'], 1)
+
+        book.delete()
+        self.assertNotIn('Biography', book_facet_service.get_facets({})['genre'])
+
+    def test_cache_expires_after_ttl(self):
+        service = BookFacetService(ttl=60)
+        with mock.patch('core.facets.cache') as facet_cache:
+            facet_cache.get.return_value = None
+            service.get_facets({})
+        facet_cache.set.assert_called_once_with(FACETS_CACHE_KEY, mock.ANY, 60)
+
+    def test_searches_are_counted_and_not_cached(self):
+        queryset = Book.objects.filter(id__lte=Book.objects.order_by('id')[30].id)
+        with self.assertNumQueries(2):
+            facets = book_facet_service.get_facets({'genre': 'Investment'}, queryset)
+            book_facet_service.get_facets({'genre': 'Investment'}, queryset)
+        self.assertEqual(facets, self.expected({'genre': 'Investment'}, queryset))
+        self.assertIsNone(cache.get(FACETS_CACHE_KEY))
+
+
+class BookEmbeddingTests(TestCase):
+    def test_books_with_shared_topics_embed_closer(self):
+        books = [
+            SimpleNamespace(genre='Investment', sub_genre='Index Funds', financial_topics='["index funds", "etf"]',
+                            description='Buy the whole market cheaply.'),
+            SimpleNamespace(genre='Investment', sub_genre='Index Funds', financial_topics='index funds, retirement',
+                            description='Low cost index investing for the long run.'),
+            SimpleNamespace(genre='Psychology', sub_genre='Habits', financial_topics='',
+                            description='Why we keep our morning routines.'),
+        ]
+        vectors = HashingTfidfVectorizer().fit_transform(books)
+
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0)
+        self.assertGreater(vectors[0] @ vectors[1], 0.3)
+        self.assertGreater(vectors[0] @ vectors[1], vectors[0] @ vectors[2] + 0.3)
+        # Stored as float16; close enough for ranking
+        np.testing.assert_allclose(decode_vectors([encode_vector(v) for v in vectors]), vectors, atol=1e-3)
+
+    def test_features(self):
+        self.assertEqual(parse_topics('["Tax", "SIP"]'), ['Tax', 'SIP'])
+        self.assertEqual(parse_topics('Tax, SIP ,'), ['Tax', 'SIP'])
+        self.assertEqual(parse_topics(''), [])
+        self.assertEqual(hash_feature('genre=investment'), hash_feature('genre=investment'))  # crc32, not hash()
+        features = book_features(SimpleNamespace(genre='Investment', sub_genre='', financial_topics='["Tax"]',
+                                                 description='The tax the'))
+        self.assertEqual(features, {'genre=investment': 2.0, 'investment': 2.0, 'topic=tax': 2.0, 'tax': 3.0})
+
+    def test_exact_similarity(self):
+        matrix = np.eye(4, dtype=np.float32)
+        matrix[1] = [0.8, 0.6, 0, 0]
+        matrix[2] = [0.6, 0, 0.8, 0]
+        index = SimilarityIndex([10, 11, 12, 13], matrix, use_ann=False)
+
+        self.assertEqual(index.similar(10, k=2), [11, 12])
+        self.assertEqual(index.similar(10, k=10), [11, 12, 13])  # Never the book itself
+        self.assertEqual(index.similar(99), [])
+        self.assertNotIn(99, index)
+
+    def test_lsh_finds_near_duplicates(self):
+        rng = np.random.default_rng(3)
+        base = rng.standard_normal((2000, EMBEDDING_DIM)).astype(np.float32)
+        near = base[:50] + 0.1 * rng.standard_normal((50, EMBEDDING_DIM)).astype(np.float32)
+        matrix = np.vstack([base, near])
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        ids = np.arange(1, len(matrix) + 1)
+
+        ann = SimilarityIndex(ids, matrix, use_ann=True)
+        exact = SimilarityIndex(ids, matrix, use_ann=False)
+        self.assertIsNotNone(ann.lsh)
+        for i in range(50):
+            self.assertEqual(ann.similar(int(ids[i]), k=1), [int(ids[2000 + i])])
+            self.assertEqual(ann.similar(int(ids[i]), k=1), exact.similar(int(ids[i]), k=1))
+        # The shortlist is a small slice of the catalog
+        self.assertLess(len(ann.lsh.candidates(matrix[0])), len(matrix) // 4)
+
+    def test_lsh_falls_back_to_exact_scan_on_few_collisions(self):
+        matrix = np.eye(8, dtype=np.float32)
+        ann = SimilarityIndex(range(8), matrix, use_ann=True)
+        self.assertEqual(len(ann.similar(0, k=7)), 7)
+
+    def test_index_reloads_after_embedding(self):
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author='Author', genre=genre, description=description,
+                 financial_topics=topics)
+            for i, (genre, description, topics) in enumerate([
+                ('Investment', 'index funds for beginners', '["index funds"]'),
+                ('Investment', 'passive index funds explained', '["index funds"]'),
+                ('Psychology', 'habits and willpower', ''),
+            ])
+        )
+        bump_catalog_version()
+        first, second, third = Book.objects.order_by('id')
+        self.assertEqual(get_similarity_index().similar(first.id), [])
+
+        call_command('build_book_embeddings', stdout=io.StringIO())
+        self.assertEqual(get_similarity_index().similar(first.id, k=2), [second.id, third.id])
+
+        third.delete()
+        self.assertEqual(get_similarity_index().similar(first.id, k=2), [second.id])
+
+
+class ChatIntentTests(TestCase):
+    CASES = [
+        # (message, intent, params)
+        ('What are the income tax slabs this year?', 'tax_slab', {}),
+        ('Old vs new regime for me?', 'tax_slab', {}),
+        ('How much tax will I pay?', 'tax_slab', {}),
+        ('How should I split ₹1.5 lakh to save tax?', 'tax_allocation', {'budget': 150000.0}),
+        ('Where should I invest 50k for tax, low risk, lock-in under 3 years?', 'tax_allocation',
+         {'budget': 50000.0, 'max_risk': 'Low', 'max_lock_in_years': 3}),
+        # Allocation questions mention regimes too; the earlier intent wins
+        ('Split Rs 60,000 for tax under the old regime', 'tax_allocation', {'budget': 60000.0}),
+        ("What's my financial health score?", 'health_score', {}),
+        ('How far am I from my savings goal?', 'savings_progress', {}),
+        # Heads the profile-based slab answer does not model go to the LLM
+        ('Which regime is better if I have capital gains?', OPEN_INTENT, {}),
+        ('What are the tax slabs on a ₹20 lakh salary?', OPEN_INTENT, {}),
+        ('Does the new regime allow 80C deductions?', OPEN_INTENT, {}),
+        # Allocation wording without an amount or a tax angle
+        ('How should I split my portfolio across stocks?', OPEN_INTENT, {}),
+        ('How should I invest for tax saving?', OPEN_INTENT, {}),
+        ('Tell me a joke', OPEN_INTENT, {}),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='chatter', email='chatter@example.com')
+        UserProfile.objects.create(user=cls.user, income=1500000, savings_goal=500000, total_savings=100000,
+                                   monthly_savings=20000)
+        cls.admin = User.objects.create(username='ops', email='ops@example.com', is_staff=True)
+
+    def setUp(self):
+        chat_intent_router.reset_metrics()
+        self.addCleanup(chat_intent_router.reset_metrics)
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def test_classify(self):
+        for message, intent, params in self.CASES:
+            with self.subTest(message=message):
+                self.assertEqual(chat_intent_router.classify(message), (intent, params))
+
+    def test_metrics(self):
+        router = IntentRouter(CHAT_INTENTS)
+        for elapsed in [1.0, 2.0, 3.0, 4.0]:
+            router.record('tax_slab', elapsed)
+        router.record(OPEN_INTENT, 900.0)
+        metrics = router.metrics()
+
+        self.assertEqual((metrics['total'], metrics['local_rate']), (5, 0.8))
+        self.assertEqual(metrics['intents']['tax_slab'],
+                         {'hits': 4, 'hit_rate': 0.8, 'avg_ms': 2.5, 'p50_ms': 2.5, 'p95_ms': 3.85})
+        self.assertEqual(metrics['intents']['health_score'],
+                         {'hits': 0, 'hit_rate': 0.0, 'avg_ms': None, 'p50_ms': None, 'p95_ms': None})
+        router.reset_metrics()
+        self.assertEqual(router.metrics()['total'], 0)
+
+    def test_local_intents_skip_the_llm(self):
+        ai = mock.Mock()
+        with mock.patch('core.views.ai_service', ai):
+            slab = self.client.post('/api/chatbot/', {'message': 'Which regime should I pick?'}, format='json')
+            savings = self.client.post('/api/chatbot/', {'message': 'How is my savings progress?'}, format='json')
+            streamed = self.client.post('/api/chatbot/?stream=1', {'message': 'Show my health score'},
+                                        format='json')
+            events = b''.join(streamed.streaming_content).decode()
+        ai.generate_chat_response.assert_not_called()
+        ai.stream_chat_response.assert_not_called()
+
+        self.assertIn('regime saves you', slab.data['response'])
+        self.assertIn('of your ₹500,000 goal (**20%**)', savings.data['response'])
+        self.assertEqual(re.findall(r'^event: (\w+)$', events, re.MULTILINE), ['chunk', 'suggestions', 'done'])
+        self.assertIn('financial health score', events)
+        metrics = chat_intent_router.metrics()['intents']
+        self.assertEqual([metrics[name]['hits'] for name in ('tax_slab', 'savings_progress', 'health_score')],
+                         [1, 1, 1])
+
+    def test_open_questions_go_to_the_llm(self):
+        ai = mock.Mock()
+        ai.generate_chat_response.return_value = {'response': 'From the model', 'suggestions': [], 'confidence': 0.9}
+        with mock.patch('core.views.ai_service', ai), redirect_stdout(io.StringIO()):
+            response = self.client.post('/api/chatbot/', {'message': 'Tax on my capital gains?'}, format='json')
+
+        self.assertEqual(response.data['response'], 'From the model')
+        ai.generate_chat_response.assert_called_once()
+        self.assertEqual(chat_intent_router.metrics()['intents'][OPEN_INTENT]['hits'], 1)
+
+    def test_stats_are_admin_only(self):
+        chat_intent_router.record('tax_slab', 1.0)
+        self.assertEqual(self.client.get('/api/admin/chat-intents/').status_code, 403)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/admin/chat-intents/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['intents']['tax_slab']['hits'], 1)
+
+
+class SemanticAnswerCacheTests(SimpleTestCase):
+    PROFILE = {'income': 900000, 'age': 34, 'dependents': 1, 'investment_amount': 50000}
+    ANSWER = {'response': 'NPS is a pension scheme.', 'suggestions': [], 'confidence': 0.9}
+
+    def test_similar_questions_share_an_answer(self):
+        cache = SemanticAnswerCache(ttl=60)
+        self.assertTrue(cache.set('How does NPS work?', self.PROFILE, self.ANSWER))
+
+        self.assertEqual(cache.get('how does the NPS work', self.PROFILE), self.ANSWER)
+        self.assertIsNone(cache.get('How does PPF work?', self.PROFILE))
+        self.assertEqual(cache.stats(), {'entries': 1, 'hits': 1, 'misses': 1, 'hit_rate': 0.5,
+                                         'bypassed': 0, 'evictions': 0})
+        self.assertEqual(normalize_question("What's the NPS, please?"), ['s', 'nps'])
+        self.assertAlmostEqual(float(question_vector('How does NPS work?') @ question_vector('nps work')), 1.0,
+                               places=6)
+
+    def test_threshold(self):
+        question, reworded = 'Is ELSS better than PPF for retirement?', 'ELSS better than PPF for long term?'
+        similarity = float(question_vector(question) @ question_vector(reworded))
+        for threshold, hit in [(similarity - 0.01, True), (similarity + 0.01, False)]:
+            with self.subTest(threshold=threshold):
+                cache = SemanticAnswerCache(threshold=threshold)
+                cache.set(question, self.PROFILE, self.ANSWER)
+                self.assertEqual(cache.get(reworded, self.PROFILE) is not None, hit)
+
+    def test_answers_are_shared_only_within_a_band(self):
+        cases = [
+            # (profile change, same band)
+            ({'income': 700000}, True),           # Bounds are inclusive below: 700000 is in the next band
+            ({'income': 699999}, False),
+            ({'income': 1199999}, True),
+            ({'income': 1200000}, False),
+            ({'age': 25}, True),
+            ({'age': 24}, False),
+            ({'age': 35}, False),
+            ({'dependents': 2}, False),
+            ({'dependents': 0}, False),
+            ({'investment_amount': 900000}, True),  # Not banded
+        ]
+        for change, same_band in cases:
+            with self.subTest(**change):
+                cache = SemanticAnswerCache()
+                cache.set('How does NPS work?', {**self.PROFILE, 'income': 700000}, self.ANSWER)
+                profile = {**self.PROFILE, 'income': 700000, **change}
+                self.assertEqual(cache.get('How does NPS work?', profile) is not None, same_band)
+
+        self.assertEqual(profile_band({}), 'i0:a0:d0')
+        self.assertEqual(profile_band({'income': 6000000, 'age': 70, 'dependents': 5}), 'i5:a4:d3')
+
+    def test_personal_questions_and_answers_bypass_the_cache(self):
+        cache = SemanticAnswerCache()
+        self.assertFalse(cache.set('Is my income tax too high?', self.PROFILE, self.ANSWER))
+        self.assertFalse(cache.set('Should I invest 50000 in NPS?', self.PROFILE, self.ANSWER))
+        self.assertFalse(cache.set('How does NPS work?', self.PROFILE, self.ANSWER,
+                                   'With your ₹9,00,000 income, NPS saves ₹50,000.'))
+        self.assertFalse(cache.set('?!', self.PROFILE, self.ANSWER))
+
+        cache.set('How does NPS work?', self.PROFILE, self.ANSWER)
+        self.assertIsNone(cache.get('How does NPS work for my savings goal?', self.PROFILE))
+        self.assertEqual(cache.stats()['bypassed'], 1)
+
+    def test_expiry_and_lru_eviction(self):
+        cache = SemanticAnswerCache(ttl=60, max_entries=2)
+        with mock.patch('core.ai_cache.time.monotonic', return_value=1000.0):
+            cache.set('How does NPS work?', self.PROFILE, 'nps')
+            cache.set('How does PPF work?', self.PROFILE, 'ppf')
+            self.assertEqual(cache.get('How does NPS work?', self.PROFILE), 'nps')  # Now most recently used
+            cache.set('How does ELSS work?', self.PROFILE, 'elss')
+
+            self.assertIsNone(cache.get('How does PPF work?', self.PROFILE))
+            self.assertEqual(cache.stats()['evictions'], 1)
+        with mock.patch('core.ai_cache.time.monotonic', return_value=1061.0):
+            self.assertIsNone(cache.get('How does NPS work?', self.PROFILE))
+        self.assertEqual(cache.stats()['entries'], 1)
+
+    def test_returns_copies(self):
+        cache = SemanticAnswerCache()
+        cache.set('How does NPS work?', self.PROFILE, self.ANSWER)
+        cache.get('How does NPS work?', self.PROFILE)['suggestions'].append('changed')
+        self.assertEqual(cache.get('How does NPS work?', self.PROFILE), self.ANSWER)
+
+    def test_service_answers_similar_questions_once(self):
+        model = mock.Mock()
+        model.generate_content.side_effect = lambda prompt, stream=False, **kwargs: (
+            [SimpleNamespace(text='Index funds track '), SimpleNamespace(text='the market.')] if stream
+            else SimpleNamespace(text='Index funds track the market.')
+        )
+        service = GeminiAIService(chat_cache=SemanticAnswerCache(), model=model)
+
+        first = service.generate_chat_response('What are index funds?', self.PROFILE)
+        self.assertEqual(service.generate_chat_response('what are index funds', dict(self.PROFILE)), first)
+        events = list(service.stream_chat_response('What are index funds?', self.PROFILE))
+        self.assertEqual(model.generate_content.call_count, 1)
+        self.assertEqual(events[0], ('chunk', 'Index funds track the market.'))
+
+        # Streamed answers are cached too, for their own band
+        older = {**self.PROFILE, 'age': 61}
+        list(service.stream_chat_response('What are index funds?', older))
+        service.generate_chat_response('What are index funds?', older)
+        self.assertEqual(model.generate_content.call_count, 2)
+
+
+class AIBackendTests(SimpleTestCase):
+    def test_importing_the_views_builds_nothing(self):
+        env = {key: value for key, value in os.environ.items() if key != 'GEMINI_API_KEY'}
+        script = (
+            "import sys, django; django.setup(); import core.views, core.async_views; "
+            "from core.ai_service import ai_service; "
+            "print(ai_service.initialized, any(m.startswith('google.generativeai') for m in sys.modules))"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', script], capture_output=True, text=True, timeout=60,
+            env={**env, 'DJANGO_SETTINGS_MODULE': 'finwise_backend.settings', 'AI_BACKEND': 'gemini'},
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+        self.assertEqual(result.stdout.split()[-2:], ['False', 'False'], result.stderr)
+
+    def test_lazy_service_is_built_once(self):
+        built = []
+
+        def factory():
+            time.sleep(0.05)
+            built.append(SimpleNamespace(model='stub'))
+            return built[-1]
+
+        service = LazyAIService(factory)
+        self.assertFalse(service.initialized)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            models = list(pool.map(lambda _: service.model, range(16)))
+
+        self.assertEqual((len(built), models), (1, ['stub'] * 16))
+        self.assertTrue(service.initialized)
+        service.model = 'replaced'  # Assignments reach the real service
+        self.assertEqual((built[0].model, service.warm()), ('replaced', built[0]))
+
+    def test_registry(self):
+        self.assertTrue({'gemini', 'stub', 'record', 'replay'} <= set(available_backends()))
+        self.assertIsInstance(create_model('stub'), StubModel)
+        with self.assertRaisesMessage(ValueError, 'Unknown AI_BACKEND: gpt (available: gemini, '):
+            create_model('gpt')
+        with mock.patch.dict(os.environ, {'GEMINI_API_KEY': ''}):
+            with self.assertRaisesMessage(ValueError, 'GEMINI_API_KEY'):
+                create_model('gemini')
+
+        with override_settings(AI_BACKEND='stub'):
+            self.assertIsInstance(GeminiAIService().model, StubModel)
+
+    def test_stub_model_is_deterministic(self):
+        model = StubModel()
+        text = model.generate_content('prompt one').text
+        self.assertEqual(model.generate_content('prompt one').text, text)
+        self.assertNotEqual(model.generate_content('prompt two').text, text)
+        # Up to three distinct canned sentences
+        sentences = [sentence for sentence in STUB_SENTENCES if sentence in text]
+        self.assertTrue(1 <= len(sentences) <= 3)
+        self.assertEqual(len(text), len(' '.join(sentences)))
+
+        streamed = ''.join(chunk.text for chunk in model.generate_content('prompt one', stream=True))
+        self.assertEqual(streamed, text)
+
+        async def stream_async():
+            response = await model.generate_content_async('prompt one', stream=True)
+            return ''.join([chunk.text async for chunk in response])
+        self.assertEqual(async_to_sync(stream_async)(), text)
+
+        benefits = 'Rephrase these as a JSON array: [{"name": "PMJDY"}]'
+        self.assertEqual(json.loads(model.generate_content(benefits).text), [{'name': 'PMJDY'}])
+
+    def test_service_runs_offline_on_the_stub(self):
+        service = GeminiAIService(model=StubModel())
+        profile = {'income': 900000, 'age': 34}
+        answer = service.generate_chat_response('How should I start investing?', profile)
+        self.assertTrue(any(answer['response'].startswith(sentence) for sentence in STUB_SENTENCES))
+        self.assertEqual(answer['confidence'], 0.9)
+        events = list(service.stream_chat_response('How should I start investing?', profile))
+        self.assertEqual([event for event, _ in events][-2:], ['suggestions', 'done'])
+        self.assertEqual(''.join(data for event, data in events if event == 'chunk'), answer['response'])
+
+
+class StreamingResponseCleanerTests(SimpleTestCase):
+    TEXTS = [
+        'Start with an emergency fund. Then invest in ELSS! Why? Because of 80C. And th',
+        '  \n\nFirst point.\n\nSecond point.\n\n\nThird point.',
+        'Use ₹1.5 lakh under Section 80C. Done.',
+        'No sentence terminator at all',
+        'Ends cleanly.',
+    ]
+
+    def clean(self, chunks):
+        cleaner = StreamingResponseCleaner()
+        parts = [cleaner.feed(chunk) for chunk in chunks]
+        return ''.join(parts + [cleaner.finish()]), parts
+
+    def test_output_does_not_depend_on_chunking(self):
+        rng = random.Random(5)
+        for text in self.TEXTS:
+            whole, _ = self.clean([text])
+            for _ in range(50):
+                cuts = sorted(rng.sample(range(1, len(text)), rng.randint(1, min(10, len(text) - 1))))
+                chunks = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+                with self.subTest(text=text, chunks=chunks):
+                    self.assertEqual(self.clean(chunks)[0], whole)
+
+    def test_matches_the_non_streaming_cleanup(self):
+        service = GeminiAIService(model=StubModel())
+        for text in self.TEXTS[1:]:
+            with self.subTest(text=text):
+                self.assertEqual(self.clean(list(text))[0], service._clean_response(text))
+        self.assertEqual(self.clean([self.TEXTS[0]])[0],
+                         'Start with an emergency fund. Then invest in ELSS! Why? Because of 80C.')
+
+    def test_holds_text_until_a_sentence_ends(self):
+        cleaner = StreamingResponseCleaner()
+        self.assertEqual(cleaner.feed('  Save fir'), '')
+        self.assertFalse(cleaner.started)
+        self.assertEqual(cleaner.feed('st. Then inv'), 'Save first.')
+        self.assertTrue(cleaner.started)
+        self.assertEqual(cleaner.feed('est'), '')
+        self.assertEqual(cleaner.finish(), '')  # Unfinished sentence dropped
+
+    def test_empty_streams_get_the_apology(self):
+        self.assertEqual(self.clean([])[0], EMPTY_RESPONSE)
+        self.assertEqual(self.clean([' ', '\n\n'])[0], EMPTY_RESPONSE)
+
+
+class AIRecordingTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'recordings.sqlite3')
+
+    def live_model(self, text='Index funds are cheap. They track the market.'):
+        model = mock.Mock()
+        model.generate_content.side_effect = lambda prompt, stream=False, **kwargs: (
+            iter([SimpleNamespace(text=text[:10]), SimpleNamespace(text=text[10:25]), SimpleNamespace(text=text[25:])])
+            if stream else SimpleNamespace(text=text)
+        )
+        return model
+
+    def test_recordings_replay_after_reopening(self):
+        recorder = RecordingModel(self.live_model(), RecordingStore(self.path))
+        with mock.patch('core.ai_recordings.time.monotonic', side_effect=[10.0, 10.5]):
+            self.assertEqual(recorder.generate_content('plain').text, 'Index funds are cheap. They track the market.')
+        with mock.patch('core.ai_recordings.time.monotonic', side_effect=[20.0, 22.0]):
+            stream = recorder.generate_content('streamed', stream=True)
+            next(stream)
+            self.assertIsNone(recorder.store.get('streamed'))  # Recorded only once read to the end
+            list(stream)
+
+        store = RecordingStore(self.path)
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.get('plain'), ('Index funds are cheap. They track the market.', 0.5, 1))
+        self.assertEqual(store.get('streamed'), ('Index funds are cheap. They track the market.', 2.0, 3))
+
+        replay = ReplayModel(store)
+        with mock.patch('core.ai_recordings.time.sleep') as sleep:
+            self.assertEqual(replay.generate_content('plain').text, 'Index funds are cheap. They track the market.')
+            chunks = [chunk.text for chunk in replay.generate_content('streamed', stream=True)]
+        self.assertEqual(''.join(chunks), 'Index funds are cheap. They track the market.')
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual([c.args[0] for c in sleep.call_args_list], [0.5, 2.0 / 3, 2.0 / 3, 2.0 / 3])
+        self.assertEqual((replay.stats()['hits'], replay.stats()['misses']), (2, 0))
+
+    def test_latency_modes(self):
+        store = RecordingStore(self.path)
+        for i, latency in enumerate([0.5, 1.0, 2.0, 4.0]):
+            store.add(f'prompt {i}', 'answer.', latency)
+        median, sigma = store.latency_fit()
+        self.assertAlmostEqual(median, math.sqrt(2), places=6)
+
+        cases = [('recorded', 3.0, 'prompt 2', 6.0), ('none', 1.0, 'prompt 2', 0.0)]
+        for mode, scale, prompt, expected in cases:
+            with self.subTest(mode=mode), mock.patch('core.ai_recordings.time.sleep') as sleep:
+                ReplayModel(store, latency=mode, scale=scale).generate_content(prompt)
+                self.assertAlmostEqual(sleep.call_args.args[0], expected)
+
+        # Synthetic delays repeat per prompt and follow the fitted distribution
+        synthetic = ReplayModel(store, latency='synthetic')
+        delays = [synthetic._lookup(f'new prompt {i}')[1] for i in range(2000)]
+        self.assertEqual(delays[:5], [synthetic._lookup(f'new prompt {i}')[1] for i in range(5)])
+        self.assertAlmostEqual(float(np.median(delays)), median, delta=median * 0.1)
+        with self.assertRaisesMessage(ValueError, 'latency must be one of'):
+            ReplayModel(store, latency='fast')
+
+    def test_misses_and_deadlines(self):
+        store = RecordingStore(self.path)
+        store.add('slow', 'answer.', 5.0)
+
+        replay = ReplayModel(store, latency='none')
+        self.assertEqual(replay.generate_content('never recorded').text, StubModel().answer('never recorded'))
+        with self.assertRaises(LookupError):
+            ReplayModel(store, on_miss='error').generate_content('never recorded')
+
+        with mock.patch('core.ai_recordings.time.sleep') as sleep, self.assertRaises(TimeoutError):
+            ReplayModel(store).generate_content('slow', request_options={'timeout': 1.0})
+        sleep.assert_called_once_with(1.0)
+
+    def test_async_replay(self):
+        store = RecordingStore(self.path)
+        store.add('prompt', 'One. Two. Six.', 0.0, 3)
+        replay = ReplayModel(store)
+
+        async def run():
+            text = (await replay.generate_content_async('prompt')).text
+            stream = await replay.generate_content_async('prompt', stream=True)
+            return text, [chunk.text async for chunk in stream]
+        self.assertEqual(async_to_sync(run)(), ('One. Two. Six.', ['One. ', 'Two. ', 'Six.']))
+
+    def test_replay_backend_from_settings(self):
+        RecordingStore(self.path).add('prompt', 'Recorded answer.', 0.0)
+        with override_settings(AI_RECORDINGS_PATH=self.path, AI_REPLAY_LATENCY='none', AI_REPLAY_ON_MISS='error'):
+            model = create_model('replay')
+        self.assertEqual((model.latency, model.on_miss), ('none', 'error'))
+        self.assertEqual(model.generate_content('prompt').text, 'Recorded answer.')
+
+
+class DashboardSummaryTests(TestCase):
+    PROFILE = {'income': 1200000, 'dependents': 2, 'total_savings': 150000, 'monthly_savings': 30000,
+               'savings_goal': 600000, 'investment_amount': 200000, 'emergency_fund': 50000,
+               'retirement_savings': 300000}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='planner', email='planner@example.com')
+
+    def setUp(self):
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.force_authenticate(self.user)
+
+    def summary(self):
+        return DashboardSummary.objects.get(user=self.user)
+
+    def test_profile_saves_refresh_the_summary(self):
+        profile = UserProfile.objects.create(user=self.user, **self.PROFILE)
+        summary = self.summary()
+        self.assertEqual(
+            (summary.total_savings, summary.monthly_savings, summary.savings_goal, summary.progress_percentage),
+            (150000, 30000, 600000, 25.0)
+        )
+        self.assertEqual(summary.recommendations, ', '.join(generate_tax_tips(profile)))
+        self.assertIn('Claim deductions for dependent care under 80D.', summary.recommendations)
+
+        profile.total_savings = 900000  # Progress is capped at 100%
+        profile.save()
+        self.assertEqual(self.summary().progress_percentage, 100)
+
+        with redirect_stdout(io.StringIO()):
+            self.client.put('/api/profile/', {'savings_goal': 0, 'dependents': 0}, format='json')
+        summary = self.summary()
+        self.assertEqual((summary.savings_goal, summary.progress_percentage), (0, 0))
+        self.assertNotIn('80D', summary.recommendations)
+        self.assertEqual(DashboardSummary.objects.filter(user=self.user).count(), 1)
+
+    def test_reads_never_write(self):
+        UserProfile.objects.create(user=self.user, **self.PROFILE)
+        DashboardSummary.objects.filter(user=self.user).update(progress_percentage=42.0)
+
+        with self.assertNumQueries(2):  # The ETag fingerprint and the summary row
+            data = self.client.get('/api/dashboard/').data
+        self.assertEqual(data['progress_percentage'], 42.0)  # The stored row, not a recomputation
+        self.assertEqual(data['recommendations'], self.summary().recommendations)
+
+    def test_first_read_builds_a_missing_summary(self):
+        response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['total_savings'], response.data['progress_percentage']), (0, 0))
+        self.assertTrue(UserProfile.objects.filter(user=self.user).exists())
+
+        # Users from before summaries existed: a profile but no row
+        DashboardSummary.objects.filter(user=self.user).delete()
+        UserProfile.objects.filter(user=self.user).update(total_savings=300000, savings_goal=600000)
+        self.assertEqual(self.client.get('/api/dashboard/').data['progress_percentage'], 50.0)
+        self.assertEqual(self.summary().progress_percentage, 50.0)
+
+    def test_fixture_loads_skip_the_refresh(self):
+        profile = UserProfile(user=self.user, **self.PROFILE)
+        with mock.patch('core.signals.refresh_dashboard_summary') as refresh:
+            post_save.send(UserProfile, instance=profile, created=True, raw=True)
+            refresh.assert_not_called()
+            post_save.send(UserProfile, instance=profile, created=True, raw=False)
+            refresh.assert_called_once_with(profile)
+
+
+class ReadingStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Book.objects.bulk_create(
+            Book(title=f'Book {i}', author=f'Author {i}', genre='Investment', description='') for i in range(12)
+        )
+        cls.books = list(Book.objects.order_by('id'))
+        cls.user = User.objects.create(username='reader', email='reader@example.com')
+
+    def stored(self):
+        stats = UserReadingStats.objects.get(user=self.user)
+        return {field: getattr(stats, field) for field in aggregate_reading_stats(self.user.id)}
+
+    def assertStatsMatchHistory(self):
+        stored = self.stored()
+        expected = aggregate_reading_stats(self.user.id)
+        self.assertAlmostEqual(stored.pop('rating_total'), expected.pop('rating_total'))
+        self.assertEqual(stored, expected)
+
+    def test_status_change_and_rating_clear_apply_deltas(self):
+        first = UserReadingHistory.objects.create(user=self.user, book=self.books[0], status='completed',
+                                                  user_rating=4.5)
+        UserReadingHistory.objects.create(user=self.user, book=self.books[1], status='want_to_read')
+        self.assertStatsMatchHistory()
+
+        # Loaded fresh, as the views do, so the snapshot comes from post_init
+        history = UserReadingHistory.objects.get(pk=first.pk)
+        with mock.patch('core.reading_stats.rebuild_reading_stats', wraps=rebuild_reading_stats) as rebuild, \
+                self.assertNumQueries(2):  # The history row, then one F() update of the stats row
+            history.status = 'currently_reading'
+            history.user_rating = None
+            history.save(update_fields=['status', 'user_rating'])
+        rebuild.assert_not_called()
+
+        self.assertStatsMatchHistory()
+        self.assertEqual(self.stored(), {'total_books': 2, 'rated_books': 0, 'rating_total': 0.0,
+                                         'completed_books': 0, 'currently_reading': 1, 'want_to_read': 1})
+
+    def test_random_edits_match_a_full_aggregate(self):
+        rng = random.Random(24)
+        statuses = ['want_to_read', 'currently_reading', 'completed', 'abandoned']
+        ratings = [None, None, 1.0, 3.5, 4.0, 5.0]
+        with mock.patch('core.reading_stats.rebuild_reading_stats', wraps=rebuild_reading_stats) as rebuild:
+            for step in range(150):
+                book = rng.choice(self.books)
+                history = UserReadingHistory.objects.filter(user=self.user, book=book).first()
+                if history is None:
+                    UserReadingHistory.objects.create(user=self.user, book=book, status=rng.choice(statuses),
+                                                      user_rating=rng.choice(ratings))
+                else:
+                    history.status = rng.choice(statuses)
+                    history.user_rating = rng.choice(ratings)
+                    history.save()
+                    history.save()  # Saving again changes nothing
+                with self.subTest(step=step):
+                    self.assertStatsMatchHistory()
+        self.assertEqual(rebuild.call_count, 1)  # Only the first write, which creates the row
+
+    def test_unknown_previous_values_drop_the_row(self):
+        UserReadingHistory.objects.create(user=self.user, book=self.books[0], status='completed', user_rating=4.0)
+        history = UserReadingHistory.objects.only('id', 'user_id', 'status').get(user=self.user)
+        history.status = 'abandoned'
+        history.save(update_fields=['status'])
+        self.assertFalse(UserReadingStats.objects.filter(user=self.user).exists())
+
+        # Rebuilt from the history on the next read
+        self.assertEqual(get_reading_statistics(self.user)['completed_books'], 0)
+        self.assertStatsMatchHistory()
+
+    def test_deletes_and_bulk_writes(self):
+        histories = [UserReadingHistory.objects.create(user=self.user, book=book, status='completed', user_rating=3.0)
+                     for book in self.books[:3]]
+        histories[0].delete()
+        self.assertFalse(UserReadingStats.objects.filter(user=self.user).exists())
+
+        UserReadingHistory.objects.create(user=self.user, book=self.books[5], status='want_to_read')
+        self.assertStatsMatchHistory()
+
+        UserReadingHistory.objects.filter(user=self.user).update(status='completed')  # Skips signals
+        rebuild_reading_stats(self.user.id)
+        self.assertStatsMatchHistory()
+
+    def test_statistics(self):
+        for book, status, rating in [(self.books[0], 'completed', 4.0), (self.books[1], 'completed', 5.0),
+                                     (self.books[2], 'currently_reading', None), (self.books[3], 'abandoned', 2.0)]:
+            UserReadingHistory.objects.create(user=self.user, book=book, status=status, user_rating=rating)
+        with self.assertNumQueries(1):
+            statistics = get_reading_statistics(self.user)
+        self.assertEqual(statistics, {'total_books': 4, 'completed_books': 2, 'currently_reading': 1,
+                                      'want_to_read': 0, 'average_rating': 3.7, 'completion_rate': 50.0})
@@ -1,12 +1,21 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     CustomTokenObtainPairView, ProfileView, DashboardView, TaxSavingsView, 
-    ChatbotView, BenefitsView, ReportsView, UserRegistrationView, 
+    TaxOptimizerView, ChatbotView, BenefitsView, BenefitEligibilityStatsView, ChatIntentStatsView, ReportsView,
+    UserRegistrationView, 
     UserDetailView, ChangePasswordView, WisdomLibraryView, BookListView,
-    BookDetailView, UserReadingHistoryView, UserPreferencesView
+    BookSearchView, BookDetailView, UserReadingHistoryView, UserPreferencesView
 )
 
+if settings.ASYNC_AI_VIEWS:
+    # Non-blocking versions of the LLM-backed views (run under ASGI)
+    from .async_views import (
+        AsyncChatbotView as ChatbotView, AsyncTaxSavingsView as TaxSavingsView,
+        AsyncBenefitsView as BenefitsView
+    )
+
 urlpatterns = [
     # Authentication endpoints
     path('register/', UserRegistrationView.as_view(), name='user_register'),
@@ -19,13 +28,19 @@ urlpatterns = [
     path('profile/', ProfileView.as_view(), name='profile'),
     path('dashboard/', DashboardView.as_view(), name='dashboard'),
     path('tax-savings/', TaxSavingsView.as_view(), name='tax_savings'),
+    path('tax-savings/optimize/', TaxOptimizerView.as_view(), name='tax_optimizer'),
     path('chatbot/', ChatbotView.as_view(), name='chatbot'),
     path('benefits/', BenefitsView.as_view(), name='benefits'),
     path('reports/', ReportsView.as_view(), name='reports'),
     
+    # Admin endpoints
+    path('admin/benefits-eligibility/', BenefitEligibilityStatsView.as_view(), name='benefit_eligibility_stats'),
+    path('admin/chat-intents/', ChatIntentStatsView.as_view(), name='chat_intent_stats'),
+    
     # Financial Wisdom Library endpoints
     path('wisdom-library/', WisdomLibraryView.as_view(), name='wisdom_library'),
     path('books/', BookListView.as_view(), name='book_list'),
+    path('books/search/', BookSearchView.as_view(), name='book_search'),
     path('books/<int:book_id>/', BookDetailView.as_view(), name='book_detail'),
     path('reading-history/', UserReadingHistoryView.as_view(), name='reading_history'),
     path('reading-preferences/', UserPreferencesView.as_view(), name='reading_preferences'),
@@ -1,9 +1,12 @@
 import os
 import json
 import random
+import time
 from datetime import datetime, timedelta
-from django.db.models import Q, Avg, Count
-from django.http import JsonResponse
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, Count
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -20,80 +23,147 @@ from .serializers import (
     UserRegistrationSerializer
 )
 from .ai_service import ai_service
+from .conditional import conditional_on_user_data, mark_degraded
+from .dashboard import calculate_savings_progress, refresh_dashboard_summary
+from .eligibility import eligibility_engine
+from .embeddings import get_similarity_index
+from .facets import book_facet_service
+from .intents import OPEN_INTENT, chat_intent_router
+from .pagination import InvalidCursor, book_paginator, reading_history_paginator, search_paginator
+from .reading_stats import get_reading_statistics
+from .search import book_search_index
+from .tax import profile_tax_inputs, tax_engine
+from .tax_optimizer import RISK_LEVELS, tax_optimizer
+from .recommendations import (
+    get_stored_recommendations, rank_current_recommendations, refresh_recommendations_later, refresher
+)
 
-def generate_tax_tips(profile):
-    tips = []
-    
-    # Income-based tips
-    if profile.income > 1000000:
-        tips.append("Invest in ELSS for tax deduction under 80C.")
-        tips.append("Consider NPS for additional tax benefits.")
-    
-    if profile.income > 500000:
-        tips.append("Maximize 80C deductions with PPF and ELSS.")
-    
-    # Dependent-based tips
-    if profile.dependents >= 2:
-        tips.append("Claim deductions for dependent care under 80D.")
-        tips.append("Consider health insurance for family tax benefits.")
-    
-    # Investment-based tips
-    if profile.investment_amount < profile.income * 0.1:
-        tips.append("Increase investment allocation to 10% of income.")
+def calculate_financial_health_score(profile):
+    """Calculate financial health score (0-100)"""
+    score = 0
     
-    # Savings-based tips
-    if profile.monthly_savings < profile.income * 0.2:
-        tips.append("Aim to save at least 20% of your monthly income.")
-    
-    # Emergency fund tips
-    if profile.emergency_fund < profile.income * 0.06:
-        tips.append("Build emergency fund equivalent to 6 months of income.")
-    
-    # Retirement planning
-    if profile.retirement_savings < profile.income * 0.15:
-        tips.append("Allocate 15% of income for retirement planning.")
-    
-    return tips
-
-def calculate_savings_progress(profile):
-    """Calculate savings progress and goals"""
-    if profile.savings_goal > 0:
-        progress = (profile.total_savings / profile.savings_goal) * 100
+    # Emergency fund (25 points)
+    if profile.emergency_fund >= profile.income * 0.06:
+        score += 25
+    elif profile.emergency_fund >= profile.income * 0.03:
+        score += 15
     else:
-        progress = 0
-    
+        score += 5
+        
+    # Savings rate (25 points)
+    savings_rate = (profile.monthly_savings / profile.income) * 100 if profile.income > 0 else 0
+    if savings_rate >= 20:
+        score += 25
+    elif savings_rate >= 10:
+        score += 15
+    else:
+        score += 5
+        
+    # Investment allocation (25 points)
+    if profile.investment_amount >= profile.income * 0.1:
+        score += 25
+    elif profile.investment_amount >= profile.income * 0.05:
+        score += 15
+    else:
+        score += 5
+        
+    # Retirement planning (25 points)
+    if profile.retirement_savings >= profile.income * 0.15:
+        score += 25
+    elif profile.retirement_savings >= profile.income * 0.1:
+        score += 15
+    else:
+        score += 5
+        
+    return score
+
+def build_tax_profile_dict(profile):
+    """Profile fields used for tax recommendations (also the AI cache key)"""
     return {
-        'total_savings': profile.total_savings,
+        'income': profile.income,
+        'age': profile.age,
+        'dependents': profile.dependents,
+        'tax_deductions': profile.tax_deductions,
+        'investment_amount': profile.investment_amount,
+        'investment_types': profile.investment_types,
         'monthly_savings': profile.monthly_savings,
+        'total_savings': profile.total_savings,
         'savings_goal': profile.savings_goal,
-        'progress_percentage': min(progress, 100)
+        'emergency_fund': profile.emergency_fund,
+        'retirement_savings': profile.retirement_savings,
+        'occupation': profile.occupation,
+        'city': profile.city,
+        'state': profile.state,
+        'marital_status': profile.marital_status,
+        'education': profile.education,
+        'business_type': profile.business_type,
+        'property_owned': profile.property_owned,
+        'vehicle_owned': profile.vehicle_owned
+    }
+
+def build_benefits_profile_dict(profile):
+    """Profile fields used for benefits recommendations (also the AI cache key)"""
+    return {
+        'income': profile.income,
+        'age': profile.age,
+        'dependents': profile.dependents,
+        'occupation': profile.occupation,
+        'investment_amount': profile.investment_amount,
+        'emergency_fund': profile.emergency_fund,
+        'retirement_savings': profile.retirement_savings,
+        'tax_deductions': profile.tax_deductions,
+        'city': profile.city,
+        'state': profile.state,
+        'marital_status': profile.marital_status,
+        'education': profile.education,
+        'business_type': profile.business_type
+    }
+
+def build_chat_profile_dict(profile):
+    """Profile fields given to the chatbot as context"""
+    return {
+        'income': profile.income,
+        'age': profile.age,
+        'investment_amount': profile.investment_amount,
+        'dependents': profile.dependents,
+        'occupation': profile.occupation,
+        'city': profile.city,
+        'state': profile.state,
+        'emergency_fund': profile.emergency_fund,
+        'retirement_savings': profile.retirement_savings,
+        'tax_deductions': profile.tax_deductions
     }
 
+def reading_history_queryset(user):
+    """The user's reading history with each row's book in the same query, limited to the serialized columns"""
+    return UserReadingHistory.objects.filter(user=user).select_related('book').only(
+        *[field.name for field in UserReadingHistory._meta.concrete_fields],
+        *BookListSerializer.related_fields('book')
+    )
+
+def sse_event(event, data):
+    """Format one server-sent event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def timed_events(events, intent, started):
+    """Pass SSE events through, recording the intent's latency once the stream ends"""
+    try:
+        yield from events
+    finally:
+        chat_intent_router.record(intent, (time.perf_counter() - started) * 1000)
+
+def sse_response(events):
+    """Wrap an iterator of SSE strings in an unbuffered event-stream response"""
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
 def get_gemini_tax_recommendations(profile):
     """Get AI-powered tax recommendations using Gemini"""
     try:
         # Convert profile to dictionary for AI service
-        profile_dict = {
-            'income': profile.income,
-            'age': profile.age,
-            'dependents': profile.dependents,
-            'tax_deductions': profile.tax_deductions,
-            'investment_amount': profile.investment_amount,
-            'investment_types': profile.investment_types,
-            'monthly_savings': profile.monthly_savings,
-            'total_savings': profile.total_savings,
-            'savings_goal': profile.savings_goal,
-            'emergency_fund': profile.emergency_fund,
-            'retirement_savings': profile.retirement_savings,
-            'occupation': profile.occupation,
-            'city': profile.city,
-            'state': profile.state,
-            'marital_status': profile.marital_status,
-            'education': profile.education,
-            'business_type': profile.business_type,
-            'property_owned': profile.property_owned,
-            'vehicle_owned': profile.vehicle_owned
-        }
+        profile_dict = build_tax_profile_dict(profile)
         
         # Use Gemini AI service
         response = ai_service.generate_tax_recommendations(profile_dict)
@@ -102,14 +172,24 @@ def get_gemini_tax_recommendations(profile):
         
     except Exception as e:
         print(f"Gemini Tax API error: {e}")
+        mark_degraded()
         return generate_enhanced_tax_tips(profile)
 
+def tax_saving(profile, section, amount, **inputs):
+    """Tax saved by investing `amount` more under a section, at the profile's cheaper regime"""
+    inputs = {**profile_tax_inputs(profile), **inputs}
+    return round(float(tax_engine.deduction_savings(section, max(amount, 0), **inputs)), 2)
+
+def current_tax_saved(profile):
+    """Tax the profile's existing 80C/80D deductions save"""
+    return round(float(tax_engine.claimed_savings(**profile_tax_inputs(profile))), 2)
+
 def generate_enhanced_tax_tips(profile):
     """Generate enhanced tax tips based on profile data"""
     recommendations = []
     
     # Calculate potential savings
-    current_tax_saved = profile.tax_deductions * 0.3  # Assuming 30% tax rate
+    current_saved = current_tax_saved(profile)
     total_potential_savings = 0
     
     # Check if profile is complete (has meaningful data)
@@ -161,11 +241,12 @@ def generate_enhanced_tax_tips(profile):
     if profile.income > 1000000:  # High income
         # ELSS for high earners
         elss_potential = min(150000 - profile.investment_amount, 50000)
+        elss_saving = tax_saving(profile, '80C', elss_potential)
         if elss_potential > 0:
             recommendations.append({
                 "title": "Maximize ELSS Investment",
                 "description": f"Invest ₹{elss_potential:,.0f} more in ELSS funds to reach the maximum limit.",
-                "potential_saving": elss_potential * 0.3,
+                "potential_saving": elss_saving,
                 "priority": "high",
                 "category": "80C",
                 "action": "Invest Now",
@@ -173,14 +254,14 @@ def generate_enhanced_tax_tips(profile):
                 "returns": "12-15%",
                 "lock_in": "3 years"
             })
-            total_potential_savings += elss_potential * 0.3
+            total_potential_savings += elss_saving
         
         # NPS for high earners
-        nps_potential = 50000
+        nps_saving = tax_saving(profile, '80CCD(1B)', 50000)
         recommendations.append({
             "title": "NPS Investment",
             "description": "Invest in NPS under Section 80CCD(1B) for additional ₹50,000 deduction.",
-            "potential_saving": nps_potential * 0.3,
+            "potential_saving": nps_saving,
             "priority": "medium",
             "category": "NPS",
             "action": "Learn More",
@@ -188,16 +269,17 @@ def generate_enhanced_tax_tips(profile):
             "returns": "8-10%",
             "lock_in": "Till 60"
         })
-        total_potential_savings += nps_potential * 0.3
+        total_potential_savings += nps_saving
         
     elif profile.income > 500000:  # Medium income
         # PPF for medium earners
         ppf_potential = min(150000 - profile.total_savings, 50000)
+        ppf_saving = tax_saving(profile, '80C', ppf_potential)
         if ppf_potential > 0:
             recommendations.append({
                 "title": "Start PPF Investment",
                 "description": f"Invest ₹{ppf_potential:,.0f} in PPF for tax-free returns and deductions.",
-                "potential_saving": ppf_potential * 0.3,
+                "potential_saving": ppf_saving,
                 "priority": "high",
                 "category": "80C",
                 "action": "Open PPF Account",
@@ -205,16 +287,17 @@ def generate_enhanced_tax_tips(profile):
                 "returns": "7-8%",
                 "lock_in": "15 years"
             })
-            total_potential_savings += ppf_potential * 0.3
+            total_potential_savings += ppf_saving
     
     else:  # Lower income
         # Basic savings for lower income
         basic_savings = min(50000, profile.income * 0.1)
+        basic_saving = tax_saving(profile, '80C', basic_savings)
         if basic_savings > 0:
             recommendations.append({
                 "title": "Start Basic Savings",
                 "description": f"Start with ₹{basic_savings:,.0f} in basic savings instruments.",
-                "potential_saving": basic_savings * 0.1,  # Lower tax rate for lower income
+                "potential_saving": basic_saving,
                 "priority": "medium",
                 "category": "Basic Savings",
                 "action": "Start Saving",
@@ -222,7 +305,7 @@ def generate_enhanced_tax_tips(profile):
                 "returns": "4-6%",
                 "lock_in": "Flexible"
             })
-            total_potential_savings += basic_savings * 0.1
+            total_potential_savings += basic_saving
     
     # Age-based recommendations
     if profile.age < 30:
@@ -254,11 +337,11 @@ def generate_enhanced_tax_tips(profile):
     
     # Dependent-based recommendations
     if profile.dependents >= 2:
-        health_insurance_potential = 25000
+        health_insurance_saving = tax_saving(profile, '80D_self', 25000)
         recommendations.append({
             "title": "Health Insurance for Family",
             "description": "Take health insurance for your family to claim deduction up to ₹25,000.",
-            "potential_saving": health_insurance_potential * 0.3,
+            "potential_saving": health_insurance_saving,
             "priority": "high",
             "category": "80D",
             "action": "Get Quote",
@@ -266,13 +349,13 @@ def generate_enhanced_tax_tips(profile):
             "returns": "Tax Benefit",
             "lock_in": "1 year"
         })
-        total_potential_savings += health_insurance_potential * 0.3
+        total_potential_savings += health_insurance_saving
     elif profile.dependents == 1:
-        health_insurance_potential = 15000
+        health_insurance_saving = tax_saving(profile, '80D_self', 15000)
         recommendations.append({
             "title": "Individual Health Insurance",
             "description": "Consider health insurance for yourself to claim deduction up to ₹15,000.",
-            "potential_saving": health_insurance_potential * 0.3,
+            "potential_saving": health_insurance_saving,
             "priority": "medium",
             "category": "80D",
             "action": "Get Quote",
@@ -280,7 +363,7 @@ def generate_enhanced_tax_tips(profile):
             "returns": "Tax Benefit",
             "lock_in": "1 year"
         })
-        total_potential_savings += health_insurance_potential * 0.3
+        total_potential_savings += health_insurance_saving
     
     # Emergency fund recommendations
     if profile.emergency_fund < profile.income * 0.06:
@@ -300,10 +383,11 @@ def generate_enhanced_tax_tips(profile):
     # Retirement planning
     if profile.retirement_savings < profile.income * 0.15:
         retirement_potential = (profile.income * 0.15) - profile.retirement_savings
+        retirement_saving = tax_saving(profile, '80CCD(1B)', retirement_potential)
         recommendations.append({
             "title": "Retirement Planning",
             "description": f"Allocate ₹{retirement_potential:,.0f} annually for retirement planning.",
-            "potential_saving": retirement_potential * 0.3,
+            "potential_saving": retirement_saving,
             "priority": "medium",
             "category": "Retirement",
             "action": "Plan Retirement",
@@ -311,7 +395,7 @@ def generate_enhanced_tax_tips(profile):
             "returns": "8-12%",
             "lock_in": "Long-term"
         })
-        total_potential_savings += retirement_potential * 0.3
+        total_potential_savings += retirement_saving
     
     # Calculate optimization score based on profile completeness and recommendations
     optimization_score = min(30 + (len(recommendations) * 15) + (is_profile_complete * 20), 95)
@@ -321,7 +405,7 @@ def generate_enhanced_tax_tips(profile):
         "summary": {
             "total_potential_savings": total_potential_savings,
             "optimization_score": optimization_score,
-            "current_tax_saved": current_tax_saved
+            "current_tax_saved": current_saved
         }
     }
 
@@ -357,6 +441,8 @@ class ProfileView(generics.RetrieveUpdateAPIView):
             
             # Save the profile
             profile.save()
+            profile.refresh_from_db()
+            refresh_recommendations_later(request.user)
             print(f"Profile updated successfully for user: {request.user.username}")
             
             # Serialize and return
@@ -373,41 +459,39 @@ class ProfileView(generics.RetrieveUpdateAPIView):
 class DashboardView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on_user_data
     def get(self, request):
-        profile, _ = UserProfile.objects.get_or_create(user=request.user)
-        summary, _ = DashboardSummary.objects.get_or_create(user=request.user)
-        
-        # Generate personalized recommendations
-        recommendations = generate_tax_tips(profile)
-        summary.recommendations = ", ".join(recommendations)
-        
-        # Calculate savings progress
-        savings_data = calculate_savings_progress(profile)
-        summary.total_savings = savings_data['total_savings']
-        summary.monthly_savings = savings_data['monthly_savings']
-        summary.savings_goal = savings_data['savings_goal']
-        summary.progress_percentage = savings_data['progress_percentage']
-        
-        summary.save()
-        serializer = DashboardSummarySerializer(summary)
-        return Response(serializer.data)
+        # Precomputed when the profile is saved; a read is one query and never writes
+        summary = DashboardSummary.objects.filter(user=request.user).first()
+        if summary is None:
+            # Users from before summaries were precomputed, or without a profile yet
+            profile, _ = UserProfile.objects.get_or_create(user=request.user)
+            summary = refresh_dashboard_summary(profile)
+
+        return Response(DashboardSummarySerializer(summary).data)
 
 class TaxSavingsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on_user_data
     def get(self, request):
         profile, _ = UserProfile.objects.get_or_create(user=request.user)
         
         # Get AI-powered recommendations
         tax_analysis = get_gemini_tax_recommendations(profile)
         
+        return Response(self.build_payload(profile, tax_analysis))
+
+    def build_payload(self, profile, tax_analysis):
+        """Combine AI recommendations with calculated tax options"""
         # Calculate tax saving options based on profile
         tax_saving_options = self.calculate_tax_options(profile)
         
-        return Response({
+        return {
             'recommendations': tax_analysis.get('recommendations', []),
             'summary': tax_analysis.get('summary', {}),
             'tax_options': tax_saving_options,
+            'regime_comparison': tax_engine.compare_regimes(**profile_tax_inputs(profile)),
             'profile_data': {
                 'income': profile.income,
                 'age': profile.age,
@@ -417,7 +501,7 @@ class TaxSavingsView(APIView):
                 'emergency_fund': profile.emergency_fund,
                 'retirement_savings': profile.retirement_savings
             }
-        })
+        }
 
     def calculate_tax_options(self, profile):
         """Calculate tax saving options based on profile"""
@@ -430,7 +514,7 @@ class TaxSavingsView(APIView):
                     'returns': '12-15%',
                     'risk': 'High',
                     'lockIn': '3 years',
-                    'potential_saving': min(150000 - profile.investment_amount, 50000) * 0.3
+                    'potential_saving': tax_saving(profile, '80C', min(150000 - profile.investment_amount, 50000))
                 },
                 {
                     'name': 'PPF',
@@ -439,7 +523,7 @@ class TaxSavingsView(APIView):
                     'returns': '7-8%',
                     'risk': 'Low',
                     'lockIn': '15 years',
-                    'potential_saving': min(150000 - (profile.total_savings * 0.3), 50000) * 0.3
+                    'potential_saving': tax_saving(profile, '80C', min(150000 - (profile.total_savings * 0.3), 50000))
                 },
                 {
                     'name': 'NSC',
@@ -448,7 +532,7 @@ class TaxSavingsView(APIView):
                     'returns': '6-7%',
                     'risk': 'Low',
                     'lockIn': '5 years',
-                    'potential_saving': min(100000 - (profile.total_savings * 0.2), 30000) * 0.3
+                    'potential_saving': tax_saving(profile, '80C', min(100000 - (profile.total_savings * 0.2), 30000))
                 }
             ],
             '80D': [
@@ -459,7 +543,7 @@ class TaxSavingsView(APIView):
                     'returns': 'Tax Benefit',
                     'risk': 'Low',
                     'lockIn': '1 year',
-                    'potential_saving': max(25000 - profile.tax_deductions, 0) * 0.3
+                    'potential_saving': tax_saving(profile, '80D_self', 25000 - profile.tax_deductions)
                 },
                 {
                     'name': 'Parents Health Insurance',
@@ -468,7 +552,8 @@ class TaxSavingsView(APIView):
                     'returns': 'Tax Benefit',
                     'risk': 'Low',
                     'lockIn': '1 year',
-                    'potential_saving': 50000 * 0.3
+                    # The ₹50,000 limit applies to senior-citizen parents
+                    'potential_saving': tax_saving(profile, '80D_parents', 50000, parents_senior=True)
                 }
             ],
             '80CCD': [
@@ -479,11 +564,45 @@ class TaxSavingsView(APIView):
                     'returns': '8-10%',
                     'risk': 'Medium',
                     'lockIn': 'Till 60',
-                    'potential_saving': 50000 * 0.3
+                    'potential_saving': tax_saving(profile, '80CCD(1B)', 50000)
                 }
             ]
         }
 
+class TaxOptimizerView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        """Tax-minimizing split of a budget across deduction instruments"""
+        try:
+            budget = float(request.data.get('budget'))
+        except (TypeError, ValueError):
+            return Response({'error': 'budget must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        if budget <= 0:
+            return Response({'error': 'budget must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_risk = request.data.get('max_risk', 'High')
+        if max_risk not in RISK_LEVELS:
+            return Response(
+                {'error': f"max_risk must be one of {', '.join(RISK_LEVELS)}"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        max_lock_in_years = request.data.get('max_lock_in_years')
+        if max_lock_in_years is not None:
+            try:
+                max_lock_in_years = float(max_lock_in_years)
+            except (TypeError, ValueError):
+                return Response({'error': 'max_lock_in_years must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        instruments = request.data.get('instruments')
+        if instruments is not None and not isinstance(instruments, list):
+            return Response({'error': 'instruments must be a list of names'}, status=status.HTTP_400_BAD_REQUEST)
+
+        profile, _ = UserProfile.objects.get_or_create(user=request.user)
+        result = tax_optimizer.optimize(
+            budget, max_risk=max_risk, max_lock_in_years=max_lock_in_years, instruments=instruments,
+            **profile_tax_inputs(profile)
+        )
+        return Response(result)
+
 class ChatbotView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -496,9 +615,27 @@ class ChatbotView(APIView):
 
             # Get user profile for context
             profile, _ = UserProfile.objects.get_or_create(user=request.user)
+            stream = request.query_params.get('stream') in ('1', 'true')
+            
+            # Templated questions (tax slabs, savings progress...) are answered locally, without an LLM call
+            started = time.perf_counter()
+            intent, params = chat_intent_router.classify(user_message)
+            if intent != OPEN_INTENT:
+                local_response = self.get_local_response(intent, params, profile)
+                chat_intent_router.record(intent, (time.perf_counter() - started) * 1000)
+                if stream:
+                    return sse_response(self.stream_local_response(local_response))
+                return Response(local_response)
+            
+            # Stream the answer as server-sent events (?stream=1)
+            if stream:
+                return sse_response(timed_events(
+                    self.stream_gemini_chat_response(user_message, profile), intent, started
+                ))
             
             # Get AI response using Gemini
             ai_response = self.get_gemini_chat_response(user_message, profile)
+            chat_intent_router.record(intent, (time.perf_counter() - started) * 1000)
             
             return Response({
                 'response': ai_response['response'],
@@ -518,18 +655,7 @@ class ChatbotView(APIView):
         """Get AI response using Gemini"""
         try:
             # Convert profile to dictionary for AI service
-            profile_dict = {
-                'income': profile.income,
-                'age': profile.age,
-                'investment_amount': profile.investment_amount,
-                'dependents': profile.dependents,
-                'occupation': profile.occupation,
-                'city': profile.city,
-                'state': profile.state,
-                'emergency_fund': profile.emergency_fund,
-                'retirement_savings': profile.retirement_savings,
-                'tax_deductions': profile.tax_deductions
-            }
+            profile_dict = build_chat_profile_dict(profile)
             
             # Use Gemini AI service
             response = ai_service.generate_chat_response(user_message, profile_dict)
@@ -540,13 +666,127 @@ class ChatbotView(APIView):
             print(f"Gemini chat error: {e}")
             return self.get_fallback_response(user_message, profile)
 
+    def stream_gemini_chat_response(self, user_message, profile):
+        """Relay Gemini's streamed answer as SSE: chunk*, suggestions, done"""
+        profile_dict = build_chat_profile_dict(profile)
+        for event, data in ai_service.stream_chat_response(user_message, profile_dict):
+            if event == 'chunk':
+                data = {'text': data}
+            yield sse_event(event, data)
+
+    def get_local_response(self, intent, params, profile):
+        """Answer a deterministic intent from chat_intent_router with a local calculator"""
+        handlers = {
+            'tax_allocation': self.get_tax_allocation_response,
+            'tax_slab': self.get_tax_slab_response,
+            'health_score': self.get_health_score_response,
+            'savings_progress': self.get_savings_progress_response,
+        }
+        return handlers[intent](profile, **params)
+
+    def get_tax_allocation_response(self, profile, **options):
+        """Answer "how should I split ₹X for tax saving" with the allocation optimizer"""
+        result = tax_optimizer.optimize(**options, **profile_tax_inputs(profile))
+        if result['allocations']:
+            lines = [
+                f"• **{a['name']}** (Sec {a['section']}): ₹{a['amount']:,.0f} — {a['risk']} risk, lock-in {a['lockIn']}"
+                for a in result['allocations']
+            ]
+            text = (
+                f"Here's the tax-optimal way to use ₹{result['budget']:,.0f}:\n\n" + "\n".join(lines)
+                + f"\n\nThis lowers your tax from ₹{result['tax_before']:,.0f} to ₹{result['tax_after']:,.0f} "
+                f"(saving ₹{result['tax_saved']:,.0f}) under the {result['regime']} regime."
+            )
+            if result['unallocated'] > 0:
+                text += f" The remaining ₹{result['unallocated']:,.0f} would not reduce your tax further."
+        else:
+            text = (
+                f"Investing ₹{result['budget']:,.0f} in tax-saving instruments would not lower your tax: "
+                f"you pay ₹{result['tax_before']:,.0f} either way under the {result['regime']} regime. "
+                "Choose investments for their returns instead."
+            )
+        return {
+            'response': text,
+            'suggestions': ["Compare old vs new regime", "Tell me about ELSS funds", "How does NPS work?"],
+            'confidence': 0.95
+        }
+
+    def get_tax_slab_response(self, profile):
+        """Tax under both regimes for the profile, with the cheaper regime's slabs"""
+        comparison = tax_engine.compare_regimes(**profile_tax_inputs(profile))
+        regime = comparison['recommended_regime']
+        other = 'old' if regime == 'new' else 'new'
+        lower = 0
+        slabs = []
+        for upper, rate in tax_engine.regimes[regime].slabs.slabs:
+            band = f"Above ₹{lower:,.0f}" if upper == float('inf') else f"₹{lower:,.0f} – ₹{upper:,.0f}"
+            slabs.append(f"• {band}: {rate * 100:.0f}%")
+            lower = upper
+        return {
+            'response': (
+                f"For AY {comparison['assessment_year']}, on your income of ₹{profile.income:,.0f}:\n\n"
+                f"• **{regime.title()} regime**: ₹{comparison[regime]['total_tax']:,.0f}\n"
+                f"• **{other.title()} regime**: ₹{comparison[other]['total_tax']:,.0f}\n\n"
+                f"The {regime} regime saves you ₹{comparison['regime_savings']:,.0f}. Its slabs:\n"
+                + "\n".join(slabs)
+                + "\n\nAmounts include the 87A rebate, surcharge and 4% cess."
+            ),
+            'suggestions': ["How should I split ₹1.5 lakh to save tax?", "Tax optimization tips", "How does NPS work?"],
+            'confidence': 0.95
+        }
+
+    def get_health_score_response(self, profile):
+        score = calculate_financial_health_score(profile)
+        return {
+            'response': (
+                f"Your financial health score is **{score}/100**.\n\n"
+                f"• **Emergency fund**: ₹{profile.emergency_fund:,.0f} (target ₹{profile.income * 0.06:,.0f})\n"
+                f"• **Monthly savings**: ₹{profile.monthly_savings:,.0f}\n"
+                f"• **Investments**: ₹{profile.investment_amount:,.0f} (target ₹{profile.income * 0.1:,.0f})\n"
+                f"• **Retirement savings**: ₹{profile.retirement_savings:,.0f} (target ₹{profile.income * 0.15:,.0f})\n\n"
+                "Each area is worth 25 points. Want tips to improve the weakest one?"
+            ),
+            'suggestions': ["Build my emergency fund", "Investment strategy", "Retirement planning"],
+            'confidence': 0.95
+        }
+
+    def get_savings_progress_response(self, profile):
+        progress = calculate_savings_progress(profile)
+        if not progress['savings_goal']:
+            text = (
+                f"You have saved ₹{progress['total_savings']:,.0f} so far, but no savings goal is set. "
+                "Add one in your profile to track progress."
+            )
+        else:
+            remaining = max(progress['savings_goal'] - progress['total_savings'], 0)
+            text = (
+                f"You've saved ₹{progress['total_savings']:,.0f} of your ₹{progress['savings_goal']:,.0f} goal "
+                f"(**{progress['progress_percentage']:.0f}%**)."
+            )
+            if remaining and progress['monthly_savings'] > 0:
+                text += (
+                    f" At ₹{progress['monthly_savings']:,.0f}/month you'll reach it in about "
+                    f"{-(-remaining // progress['monthly_savings']):.0f} months."
+                )
+        return {
+            'response': text,
+            'suggestions': ["Set up automatic savings", "Investment strategy", "Emergency fund planning"],
+            'confidence': 0.95
+        }
+
+    def stream_local_response(self, response):
+        """Send a locally computed answer with the same SSE events as a streamed one"""
+        yield sse_event('chunk', {'text': response['response']})
+        yield sse_event('suggestions', response['suggestions'])
+        yield sse_event('done', {'confidence': response['confidence']})
+
     def get_enhanced_fallback_response(self, user_message, profile):
         """Enhanced fallback responses based on user profile"""
         message = user_message.lower()
         
         # Tax-related queries
         if any(word in message for word in ['tax', 'deduction', '80c', 'savings']):
-            potential_savings = max(150000 - profile.investment_amount, 0) * 0.3
+            potential_savings = tax_saving(profile, '80C', 150000 - profile.investment_amount)
             return {
                 "response": f"Based on your income of ₹{profile.income:,.0f}, here are tax-saving opportunities:\n\n• **ELSS Funds**: You can save ₹{potential_savings:,.0f} more by investing ₹{max(150000 - profile.investment_amount, 0):,.0f} in ELSS\n• **PPF**: Consider ₹{min(profile.income * 0.1, 150000):,.0f}/year for tax-free returns\n• **Health Insurance**: Get ₹25,000 deduction for family coverage\n• **NPS**: Additional ₹50,000 deduction under 80CCD(1B)\n\nWould you like detailed information about any of these options?",
                 "suggestions": ["Tell me about ELSS funds", "How does NPS work?", "Health insurance benefits", "PPF vs other options"],
@@ -611,166 +851,65 @@ class ChatbotView(APIView):
 class BenefitsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on_user_data
     def get(self, request):
         profile, _ = UserProfile.objects.get_or_create(user=request.user)
-        benefits = self.get_gemini_benefits(profile)
+        benefits = self.get_benefits(profile)
         return Response({
             'benefits': benefits
         })
 
-    def get_gemini_benefits(self, profile):
-        """Get AI-powered benefits recommendations using Gemini"""
+    def get_benefits(self, profile):
+        """Eligible schemes from the rule table in core/eligibility.py, optionally reworded by Gemini"""
+        benefits = eligibility_engine.match(profile)
+        if not settings.BENEFITS_AI_PHRASING:
+            return benefits
+        
         try:
-            # Convert profile to dictionary for AI service
-            profile_dict = {
-                'income': profile.income,
-                'age': profile.age,
-                'dependents': profile.dependents,
-                'occupation': profile.occupation,
-                'investment_amount': profile.investment_amount,
-                'emergency_fund': profile.emergency_fund,
-                'retirement_savings': profile.retirement_savings,
-                'tax_deductions': profile.tax_deductions,
-                'city': profile.city,
-                'state': profile.state,
-                'marital_status': profile.marital_status,
-                'education': profile.education,
-                'business_type': profile.business_type
-            }
-            
-            # Use Gemini AI service
-            response = ai_service.generate_benefits_recommendations(profile_dict)
-            print("Gemini Benefits: Successfully generated response")
-            return response
-            
+            return ai_service.generate_benefits_recommendations(build_benefits_profile_dict(profile), benefits)
         except Exception as e:
             print(f"Gemini benefits error: {e}")
-            return self.get_fallback_benefits(profile)
+            mark_degraded()
+            return benefits
 
-    def get_fallback_benefits(self, profile):
-        # Comprehensive fallback benefits list
-        benefits = []
-        
-        # Income-based benefits
-        if profile.income < 1200000:
-            benefits.append({
-                "name": "PM-KISAN",
-                "description": "₹6,000/year income support for eligible farmers.",
-                "eligibility_reason": "Income below ₹12 lakh.",
-                "link": "https://pmkisan.gov.in",
-                "amount": "₹6,000/year",
-                "category": "Agriculture",
-                "estimatedTime": "15-30 days"
-            })
-        
-        if profile.income < 500000:
-            benefits.append({
-                "name": "Ayushman Bharat",
-                "description": "₹5 lakh health insurance for low-income families.",
-                "eligibility_reason": "Income below ₹5 lakh.",
-                "link": "https://pmjay.gov.in",
-                "amount": "₹5 lakh/year",
-                "category": "Health",
-                "estimatedTime": "Instant"
-            })
-        
-        # Age-based benefits
-        if profile.age >= 60:
-            benefits.append({
-                "name": "Senior Citizen Savings Scheme (SCSS)",
-                "description": "High interest savings for seniors with 8.2% interest rate.",
-                "eligibility_reason": "Age 60 or above.",
-                "link": "https://www.nsiindia.gov.in",
-                "amount": "8.2% interest",
-                "category": "Savings",
-                "estimatedTime": "7-15 days"
-            })
-        
-        if profile.age >= 18 and profile.age <= 40:
-            benefits.append({
-                "name": "Atal Pension Yojana (APY)",
-                "description": "Guaranteed pension scheme for unorganized sector workers.",
-                "eligibility_reason": "Age between 18-40 years.",
-                "link": "https://npscra.nsdl.co.in",
-                "amount": "₹1,000-5,000/month",
-                "category": "Pension",
-                "estimatedTime": "15-30 days"
-            })
-        
-        # Universal benefits
-        benefits.append({
-            "name": "Pradhan Mantri Jeevan Jyoti Bima Yojana (PMJJBY)",
-            "description": "₹2 lakh life insurance for ₹330/year.",
-            "eligibility_reason": "Available to all savings account holders age 18-50.",
-            "link": "https://www.jansuraksha.gov.in",
-            "amount": "₹2 lakh coverage",
-            "category": "Insurance",
-            "estimatedTime": "Instant"
-        })
-        
-        benefits.append({
-            "name": "Pradhan Mantri Suraksha Bima Yojana (PMSBY)",
-            "description": "Accidental death and disability insurance for ₹12/year.",
-            "eligibility_reason": "Available to all savings account holders age 18-70.",
-            "link": "https://www.jansuraksha.gov.in",
-            "amount": "₹2 lakh coverage",
-            "category": "Insurance",
-            "estimatedTime": "Instant"
-        })
-        
-        # Investment-based benefits
-        if profile.investment_amount < 150000:
-            benefits.append({
-                "name": "Public Provident Fund (PPF)",
-                "description": "Long-term savings with tax benefits under 80C.",
-                "eligibility_reason": "Available to all Indian residents.",
-                "link": "https://www.nsiindia.gov.in",
-                "amount": "7.1% interest",
-                "category": "Savings",
-                "estimatedTime": "7-15 days"
-            })
-        
-        # Family-based benefits
-        if profile.dependents > 0:
-            benefits.append({
-                "name": "Sukanya Samriddhi Yojana",
-                "description": "Small savings scheme for girl child with attractive interest rates.",
-                "eligibility_reason": "Available for girl child below 10 years.",
-                "link": "https://www.nsiindia.gov.in",
-                "amount": "8.2% interest",
-                "category": "Savings",
-                "estimatedTime": "7-15 days"
-            })
-        
-        # Business/Employment benefits
-        if profile.income < 800000:
-            benefits.append({
-                "name": "Pradhan Mantri Mudra Yojana",
-                "description": "Collateral-free loans for micro enterprises.",
-                "eligibility_reason": "For non-corporate, non-farm enterprises.",
-                "link": "https://mudra.org.in",
-                "amount": "Up to ₹10 lakh",
-                "category": "Business",
-                "estimatedTime": "30-45 days"
-            })
-        
-        # Housing benefits
-        if profile.income < 600000:
-            benefits.append({
-                "name": "Pradhan Mantri Awas Yojana (PMAY)",
-                "description": "Housing assistance for economically weaker sections.",
-                "eligibility_reason": "EWS/LIG families without pucca house.",
-                "link": "https://pmaymis.gov.in",
-                "amount": "Up to ₹2.67 lakh",
-                "category": "Housing",
-                "estimatedTime": "60-90 days"
+class BenefitEligibilityStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """Eligible user counts per benefit scheme across all profiles (admin only)"""
+        try:
+            started = time.monotonic()
+            total, counts = eligibility_engine.count_profiles(UserProfile.objects.all())
+            return Response({
+                'total_profiles': total,
+                'schemes': [
+                    {
+                        'name': benefit['name'],
+                        'category': benefit['category'],
+                        'eligible': count,
+                        'share': round(count / total, 4) if total else 0.0
+                    }
+                    for benefit, count in zip(eligibility_engine.benefits, counts.tolist())
+                ],
+                'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
             })
-        
-        return benefits
+        except Exception as e:
+            print(f"Benefit eligibility stats error: {e}")
+            return Response({'error': 'Failed to compute eligibility stats'}, status=500)
+
+class ChatIntentStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """Chat intent hit rates, latencies and answer cache stats since this worker started (admin only)"""
+        metrics = chat_intent_router.metrics()
+        metrics['answer_cache'] = ai_service.chat_cache.stats() if ai_service.chat_cache is not None else None
+        return Response(metrics)
 
 class ReportsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on_user_data
     def get(self, request):
         profile, _ = UserProfile.objects.get_or_create(user=request.user)
         reports = self.generate_user_reports(profile)
@@ -883,7 +1022,8 @@ class ReportsView(APIView):
                 'data': {
                     'total_income': profile.income,
                     'tax_deductions': profile.tax_deductions,
-                    'potential_savings': profile.tax_deductions * 0.3,
+                    'potential_savings': current_tax_saved(profile),
+                    'regime_comparison': tax_engine.compare_regimes(**profile_tax_inputs(profile)),
                     'investment_amount': profile.investment_amount
                 }
             }
@@ -916,42 +1056,7 @@ class ReportsView(APIView):
 
     def calculate_financial_health_score(self, profile):
         """Calculate financial health score (0-100)"""
-        score = 0
-        
-        # Emergency fund (25 points)
-        if profile.emergency_fund >= profile.income * 0.06:
-            score += 25
-        elif profile.emergency_fund >= profile.income * 0.03:
-            score += 15
-        else:
-            score += 5
-            
-        # Savings rate (25 points)
-        savings_rate = (profile.monthly_savings / profile.income) * 100 if profile.income > 0 else 0
-        if savings_rate >= 20:
-            score += 25
-        elif savings_rate >= 10:
-            score += 15
-        else:
-            score += 5
-            
-        # Investment allocation (25 points)
-        if profile.investment_amount >= profile.income * 0.1:
-            score += 25
-        elif profile.investment_amount >= profile.income * 0.05:
-            score += 15
-        else:
-            score += 5
-            
-        # Retirement planning (25 points)
-        if profile.retirement_savings >= profile.income * 0.15:
-            score += 25
-        elif profile.retirement_savings >= profile.income * 0.1:
-            score += 15
-        else:
-            score += 5
-            
-        return score
+        return calculate_financial_health_score(profile)
 
     def generate_user_reports(self, profile):
         """Generate personalized reports based on user profile"""
@@ -971,7 +1076,7 @@ class ReportsView(APIView):
             "data": {
                 "total_income": profile.income,
                 "tax_deductions": profile.tax_deductions,
-                "potential_savings": profile.tax_deductions * 0.3,
+                "potential_savings": current_tax_saved(profile),
                 "investment_amount": profile.investment_amount
             }
         })
@@ -1066,7 +1171,7 @@ class ReportsView(APIView):
                 "80c_deductions": min(profile.investment_amount, 150000),
                 "80d_deductions": profile.tax_deductions,
                 "total_deductions": profile.tax_deductions,
-                "tax_saved": profile.tax_deductions * 0.3
+                "tax_saved": current_tax_saved(profile)
             }
         })
         
@@ -1076,162 +1181,12 @@ class ReportsView(APIView):
         """Calculate report statistics"""
         return {
             "total_reports": 6,
-            "tax_savings": f"₹{profile.tax_deductions * 0.3:,.0f}",
+            "tax_savings": f"₹{current_tax_saved(profile):,.0f}",
             "investment_performance": "+12.8%",
             "benefits_claimed": 8,
             "total_benefits_value": "₹2.3L"
         }
 
-    def get_gemini_benefits(self, profile):
-        """Get AI-powered benefits recommendations using Gemini"""
-        try:
-            # Convert profile to dictionary for AI service
-            profile_dict = {
-                'income': profile.income,
-                'age': profile.age,
-                'dependents': profile.dependents,
-                'occupation': profile.occupation,
-                'investment_amount': profile.investment_amount,
-                'emergency_fund': profile.emergency_fund,
-                'retirement_savings': profile.retirement_savings,
-                'tax_deductions': profile.tax_deductions,
-                'city': profile.city,
-                'state': profile.state,
-                'marital_status': profile.marital_status,
-                'education': profile.education,
-                'business_type': profile.business_type
-            }
-            
-            # Use Gemini AI service
-            response = ai_service.generate_benefits_recommendations(profile_dict)
-            print("Gemini Reports Benefits: Successfully generated response")
-            return response
-            
-        except Exception as e:
-            print(f"Gemini Reports benefits error: {e}")
-            return self.get_fallback_benefits(profile)
-
-    def get_fallback_benefits(self, profile):
-        # Comprehensive fallback benefits list
-        benefits = []
-        
-        # Income-based benefits
-        if profile.income < 1200000:
-            benefits.append({
-                "name": "PM-KISAN",
-                "description": "₹6,000/year income support for eligible farmers.",
-                "eligibility_reason": "Income below ₹12 lakh.",
-                "link": "https://pmkisan.gov.in",
-                "amount": "₹6,000/year",
-                "category": "Agriculture",
-                "estimatedTime": "15-30 days"
-            })
-        
-        if profile.income < 500000:
-            benefits.append({
-                "name": "Ayushman Bharat",
-                "description": "₹5 lakh health insurance for low-income families.",
-                "eligibility_reason": "Income below ₹5 lakh.",
-                "link": "https://pmjay.gov.in",
-                "amount": "₹5 lakh/year",
-                "category": "Health",
-                "estimatedTime": "Instant"
-            })
-        
-        # Age-based benefits
-        if profile.age >= 60:
-            benefits.append({
-                "name": "Senior Citizen Savings Scheme (SCSS)",
-                "description": "High interest savings for seniors with 8.2% interest rate.",
-                "eligibility_reason": "Age 60 or above.",
-                "link": "https://www.nsiindia.gov.in",
-                "amount": "8.2% interest",
-                "category": "Savings",
-                "estimatedTime": "7-15 days"
-            })
-        
-        if profile.age >= 18 and profile.age <= 40:
-            benefits.append({
-                "name": "Atal Pension Yojana (APY)",
-                "description": "Guaranteed pension scheme for unorganized sector workers.",
-                "eligibility_reason": "Age between 18-40 years.",
-                "link": "https://npscra.nsdl.co.in",
-                "amount": "₹1,000-5,000/month",
-                "category": "Pension",
-                "estimatedTime": "15-30 days"
-            })
-        
-        # Universal benefits
-        benefits.append({
-            "name": "Pradhan Mantri Jeevan Jyoti Bima Yojana (PMJJBY)",
-            "description": "₹2 lakh life insurance for ₹330/year.",
-            "eligibility_reason": "Available to all savings account holders age 18-50.",
-            "link": "https://www.jansuraksha.gov.in",
-            "amount": "₹2 lakh coverage",
-            "category": "Insurance",
-            "estimatedTime": "Instant"
-        })
-        
-        benefits.append({
-            "name": "Pradhan Mantri Suraksha Bima Yojana (PMSBY)",
-            "description": "Accidental death and disability insurance for ₹12/year.",
-            "eligibility_reason": "Available to all savings account holders age 18-70.",
-            "link": "https://www.jansuraksha.gov.in",
-            "amount": "₹2 lakh coverage",
-            "category": "Insurance",
-            "estimatedTime": "Instant"
-        })
-        
-        # Investment-based benefits
-        if profile.investment_amount < 150000:
-            benefits.append({
-                "name": "Public Provident Fund (PPF)",
-                "description": "Long-term savings with tax benefits under 80C.",
-                "eligibility_reason": "Available to all Indian residents.",
-                "link": "https://www.nsiindia.gov.in",
-                "amount": "7.1% interest",
-                "category": "Savings",
-                "estimatedTime": "7-15 days"
-            })
-        
-        # Family-based benefits
-        if profile.dependents > 0:
-            benefits.append({
-                "name": "Sukanya Samriddhi Yojana",
-                "description": "Small savings scheme for girl child with attractive interest rates.",
-                "eligibility_reason": "Available for girl child below 10 years.",
-                "link": "https://www.nsiindia.gov.in",
-                "amount": "8.2% interest",
-                "category": "Savings",
-                "estimatedTime": "7-15 days"
-            })
-        
-        # Business/Employment benefits
-        if profile.income < 800000:
-            benefits.append({
-                "name": "Pradhan Mantri Mudra Yojana",
-                "description": "Collateral-free loans for micro enterprises.",
-                "eligibility_reason": "For non-corporate, non-farm enterprises.",
-                "link": "https://mudra.org.in",
-                "amount": "Up to ₹10 lakh",
-                "category": "Business",
-                "estimatedTime": "30-45 days"
-            })
-        
-        # Housing benefits
-        if profile.income < 600000:
-            benefits.append({
-                "name": "Pradhan Mantri Awas Yojana (PMAY)",
-                "description": "Housing assistance for economically weaker sections.",
-                "eligibility_reason": "EWS/LIG families without pucca house.",
-                "link": "https://pmaymis.gov.in",
-                "amount": "Up to ₹2.67 lakh",
-                "category": "Housing",
-                "estimatedTime": "60-90 days"
-            })
-        
-        return benefits
-
 class UserRegistrationView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
@@ -1247,8 +1202,7 @@ class UserRegistrationView(generics.CreateAPIView):
                 name=f"{user.first_name} {user.last_name}".strip() or user.username,
                 email=user.email
             )
-            # Create dashboard summary
-            DashboardSummary.objects.create(user=user)
+            # The dashboard summary is created from the profile (core.signals)
             
             return Response({
                 'message': 'User registered successfully',
@@ -1297,6 +1251,7 @@ class ChangePasswordView(APIView):
 class WisdomLibraryView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on_user_data
     def get(self, request):
         """Get personalized book recommendations and library overview"""
         try:
@@ -1317,177 +1272,46 @@ class WisdomLibraryView(APIView):
                 'recommendations': recommendations,
                 'reading_stats': reading_stats,
                 'recent_books': recent_books,
-                'user_preferences': UserReadingPreferenceSerializer(preferences).data
+                'user_preferences': UserReadingPreferenceSerializer(preferences, context={'request': request}).data
             })
         except Exception as e:
             print(f"Wisdom Library error: {e}")
             return Response({'error': 'Failed to load wisdom library'}, status=500)
 
     def get_personalized_recommendations(self, user, profile, preferences):
-        """Generate personalized book recommendations using ML techniques"""
+        """Serve precomputed book recommendations; on a miss rank in memory and store them in the background"""
         try:
-            # Get user's financial profile to determine relevant genres
-            financial_genres = self.get_financial_genres(profile)
-            
-            # Get user's reading history
-            reading_history = UserReadingHistory.objects.filter(user=user)
-            
-            # Combine user preferences with financial profile
-            preferred_genres = list(set(preferences.preferred_genres + financial_genres))
-            
-            # Get books based on preferences and financial profile
-            recommended_books = Book.objects.filter(
-                Q(genre__in=preferred_genres) |
-                Q(investment_level__in=self.get_investment_levels(profile))
-            ).exclude(
-                userreadinghistory__user=user,
-                userreadinghistory__status='completed'
-            ).distinct()
-            
-            # Apply ML-based scoring
-            scored_books = []
-            for book in recommended_books[:20]:  # Limit to top 20
-                score = self.calculate_recommendation_score(book, user, profile, preferences)
-                scored_books.append({
-                    'book': BookListSerializer(book).data,
-                    'score': score,
-                    'reason': self.get_recommendation_reason(book, profile, preferences)
-                })
+            recommendations = [
+                (rec.book, rec.recommendation_score, rec.recommendation_reason)
+                for rec in get_stored_recommendations(user)
+            ]
+            if not recommendations:
+                recommendations = rank_current_recommendations(user, profile, preferences)
+                refresher.schedule(user.id)
+            if not recommendations:
+                return self.get_fallback_recommendations()
             
-            # Sort by score and return top recommendations
-            scored_books.sort(key=lambda x: x['score'], reverse=True)
-            return scored_books[:10]
+            return [{
+                'book': BookListSerializer(book).data,
+                'score': score,
+                'reason': reason
+            } for book, score, reason in recommendations]
             
         except Exception as e:
             print(f"Recommendation error: {e}")
+            mark_degraded()
             # Fallback to popular books
             return self.get_fallback_recommendations()
 
-    def get_financial_genres(self, profile):
-        """Determine relevant genres based on financial profile"""
-        genres = []
-        
-        if profile.income > 1000000:  # High income
-            genres.extend(['Business & Management', 'Investment'])
-        elif profile.income > 500000:  # Medium income
-            genres.extend(['Business & Management', 'Self-Help / Personal Growth'])
-        else:  # Lower income
-            genres.extend(['Self-Help / Personal Growth', 'Psychology'])
-        
-        if profile.age < 30:
-            genres.append('Self-Help / Personal Growth')
-        elif profile.age > 50:
-            genres.extend(['Investment', 'Psychology'])
-        
-        if profile.investment_amount > 100000:
-            genres.append('Investment')
-        
-        return list(set(genres))
-
-    def get_investment_levels(self, profile):
-        """Determine appropriate investment levels based on profile"""
-        if profile.investment_amount > 500000:
-            return ['Advanced', 'Intermediate']
-        elif profile.investment_amount > 100000:
-            return ['Intermediate', 'Beginner']
-        else:
-            return ['Beginner']
-
-    def calculate_recommendation_score(self, book, user, profile, preferences):
-        """Calculate ML-based recommendation score"""
-        score = 0.0
-        
-        # Base score from book rating
-        score += book.rating * 0.3
-        
-        # Genre preference score
-        if book.genre in preferences.preferred_genres:
-            score += 0.4
-        
-        # Financial relevance score
-        financial_relevance = self.calculate_financial_relevance(book, profile)
-        score += financial_relevance * 0.3
-        
-        # Popularity bonus
-        score += book.popularity_score * 0.1
-        
-        return score
-
-    def calculate_financial_relevance(self, book, profile):
-        """Calculate how relevant a book is to user's financial situation"""
-        relevance = 0.0
-        
-        # Income-based relevance
-        if profile.income > 1000000 and book.genre == 'Business & Management':
-            relevance += 0.5
-        elif profile.income < 500000 and book.genre == 'Self-Help / Personal Growth':
-            relevance += 0.5
-        
-        # Investment level relevance
-        if profile.investment_amount > 500000 and book.investment_level == 'Advanced':
-            relevance += 0.3
-        elif profile.investment_amount < 100000 and book.investment_level == 'Beginner':
-            relevance += 0.3
-        
-        # Age-based relevance
-        if profile.age < 30 and book.genre == 'Self-Help / Personal Growth':
-            relevance += 0.2
-        elif profile.age > 50 and book.genre == 'Investment':
-            relevance += 0.2
-        
-        return relevance
-
-    def get_recommendation_reason(self, book, profile, preferences):
-        """Generate human-readable reason for recommendation"""
-        reasons = []
-        
-        if book.genre in preferences.preferred_genres:
-            reasons.append(f"Matches your preferred genre: {book.genre}")
-        
-        if profile.income > 1000000 and book.genre == 'Business & Management':
-            reasons.append("Perfect for high-income professionals")
-        elif profile.income < 500000 and book.genre == 'Self-Help / Personal Growth':
-            reasons.append("Great for building financial foundation")
-        
-        if book.rating >= 4.0:
-            reasons.append("Highly rated by readers")
-        
-        if book.investment_level == 'Beginner' and profile.investment_amount < 100000:
-            reasons.append("Perfect for beginners")
-        elif book.investment_level == 'Advanced' and profile.investment_amount > 500000:
-            reasons.append("Advanced strategies for experienced investors")
-        
-        return " • ".join(reasons) if reasons else "Recommended based on your profile"
-
     def get_reading_statistics(self, user):
         """Get user's reading statistics"""
-        history = UserReadingHistory.objects.filter(user=user)
-        
-        total_books = history.count()
-        completed_books = history.filter(status='completed').count()
-        currently_reading = history.filter(status='currently_reading').count()
-        want_to_read = history.filter(status='want_to_read').count()
-        
-        avg_rating = history.filter(user_rating__isnull=False).aggregate(
-            avg_rating=Avg('user_rating')
-        )['avg_rating'] or 0.0
-        
-        return {
-            'total_books': total_books,
-            'completed_books': completed_books,
-            'currently_reading': currently_reading,
-            'want_to_read': want_to_read,
-            'average_rating': round(avg_rating, 1),
-            'completion_rate': round((completed_books / total_books * 100) if total_books > 0 else 0, 1)
-        }
+        return get_reading_statistics(user)
 
     def get_recent_books(self, user):
         """Get recently viewed or added books"""
-        recent_history = UserReadingHistory.objects.filter(
-            user=user
-        ).order_by('-updated_at')[:5]
+        recent_history = reading_history_queryset(user).order_by('-updated_at')[:5]
         
-        return UserReadingHistorySerializer(recent_history, many=True).data
+        return UserReadingHistorySerializer(recent_history, many=True, context={'request': self.request}).data
 
     def get_fallback_recommendations(self):
         """Fallback recommendations when ML fails"""
@@ -1510,13 +1334,13 @@ class BookListView(APIView):
             investment_level = request.GET.get('investment_level', '')
             
             books = Book.objects.all()
+            paginator = book_paginator
+            searched = None
             
             if search:
-                books = books.filter(
-                    Q(title__icontains=search) |
-                    Q(author__icontains=search) |
-                    Q(genre__icontains=search)
-                )
+                # Ranked full-text matches (FTS5 / tsvector), see core/search.py
+                books = searched = book_search_index.filter(books, search)
+                paginator = search_paginator
             
             if genre:
                 books = books.filter(genre=genre)
@@ -1527,23 +1351,52 @@ class BookListView(APIView):
             if investment_level:
                 books = books.filter(investment_level=investment_level)
             
-            # Get available filters
-            genres = Book.objects.values_list('genre', flat=True).distinct()
-            difficulties = Book.objects.values_list('difficulty_level', flat=True).distinct()
-            investment_levels = Book.objects.values_list('investment_level', flat=True).distinct()
+            # Facet counts under the current filters (cached unless searching)
+            facets = book_facet_service.get_facets({
+                'genre': genre,
+                'difficulty': difficulty,
+                'investment_level': investment_level
+            }, searched)
+            
+            # One keyset page per request (?cursor=...&page_size=...)
+            page, next_cursor = paginator.paginate(books, request)
             
             return Response({
-                'books': BookListSerializer(books, many=True).data,
+                'books': BookListSerializer(page, many=True).data,
+                'next_cursor': next_cursor,
                 'filters': {
-                    'genres': list(genres),
-                    'difficulties': list(difficulties),
-                    'investment_levels': list(investment_levels)
-                }
+                    'genres': list(facets['genre']),
+                    'difficulties': list(facets['difficulty']),
+                    'investment_levels': list(facets['investment_level'])
+                },
+                'facets': facets
             })
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=400)
         except Exception as e:
             print(f"Book list error: {e}")
             return Response({'error': 'Failed to load books'}, status=500)
 
+class BookSearchView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        """Typeahead suggestions for the book search box"""
+        try:
+            query = request.GET.get('q', '')
+            try:
+                limit = max(1, min(int(request.GET.get('limit', 8)), 20))
+            except ValueError:
+                limit = 8
+            
+            books = book_search_index.suggest(query, limit) if query.strip() else []
+            return Response({
+                'results': BookListSerializer(books, many=True).data
+            })
+        except Exception as e:
+            print(f"Book search error: {e}")
+            return Response({'error': 'Failed to search books'}, status=500)
+
 class BookDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -1554,16 +1407,21 @@ class BookDetailView(APIView):
             user = request.user
             
             # Get user's interaction with this book
-            user_history = UserReadingHistory.objects.filter(user=user, book=book).first()
+            user_history = reading_history_queryset(user).filter(book=book).first()
             
-            # Get similar books
-            similar_books = Book.objects.filter(
-                Q(genre=book.genre) | Q(investment_level=book.investment_level)
-            ).exclude(id=book.id)[:6]
+            # Get similar books (embedding similarity, genre/level match if not embedded yet)
+            similar_ids = get_similarity_index().similar(book.id, k=6)
+            if similar_ids:
+                similar_by_id = Book.objects.in_bulk(similar_ids)
+                similar_books = [similar_by_id[i] for i in similar_ids if i in similar_by_id]
+            else:
+                similar_books = Book.objects.filter(
+                    Q(genre=book.genre) | Q(investment_level=book.investment_level)
+                ).exclude(id=book.id)[:6]
             
             return Response({
                 'book': BookSerializer(book).data,
-                'user_history': UserReadingHistorySerializer(user_history).data if user_history else None,
+                'user_history': UserReadingHistorySerializer(user_history, context={'request': request}).data if user_history else None,
                 'similar_books': BookListSerializer(similar_books, many=True).data
             })
         except Book.DoesNotExist:
@@ -1578,8 +1436,14 @@ class UserReadingHistoryView(APIView):
     def get(self, request):
         """Get user's reading history"""
         try:
-            history = UserReadingHistory.objects.filter(user=request.user).order_by('-updated_at')
-            return Response(UserReadingHistorySerializer(history, many=True).data)
+            history = reading_history_queryset(request.user)
+            page, next_cursor = reading_history_paginator.paginate(history, request)
+            return Response({
+                'results': UserReadingHistorySerializer(page, many=True, context={'request': request}).data,
+                'next_cursor': next_cursor
+            })
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=400)
         except Exception as e:
             print(f"Reading history error: {e}")
             return Response({'error': 'Failed to load reading history'}, status=500)
@@ -1593,21 +1457,23 @@ class UserReadingHistoryView(APIView):
             review = request.data.get('review', '')
             
             book = Book.objects.get(id=book_id)
-            history, created = UserReadingHistory.objects.get_or_create(
-                user=request.user,
-                book=book,
-                defaults={'status': status}
-            )
-            
-            if not created:
-                history.status = status
-                if rating:
-                    history.user_rating = rating
-                if review:
-                    history.user_review = review
-                history.save()
+            with transaction.atomic():
+                history, created = UserReadingHistory.objects.get_or_create(
+                    user=request.user,
+                    book=book,
+                    defaults={'status': status}
+                )
+                # The post_save signal keeps the materialized reading stats in step
+                if not created:
+                    history.status = status
+                    if rating:
+                        history.user_rating = float(rating)
+                    if review:
+                        history.user_review = review
+                    history.save()
             
-            return Response(UserReadingHistorySerializer(history).data)
+            refresh_recommendations_later(request.user)
+            return Response(UserReadingHistorySerializer(history, context={'request': request}).data)
         except Book.DoesNotExist:
             return Response({'error': 'Book not found'}, status=404)
         except Exception as e:
@@ -1621,7 +1487,7 @@ class UserPreferencesView(APIView):
         """Get user's reading preferences"""
         try:
             preferences, _ = UserReadingPreference.objects.get_or_create(user=request.user)
-            return Response(UserReadingPreferenceSerializer(preferences).data)
+            return Response(UserReadingPreferenceSerializer(preferences, context={'request': request}).data)
         except Exception as e:
             print(f"Get preferences error: {e}")
             return Response({'error': 'Failed to load preferences'}, status=500)
@@ -1648,7 +1514,8 @@ class UserPreferencesView(APIView):
                 preferences.reading_goal = request.data['reading_goal']
             
             preferences.save()
-            return Response(UserReadingPreferenceSerializer(preferences).data)
+            refresh_recommendations_later(request.user)
+            return Response(UserReadingPreferenceSerializer(preferences, context={'request': request}).data)
         except Exception as e:
             print(f"Update preferences error: {e}")
             return Response({'error': 'Failed to update preferences'}, status=500)
@@ -35,6 +35,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.ai_resilience.AIDeadlineMiddleware',
 ]
 
 ROOT_URLCONF = 'finwise_backend.urls'
@@ -56,6 +57,10 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'finwise_backend.wsgi.application'
+ASGI_APPLICATION = 'finwise_backend.asgi.application'
+
+# Serve the chatbot/tax/benefits endpoints with async views (use with ASGI)
+ASYNC_AI_VIEWS = os.getenv('ASYNC_AI_VIEWS', 'False').lower() == 'true'
 
 DATABASES = {
     'default': {
@@ -89,3 +94,71 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
 }
+
+# AI response cache (tax/benefits recommendations keyed by profile fingerprint)
+# AI_CACHE_BACKEND: 'memory' (per-process LRU), 'django' (CACHES alias) or 'none'
+AI_CACHE_BACKEND = os.getenv('AI_CACHE_BACKEND', 'memory')
+AI_CACHE_ALIAS = os.getenv('AI_CACHE_ALIAS', 'default')
+AI_CACHE_TTL = int(os.getenv('AI_CACHE_TTL', '3600'))  # seconds
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', '1024'))
+
+# Chatbot answer cache: similar questions (cosine >= threshold) from the same
+# income/age/dependents band share an answer; AI_CHAT_CACHE_TTL=0 disables it
+AI_CHAT_CACHE_TTL = int(os.getenv('AI_CHAT_CACHE_TTL', '1800'))  # seconds
+AI_CHAT_CACHE_MAX_ENTRIES = int(os.getenv('AI_CHAT_CACHE_MAX_ENTRIES', '2048'))
+AI_CHAT_CACHE_THRESHOLD = float(os.getenv('AI_CHAT_CACHE_THRESHOLD', '0.85'))
+
+# Gemini resilience: each call gets min(GEMINI_TIMEOUT, time left of the
+# request's AI_REQUEST_BUDGET), kept under gunicorn's 30s worker timeout.
+# After AI_BREAKER_FAILURES consecutive errors calls fail fast to the
+# fallbacks for AI_BREAKER_RESET seconds. AI_HEDGE_REQUESTS sends a second
+# request when the first runs past the recent p95 latency.
+GEMINI_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '10'))  # seconds
+AI_REQUEST_BUDGET = float(os.getenv('AI_REQUEST_BUDGET', '25'))  # seconds
+AI_BREAKER_FAILURES = int(os.getenv('AI_BREAKER_FAILURES', '5'))
+AI_BREAKER_RESET = float(os.getenv('AI_BREAKER_RESET', '30'))  # seconds
+AI_HEDGE_REQUESTS = os.getenv('AI_HEDGE_REQUESTS', 'False').lower() == 'true'
+
+# Text generation backend, built on first use: 'gemini' (needs GEMINI_API_KEY),
+# 'stub' (deterministic canned answers, no network), 'record' (Gemini, saving
+# every response to AI_RECORDINGS_PATH) or 'replay' (answers from the
+# recordings, offline). AI_REPLAY_LATENCY: 'recorded', 'synthetic' (lognormal
+# fitted to the recordings) or 'none'; unrecorded prompts get the stub answer
+# unless AI_REPLAY_ON_MISS=error.
+AI_BACKEND = os.getenv('AI_BACKEND', 'gemini')
+AI_RECORDINGS_PATH = os.getenv('AI_RECORDINGS_PATH', str(BASE_DIR / 'llm_recordings.sqlite3'))
+AI_REPLAY_LATENCY = os.getenv('AI_REPLAY_LATENCY', 'recorded')
+AI_REPLAY_LATENCY_SCALE = float(os.getenv('AI_REPLAY_LATENCY_SCALE', '1.0'))
+AI_REPLAY_ON_MISS = os.getenv('AI_REPLAY_ON_MISS', 'stub')
+
+# Precomputed Wisdom Library recommendations (BookRecommendation rows)
+BOOK_RECOMMENDATIONS_TOP_N = int(os.getenv('BOOK_RECOMMENDATIONS_TOP_N', '10'))
+BOOK_RECOMMENDATIONS_TTL_HOURS = int(os.getenv('BOOK_RECOMMENDATIONS_TTL_HOURS', '24'))
+# Recompute after profile, preference and history writes on a background thread
+# (False: in the committing thread, e.g. for tests)
+BOOK_RECOMMENDATIONS_REFRESH_IN_BACKGROUND = os.getenv('BOOK_RECOMMENDATIONS_REFRESH_IN_BACKGROUND', 'True').lower() == 'true'
+
+# Book list facet counts (cached per process, dropped on Book save/delete)
+BOOK_FACETS_CACHE_TTL = int(os.getenv('BOOK_FACETS_CACHE_TTL', '300'))  # seconds
+
+# Per-process similarity index and scoring engine: reloaded when the catalog
+# version in the cache is bumped (Book signals, bulk imports), and otherwise
+# re-checked against core_book at most this often
+BOOK_CATALOG_RECHECK_SECONDS = float(os.getenv('BOOK_CATALOG_RECHECK_SECONDS', '60'))
+
+# Book cover lookups (populate_books); resolved URLs and misses persist on disk
+BOOK_COVER_CACHE_PATH = os.getenv('BOOK_COVER_CACHE_PATH', str(BASE_DIR / 'book_covers.sqlite3'))
+BOOK_COVER_MAX_WORKERS = int(os.getenv('BOOK_COVER_MAX_WORKERS', '8'))
+BOOK_COVER_RATE_LIMIT = float(os.getenv('BOOK_COVER_RATE_LIMIT', '5'))  # requests/second per host
+
+# Government benefits are matched by the rule engine in core/eligibility.py;
+# Gemini is only used (optionally) to reword the matched schemes
+BENEFITS_AI_PHRASING = os.getenv('BENEFITS_AI_PHRASING', 'False').lower() == 'true'
+
+# Assessment year whose slab tables core/tax.py uses (e.g. '2025-26')
+TAX_ASSESSMENT_YEAR = os.getenv('TAX_ASSESSMENT_YEAR', '2026-27')
+
+# Profile-derived GET endpoints answer If-None-Match with 304 (core/conditional.py).
+# Bump CONDITIONAL_GET_VERSION when their output changes for unchanged data
+# (e.g. new tax tables) so clients refetch.
+CONDITIONAL_GET_VERSION = os.getenv('CONDITIONAL_GET_VERSION', '1')
@@ -10,7 +10,10 @@ backlog = 2048
 
 # Worker processes
 workers = os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
-worker_class = 'sync'
+# 'sync' blocks a whole worker per in-flight Gemini call. For the async views
+# (ASYNC_AI_VIEWS=True) run finwise_backend.asgi:application with
+# GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
 worker_connections = 1000
 max_requests = 1000
 max_requests_jitter = 50
@@ -42,6 +45,16 @@ worker_tmp_dir = None
 preload_app = True
 reload = False
 
+# Build the AI service in each worker before it takes traffic, so the first
+# request does not pay for the SDK import and client setup. (With
+# preload_app the master only imports the app; the service stays unbuilt.)
+def post_worker_init(worker):
+    from core.ai_service import ai_service
+    try:
+        ai_service.warm()
+    except Exception as e:
+        worker.log.warning(f"AI service warm-up failed: {e}")
+
 # Environment
 raw_env = [
     'DJANGO_SETTINGS_MODULE=finwise_backend.settings_production',
@@ -182,13 +182,24 @@ export const wisdomLibraryAPI = {
   get: () => apiCall('/wisdom-library/'),
 };
 
+// Cursor-paginated list endpoints return one page plus next_cursor (null on the last page)
+export type PageParams = { cursor?: string; page_size?: number };
+
+const withPage = (queryParams: URLSearchParams, params?: PageParams) => {
+  if (params?.cursor) queryParams.append('cursor', params.cursor);
+  if (params?.page_size) queryParams.append('page_size', String(params.page_size));
+  return queryParams;
+};
+
 export const booksAPI = {
-  get: (params?: { search?: string; genre?: string; difficulty?: string; investment_level?: string }) => {
+  // Returns { books, next_cursor, filters, facets }
+  get: (params?: { search?: string; genre?: string; difficulty?: string; investment_level?: string } & PageParams) => {
     const queryParams = new URLSearchParams();
     if (params?.search) queryParams.append('search', params.search);
     if (params?.genre) queryParams.append('genre', params.genre);
     if (params?.difficulty) queryParams.append('difficulty', params.difficulty);
     if (params?.investment_level) queryParams.append('investment_level', params.investment_level);
+    withPage(queryParams, params);
     
     const endpoint = `/books/${queryParams.toString() ? '?' + queryParams.toString() : ''}`;
     return apiCall(endpoint);
@@ -198,7 +209,11 @@ export const booksAPI = {
 };
 
 export const readingHistoryAPI = {
-  get: () => apiCall('/reading-history/'),
+  // Returns { results, next_cursor }
+  get: (params?: PageParams) => {
+    const queryParams = withPage(new URLSearchParams(), params);
+    return apiCall(`/reading-history/${queryParams.toString() ? '?' + queryParams.toString() : ''}`);
+  },
   
   update: (data: {
     book_id: number;